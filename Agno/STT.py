@@ -6,21 +6,18 @@
 
 import streamlit as st
 import os
-from PIL import Image
-from io import BytesIO
-from phi.agent import Agent
-from phi.model.google import Gemini
-from phi.tools.tavily import TavilyTools
-from tempfile import NamedTemporaryFile
-import speech_recognition as sr
+# Shared helpers live next to the LangGraph apps
+import shared_modules  # noqa: F401
+import image_analysis
+from search_cache import get_search, make_tavily_tools
+from analysis_cache import ANALYZE_MESSAGE
+from image_pipeline import MAX_IMAGE_WIDTH, resize_image_for_display
+from warmup import preload, warm_up
 
 # Set environment variables for API keys
 os.environ['TAVILY_API_KEY'] = st.secrets['TAVILY_KEY']
 os.environ['GOOGLE_API_KEY'] = st.secrets['GEMINI_KEY']
 
-# Constants
-MAX_IMAGE_WIDTH = 300
-
 # System Prompt and Instructions
 SYSTEM_PROMPT = """
 You are an expert chip design agent. Analyze the uploaded image, which may contain IC chip designs, Verilog/VHDL code, or circuit diagrams. Generate a detailed report on the chip's architecture, including optimization techniques and potential areas for improvement.
@@ -36,69 +33,75 @@ INSTRUCTIONS = """
 3. Ensure the output is easy to understand for both technical and non-technical users.
 """
 
-def resize_image_for_display(image_file):
-    """Resize image for display only, returns bytes"""
-    if isinstance(image_file, str):
-        img = Image.open(image_file)
-    else:
-        img = Image.open(image_file)
-        image_file.seek(0)
-    
-    aspect_ratio = img.height / img.width
-    new_height = int(MAX_IMAGE_WIDTH * aspect_ratio)
-    img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS)
-    
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
-
 @st.cache_resource
 def get_agent():
+    from phi.agent import Agent
+    from phi.model.google import Gemini
+
     return Agent(
         model=Gemini(id="gemini-2.0-flash-exp-image-generation"),
         system_prompt=SYSTEM_PROMPT,
         instructions=INSTRUCTIONS,
-        tools=[TavilyTools(api_key=os.getenv("TAVILY_API_KEY"))],
+        tools=[make_tavily_tools(get_search())],  # Cached, coalesced Tavily searches
         markdown=True,
     )
 
-def analyze_image(image_path):
-    agent = get_agent()
-    with st.spinner('Analyzing image...'):
-        response = agent.run(
-            "Analyze the given image",
-            images=[image_path],
-        )
-        st.markdown(response.content)
-        return response.content  # Return the analysis result
-
-def save_uploaded_file(uploaded_file):
-    with NamedTemporaryFile(dir='.', suffix='.jpg', delete=False) as f:
-        f.write(uploaded_file.getbuffer())
-        return f.name
-
-def speech_to_text():
-    """Converts speech input from microphone to text."""
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("Listening... Please speak into the microphone.")
-        recognizer.adjust_for_ambient_noise(source)
-        try:
-            audio = recognizer.listen(source)
-            text = recognizer.recognize_google(audio)
-            st.success(f"Recognized Speech: {text}")
-            return text
-        except sr.UnknownValueError:
-            st.error("Sorry, could not understand the audio.")
-        except sr.RequestError as e:
-            st.error(f"Could not request results; {e}")
-        return None
+def analyze_image(image, query=None):
+    """Streams the agent's analysis of the image into the page and returns the full text.
+
+    `image` may be a path, bytes, or the memoryview from an UploadedFile's getbuffer().
+    `query` is the user's spoken question, answered alongside the analysis.
+    """
+    message = ANALYZE_MESSAGE
+    if query:
+        message = f"{message} and answer the user's question: {query}"
+    return image_analysis.analyze_image(get_agent(), image, SYSTEM_PROMPT, INSTRUCTIONS, message)
+
+def start_capture():
+    """Starts a background capture session for this user."""
+    from stt_worker import CaptureSession, GoogleRecognizer  # SpeechRecognition loads on first use
+
+    session = CaptureSession(GoogleRecognizer())
+    try:
+        session.start()
+    except (OSError, AttributeError) as e:  # No microphone or PyAudio missing
+        st.error(f"Could not open the microphone: {e}")
+        return
+    st.session_state.capture = session
+
+def stop_capture():
+    """Stops the capture session and keeps the final transcript as the analysis query."""
+    session = st.session_state.capture
+    st.session_state.capture = None
+    st.session_state.user_query = session.stop() or None
+    for error in session.errors:
+        st.error(f"Could not request results; {error}")
+    if not st.session_state.user_query:
+        st.error("Sorry, could not understand the audio.")
+
+@st.fragment(run_every=1.0)
+def live_transcript():
+    """Shows partial transcripts while the capture session is running."""
+    session = st.session_state.get("capture")
+    if session is None:
+        return
+    text, pending = session.partial()
+    st.info("Listening... Please speak into the microphone.")
+    st.write(text or "…")
+    if pending:
+        st.caption(f"Recognizing {pending} segment(s)…")
 
 def main():
+    # Load the agent and speech SDKs in the background while the page renders, once per process
+    warm_up({"agent_sdk": preload("phi.agent", "phi.model.google"), "stt_sdk": preload("speech_recognition")})
     st.title("🤖🖥 Design Copilot Agent")
     
     if 'analyze_clicked' not in st.session_state:
         st.session_state.analyze_clicked = False
+    if 'capture' not in st.session_state:
+        st.session_state.capture = None
+    if 'user_query' not in st.session_state:
+        st.session_state.user_query = None
     
     tab_speech, tab_upload = st.tabs([
         "🎤 Speech Input", 
@@ -107,11 +110,14 @@ def main():
     
     with tab_speech:
         st.header("🎤 Speech Input for Analysis")
-        if st.button("Record Speech"):
-            user_query = speech_to_text()
-            if user_query:
-                st.write(f"Your query: {user_query}")
-                st.info("Use the 'Upload Image' tab to upload an image for analysis.")
+        if st.session_state.capture is None:
+            st.button("Record Speech", on_click=start_capture)
+        else:
+            st.button("Stop Recording", on_click=stop_capture)
+            live_transcript()
+        if st.session_state.user_query:
+            st.success(f"Recognized Speech: {st.session_state.user_query}")
+            st.info("Use the 'Upload Image' tab to upload an image; your query will be sent with it.")
 
     with tab_upload:
         st.header("📤 Upload Image for Analysis")
@@ -124,11 +130,8 @@ def main():
             resized_image = resize_image_for_display(uploaded_file)
             st.image(resized_image, caption="Uploaded Image", use_column_width=False, width=MAX_IMAGE_WIDTH)
             if st.button("🔍 Analyze Uploaded Image", key="analyze_upload"):
-                temp_path = save_uploaded_file(uploaded_file)
-                analysis_result = analyze_image(temp_path)  # Get the output of analysis
-                os.unlink(temp_path)
-                if analysis_result:  # Check if there's text output
-                    st.write(analysis_result)
+                # Streams the analysis into the page, answering the spoken query if there is one
+                analyze_image(uploaded_file.getbuffer(), query=st.session_state.user_query)
 
 if __name__ == "__main__":
     st.set_page_config(
@@ -4,81 +4,58 @@
 
 import streamlit as st
 import os
-from PIL import Image
-from io import BytesIO
-from phi.agent import Agent
-from phi.model.google import Gemini
-from phi.tools.tavily import TavilyTools
-from tempfile import NamedTemporaryFile
-from prompts import SYSTEM_PROMPT, INSTRUCTIONS
-from gtts import gTTS
-import base64
+# Shared helpers live next to the LangGraph apps
+import shared_modules  # noqa: F401
+from search_cache import get_search, make_tavily_tools
+from image_analysis import analyze_image
+from image_pipeline import MAX_IMAGE_WIDTH, resize_image_for_display, EXAMPLE_IMAGES
+from agent_prompts import SYSTEM_PROMPT, INSTRUCTIONS
+from tts_pipeline import GTTSBackend, TTSPipeline
+from tracing import current_span, traced
+from warmup import preload, warm_up
 
 
 os.environ['TAVILY_API_KEY'] = st.secrets['TAVILY_KEY']
 os.environ['GOOGLE_API_KEY'] = st.secrets['GEMINI_KEY']
 
-MAX_IMAGE_WIDTH = 300
-
-def resize_image_for_display(image_file):
-    """Resize image for display only, returns bytes"""
-    if isinstance(image_file, str):
-        img = Image.open(image_file)
-    else:
-        img = Image.open(image_file)
-        image_file.seek(0)
-    
-    aspect_ratio = img.height / img.width
-    new_height = int(MAX_IMAGE_WIDTH * aspect_ratio)
-    img = img.resize((MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS)
-    
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
-
 @st.cache_resource
 def get_agent():
+    from phi.agent import Agent
+    from phi.model.google import Gemini
+
     return Agent(
         model=Gemini(id="gemini-2.0-flash-exp-image-generation"),
         system_prompt=SYSTEM_PROMPT,
         instructions=INSTRUCTIONS,
-        tools=[TavilyTools(api_key=os.getenv("TAVILY_API_KEY"))],
+        tools=[make_tavily_tools(get_search())],  # Cached, coalesced Tavily searches
         markdown=True,
     )
 
-def analyze_image(image_path):
-    agent = get_agent()
-    with st.spinner('Analyzing image...'):
-        response = agent.run(
-            "Analyze the given image",
-            images=[image_path],
-        )
-        st.markdown(response.content)
-        return response.content  # Return the content for TTS
-
-def save_uploaded_file(uploaded_file):
-    with NamedTemporaryFile(dir='.', suffix='.jpg', delete=False) as f:
-        f.write(uploaded_file.getbuffer())
-        return f.name
+@st.cache_resource
+def get_tts_pipeline():
+    return TTSPipeline(GTTSBackend(lang='en'))
 
+@traced("text_to_speech")
 def text_to_speech(text):
-    """Converts the given text to speech and returns a playable audio widget."""
+    """Reads the report aloud, playing the opening as soon as it is synthesized and then the rest."""
+    pipeline = get_tts_pipeline()
+    current_span().set(chars=len(text))
     try:
-        tts = gTTS(text=text, lang='en')
-        mp3_fp = BytesIO()
-        tts.write_to_fp(mp3_fp)
-        mp3_fp.seek(0)
-        data_url = "data:audio/mp3;base64," + base64.b64encode(mp3_fp.read()).decode()
-        return f"""
-        <audio controls autoplay>
-            <source src="{data_url}" type="audio/mp3">
-        </audio>
-        """
+        chunks = []
+        for audio in pipeline.stream(text):
+            if not chunks:
+                st.caption("🔊 Opening")
+                st.audio(audio, format=pipeline.backend.mime, autoplay=True)
+            chunks.append(audio)
+        if len(chunks) > 1:
+            st.caption("🔊 Rest of the report")
+            st.audio(pipeline.backend.join(chunks[1:]), format=pipeline.backend.mime)
     except Exception as e:
         st.error(f"Error generating TTS: {e}")
-        return None
 
 def main():
+    # Load the agent and speech SDKs in the background while the page renders, once per process
+    warm_up({"agent_sdk": preload("phi.agent", "phi.model.google"), "tts_sdk": preload("gtts")})
     st.title("🤖🖥 Design Copilot Agent")
     
     if 'selected_example' not in st.session_state:
@@ -93,12 +70,7 @@ def main():
     ])
     
     with tab_examples:
-        example_images = {
-            "Chip 1": "images/Chip 1.jpg",
-            "Chip 2": "images/Chip 2.jpg",
-            "Code 1": "images/Code 1.jpg",
-            "Code 2": "images/Code 2.jpg"
-        }
+        example_images = EXAMPLE_IMAGES
         
         cols = st.columns(4)
         for idx, (name, path) in enumerate(example_images.items()):
@@ -117,13 +89,9 @@ def main():
             resized_image = resize_image_for_display(uploaded_file)
             st.image(resized_image, caption="Uploaded Image", use_container_width=False, width=MAX_IMAGE_WIDTH)
             if st.button("🔍 Analyze Uploaded Image", key="analyze_upload"):
-                temp_path = save_uploaded_file(uploaded_file)
-                analysis_result = analyze_image(temp_path) # get the output of analysis
-                os.unlink(temp_path)
+                analysis_result = analyze_image(get_agent(), uploaded_file.getbuffer(), SYSTEM_PROMPT, INSTRUCTIONS) # get the output of analysis
                 if analysis_result: # Check if there's text output
-                    audio_html = text_to_speech(analysis_result)
-                    if audio_html:
-                        st.markdown(audio_html, unsafe_allow_html=True)
+                    text_to_speech(analysis_result)
                 
     
     with tab_camera:
@@ -132,13 +100,9 @@ def main():
             resized_image = resize_image_for_display(camera_photo)
             st.image(resized_image, caption="Captured Photo", use_container_width=False, width=MAX_IMAGE_WIDTH)
             if st.button("🔍 Analyze Captured Photo", key="analyze_camera"):
-                temp_path = save_uploaded_file(camera_photo)
-                analysis_result = analyze_image(temp_path) # get the output of analysis
-                os.unlink(temp_path)
+                analysis_result = analyze_image(get_agent(), camera_photo.getbuffer(), SYSTEM_PROMPT, INSTRUCTIONS) # get the output of analysis
                 if analysis_result: # Check if there's text output
-                    audio_html = text_to_speech(analysis_result)
-                    if audio_html:
-                        st.markdown(audio_html, unsafe_allow_html=True)
+                    text_to_speech(analysis_result)
     
     if st.session_state.selected_example:
         st.divider()
@@ -148,11 +112,9 @@ def main():
         
         if st.button("🔍 Analyze Example", key="analyze_example") and not st.session_state.analyze_clicked:
             st.session_state.analyze_clicked = True
-            analysis_result = analyze_image(st.session_state.selected_example)
+            analysis_result = analyze_image(get_agent(), st.session_state.selected_example, SYSTEM_PROMPT, INSTRUCTIONS)
             if analysis_result:  # Check if there's text output
-                audio_html = text_to_speech(analysis_result)
-                if audio_html:
-                    st.markdown(audio_html, unsafe_allow_html=True)
+                text_to_speech(analysis_result)
 
 if __name__ == "__main__":
     st.set_page_config(
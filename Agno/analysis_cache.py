@@ -0,0 +1,227 @@
+"""Cache of image analyses keyed by exact content hash, with perceptual-hash matching for near duplicates.
+
+Pre-populate the bundled examples (needs GOOGLE_API_KEY and TAVILY_API_KEY), from the repository root:
+
+    python Agno/analysis_cache.py warm
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Iterator, Optional, Tuple
+
+from PIL import Image
+
+import shared_modules  # noqa: F401
+from image_pipeline import CACHE_DIR, EXAMPLE_IMAGES, agent_images, content_hash, memoize, read_image_bytes
+
+MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 500))
+# Maximum Hamming distance between 64-bit dHashes for two photos to count as the same; -1 disables
+PHASH_DISTANCE = int(os.getenv("ANALYSIS_PHASH_DISTANCE", 4))
+PHASH_CACHE_SIZE = 256
+ANALYZE_MESSAGE = "Analyze the given image"
+
+_phashes: "OrderedDict[str, int]" = OrderedDict()
+
+
+def analysis_namespace(model_id: str, *prompts: str) -> str:
+    """Namespaces cached analyses by model and prompt version, so prompt edits invalidate them."""
+    digest = hashlib.sha256("\x00".join(prompts).encode("utf-8")).hexdigest()[:16]
+    return f"{model_id}:{digest}"
+
+
+def perceptual_hash(image_file) -> int:
+    """Returns a 64-bit difference hash (dHash) that is stable under resizing and recompression."""
+    img = Image.open(BytesIO(read_image_bytes(image_file)))
+    if img.format == "JPEG":
+        img.draft("L", (64, 64))
+    pixels = list(img.convert("L").resize((9, 8), Image.Resampling.BILINEAR).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def image_phash(image_file) -> int:
+    """perceptual_hash memoized by content hash; lookup and store of one request decode the image once."""
+    return memoize(_phashes, PHASH_CACHE_SIZE, content_hash(image_file), lambda: perceptual_hash(image_file))
+
+
+class AnalysisCache:
+    """Bounded SQLite store of analysis results with LRU eviction."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = MAX_ENTRIES,
+                 phash_distance: int = PHASH_DISTANCE):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "image_analyses.sqlite")
+        self.max_entries = max_entries
+        self.phash_distance = phash_distance
+        self.stats = {"exact_hits": 0, "near_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analyses (
+                namespace TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                phash INTEGER,
+                result TEXT NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (namespace, content_hash)
+            )"""
+        )
+        self._conn.commit()
+
+    def lookup(self, image_file, namespace: str) -> Optional[str]:
+        """Returns the cached analysis of this image, or of a near-identical one, if present."""
+        digest = content_hash(image_file)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM analyses WHERE namespace = ? AND content_hash = ?", (namespace, digest)
+            ).fetchone()
+            if row is not None:
+                self._touch(namespace, digest)
+                self.stats["exact_hits"] += 1
+                return row[0]
+        if self.phash_distance >= 0:
+            phash = _signed(image_phash(image_file))
+            with self._lock:
+                candidates = self._conn.execute(
+                    "SELECT content_hash, phash, result FROM analyses WHERE namespace = ? AND phash IS NOT NULL",
+                    (namespace,),
+                ).fetchall()
+                best = min(candidates, key=lambda c: bin((c[1] ^ phash) & 0xFFFFFFFFFFFFFFFF).count("1"), default=None)
+                if best is not None and bin((best[1] ^ phash) & 0xFFFFFFFFFFFFFFFF).count("1") <= self.phash_distance:
+                    self._touch(namespace, best[0])
+                    self.stats["near_hits"] += 1
+                    return best[2]
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, image_file, namespace: str, result: str) -> None:
+        """Caches an analysis and evicts the least recently used entries beyond max_entries."""
+        phash = _signed(image_phash(image_file)) if self.phash_distance >= 0 else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (namespace, content_hash, phash, result, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, content_hash(image_file), phash, result, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM analyses WHERE rowid IN (SELECT rowid FROM analyses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def _touch(self, namespace: str, digest: str) -> None:
+        self._conn.execute(
+            "UPDATE analyses SET accessed = ? WHERE namespace = ? AND content_hash = ?", (time.time(), namespace, digest)
+        )
+        self._conn.commit()
+
+
+def _signed(value: int) -> int:
+    """Maps an unsigned 64-bit hash into SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Returns the process-wide analysis cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache()
+        return _cache
+
+
+def analysis_tokens(system_prompt: str, instructions: str, message: str) -> int:
+    """Estimated prompt tokens of an image analysis, reserved under the provider quota."""
+    from memory import estimate_tokens
+    from throttle import IMAGE_TOKENS
+
+    return estimate_tokens([system_prompt, instructions, message]) + IMAGE_TOKENS
+
+
+def run_analysis(job, agent, image_file, message: str, tokens: int) -> Iterator[str]:
+    """Job body: streams a phi agent's analysis of the image.
+
+    Queued under the Gemini quota; rate limits are retried until the first chunk arrives.
+    """
+    from throttle import get_throttle
+
+    with agent_images(image_file) as images:  # Downscaled copy, handed over in memory
+        chunks = get_throttle(f"google:{agent.model.id}").stream(
+            lambda: agent.run(message, images=images, stream=True), tokens=tokens)
+        for chunk in chunks:
+            yield chunk.content
+
+
+def stream_analysis(service, user_id: str, agent, image_file, system_prompt: str, instructions: str,
+                    message: str = ANALYZE_MESSAGE, cache: AnalysisCache = None) -> Tuple[Iterator[str], bool]:
+    """Returns (chunks, cache hit): the cached analysis, or a job on the service streaming a fresh one.
+
+    A fresh analysis is stored once its stream completes. Results are cached per model, prompts and
+    message, so apps with different prompts never share an analysis. Raises QueueFullError.
+    """
+    cache = cache or get_analysis_cache()
+    namespace = analysis_namespace(agent.model.id, system_prompt, instructions, message)
+    cached = cache.lookup(image_file, namespace)
+    if cached is not None:
+        return iter([cached]), True
+    job_id = service.submit(user_id, run_analysis, agent, image_file, message,
+                            analysis_tokens(system_prompt, instructions, message), name="image_analysis")
+
+    def chunks() -> Iterator[str]:
+        parts = []
+        for part in service.stream(job_id):
+            parts.append(part)
+            yield part
+        if parts:
+            cache.store(image_file, namespace, "".join(parts))
+    return chunks(), False
+
+def warm(model_id: str) -> None:
+    """Analyzes every bundled example image that is not cached yet with the Multimodal app's agent."""
+    from phi.agent import Agent
+    from phi.model.google import Gemini
+
+    from agent_prompts import INSTRUCTIONS, SYSTEM_PROMPT
+    from search_cache import get_search, make_tavily_tools
+
+    agent = Agent(
+        model=Gemini(id=model_id),
+        system_prompt=SYSTEM_PROMPT,
+        instructions=INSTRUCTIONS,
+        tools=[make_tavily_tools(get_search())],
+        markdown=True,
+    )
+    namespace = analysis_namespace(model_id, SYSTEM_PROMPT, INSTRUCTIONS, ANALYZE_MESSAGE)
+    tokens = analysis_tokens(SYSTEM_PROMPT, INSTRUCTIONS, ANALYZE_MESSAGE)
+    cache = get_analysis_cache()
+    for name, path in EXAMPLE_IMAGES.items():
+        if not os.path.exists(path):
+            print(f"{name}: missing {path}, skipped")
+        elif cache.lookup(path, namespace) is not None:
+            print(f"{name}: already cached")
+        else:
+            start = time.perf_counter()
+            cache.store(path, namespace, "".join(run_analysis(None, agent, path, ANALYZE_MESSAGE, tokens)))
+            print(f"{name}: analyzed in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["warm"])
+    parser.add_argument("--model", default="gemini-2.0-flash-exp-image-generation")
+    args = parser.parse_args()
+    warm(args.model)
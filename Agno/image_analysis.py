@@ -0,0 +1,35 @@
+"""Image analysis as the Agno apps show it: analysis cache lookup, agent run on the job service, cache store."""
+import streamlit as st
+
+import shared_modules  # noqa: F401
+from analysis_cache import ANALYZE_MESSAGE, stream_analysis
+from service import QueueFullError, get_service, session_user_id
+from streaming import TimedStream
+from tracing import current_span, traced
+
+
+@traced("analyze_image")
+def analyze_image(agent, image, system_prompt: str, instructions: str, message: str = ANALYZE_MESSAGE) -> str:
+    """Streams the agent's analysis of the image into the page and returns the full text.
+
+    `image` may be a path, bytes, or the memoryview from an UploadedFile's getbuffer(). The agent
+    runs on the shared job service instead of the script thread (analysis_cache.stream_analysis).
+    """
+    try:
+        chunks, cached = stream_analysis(get_service(), session_user_id(st.session_state), agent, image,
+                                         system_prompt, instructions, message)
+    except QueueFullError as e:
+        st.warning(f"{e}. Please wait for your earlier analyses to finish.")
+        return ""
+    if cached:
+        text = "".join(chunks)
+        current_span().set(cache_hit=True, chars=len(text))
+        st.markdown(text)
+        st.caption("Served from the analysis cache")
+        return text
+
+    analysis_stream = TimedStream(chunks, name="image_analysis")
+    st.write_stream(analysis_stream)
+    st.caption(analysis_stream.summary())
+    current_span().set(cache_hit=False, chars=len(analysis_stream.text))
+    return analysis_stream.text
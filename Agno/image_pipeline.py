@@ -0,0 +1,256 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+from PIL import Image, ImageOps
+
+import shared_modules  # noqa: F401
+from tracing import span
+
+MAX_IMAGE_WIDTH = 300
+# Model inputs are downscaled to at most this many pixels and re-encoded at this JPEG quality
+MODEL_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 1024 * 1024))
+MODEL_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 85))
+CACHE_DIR = os.getenv("COPILOT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+THUMBNAIL_CACHE_SIZE = 64
+MODEL_INPUT_CACHE_SIZE = 16
+TMPFS_DIR = "/dev/shm"
+T = TypeVar("T")
+
+EXAMPLE_IMAGES = {
+    "Chip 1": "images/Chip 1.jpg",
+    "Chip 2": "images/Chip 2.jpg",
+    "Code 1": "images/Code 1.jpg",
+    "Code 2": "images/Code 2.jpg"
+}
+
+_thumbnails: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+_model_inputs: "OrderedDict[Tuple[str, int, int], Tuple[bytes, str]]" = OrderedDict()
+_path_hashes: Dict[Tuple[str, float, int], str] = {}
+_inflight: Dict[Tuple[int, Any], Future] = {}  # (id(store), key) -> result of the call computing it
+_lock = threading.Lock()
+
+
+MAGIC_NUMBERS = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def detect_mime(data) -> str:
+    """Detects the image MIME type from its magic number rather than the file name."""
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, mime in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return mime
+    return "application/octet-stream"
+
+
+def read_image_bytes(image_file) -> bytes:
+    """Returns the raw bytes of a path, bytes-like object or Streamlit UploadedFile."""
+    if isinstance(image_file, str):
+        with open(image_file, "rb") as f:
+            return f.read()
+    if isinstance(image_file, (bytes, bytearray, memoryview)):
+        return bytes(image_file)
+    if hasattr(image_file, "getvalue"):
+        return image_file.getvalue()
+    data = image_file.read()
+    image_file.seek(0)
+    return data
+
+
+def content_hash(image_file) -> str:
+    """Returns the SHA-256 of the image content; paths are memoized by mtime and size."""
+    if isinstance(image_file, str):
+        stat = os.stat(image_file)
+        key = (os.path.abspath(image_file), stat.st_mtime, stat.st_size)
+        with _lock:
+            if key in _path_hashes:
+                return _path_hashes[key]
+        digest = hashlib.sha256(read_image_bytes(image_file)).hexdigest()
+        with _lock:
+            _path_hashes[key] = digest
+        return digest
+    return hashlib.sha256(read_image_bytes(image_file)).hexdigest()
+
+
+def open_oriented(data: bytes, draft_size: Tuple[int, int] = None) -> Image.Image:
+    """Opens image bytes and applies the EXIF orientation once.
+
+    If draft_size is given, JPEGs are decoded at the smallest DCT scale that still covers it.
+    """
+    img = Image.open(BytesIO(data))
+    if draft_size is not None and img.format == "JPEG":
+        img.draft("RGB", draft_size)
+    return ImageOps.exif_transpose(img)
+
+
+def resize_image_for_display(image_file, width: int = MAX_IMAGE_WIDTH) -> bytes:
+    """Resize image for display only, returns PNG bytes cached by content hash."""
+    with span("resize_image_for_display", width=width) as s:
+        thumbnail, source = _thumbnail(image_file, width)
+        s.set(cache=source, cache_hit=source != "resized", bytes_out=len(thumbnail))
+        return thumbnail
+
+
+def _thumbnail(image_file, width: int) -> Tuple[bytes, str]:
+    """Returns the thumbnail and where it came from: "memory", "disk" or "resized"."""
+    digest = content_hash(image_file)
+    key = (digest, width)
+    with _lock:
+        if key in _thumbnails:
+            _thumbnails.move_to_end(key)
+            return _thumbnails[key], "memory"
+
+    path = os.path.join(CACHE_DIR, "thumbnails", f"{digest}_{width}.png")
+    source = "disk"
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            thumbnail = f.read()
+    else:
+        source = "resized"
+        img = open_oriented(read_image_bytes(image_file), draft_size=(width * 2, width * 2))
+        new_height = max(int(width * img.height / img.width), 1)
+        img = img.resize((width, new_height), Image.Resampling.LANCZOS)
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+        thumbnail = buf.getvalue()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(thumbnail)
+
+    with _lock:
+        _thumbnails[key] = thumbnail
+        while len(_thumbnails) > THUMBNAIL_CACHE_SIZE:
+            _thumbnails.popitem(last=False)
+    return thumbnail, source
+
+
+def prepare_model_image(image_file, max_pixels: int = MODEL_MAX_PIXELS,
+                        quality: int = MODEL_JPEG_QUALITY) -> Tuple[bytes, str]:
+    """Downscales and recompresses an image for upload to the model, returning (bytes, mime type).
+
+    Images already within max_pixels that are JPEGs or PNGs with no EXIF rotation are passed through unchanged.
+    """
+    data = read_image_bytes(image_file)
+    img = Image.open(BytesIO(data))
+    pixels = img.width * img.height
+    orientation = img.getexif().get(0x0112, 1)
+    if pixels <= max_pixels and img.format in ("JPEG", "PNG") and orientation == 1:
+        return data, detect_mime(data)
+
+    scale = min((max_pixels / pixels) ** 0.5, 1.0)
+    stored_size = (max(int(img.width * scale), 1), max(int(img.height * scale), 1))
+    img = open_oriented(data, draft_size=stored_size)  # The draft applies to the stored, unrotated pixels
+    # Orientations 5-8 rotate by 90 degrees, so the upright image has width and height swapped
+    size = stored_size[::-1] if orientation in (5, 6, 7, 8) else stored_size
+    if img.size != size and scale < 1.0:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    buf = BytesIO()
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue(), "image/png"
+    img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue(), "image/jpeg"
+
+
+def memoize(store: "OrderedDict", limit: int, key, compute: Callable[[], T]) -> T:
+    """Returns store[key], computing it once on a miss; concurrent misses for the same key wait for that one call.
+
+    Decoding a large (progressive) JPEG holds every DCT coefficient in memory, so duplicate decodes
+    of one image under concurrent requests multiply the peak memory, not just the CPU time.
+    """
+    inflight_key = (id(store), key)
+    with _lock:
+        if key in store:
+            store.move_to_end(key)
+            return store[key]
+        future = _inflight.get(inflight_key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[inflight_key] = future
+    if not owner:
+        return future.result()
+
+    try:
+        value = compute()
+        with _lock:
+            store[key] = value
+            while len(store) > limit:
+                store.popitem(last=False)
+        future.set_result(value)
+        return value
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(inflight_key, None)
+
+
+def model_input(image_file, max_pixels: int = MODEL_MAX_PIXELS, quality: int = MODEL_JPEG_QUALITY) -> Tuple[bytes, str]:
+    """Returns the prepared model input (bytes, mime type), memoized in memory by content hash."""
+    key = (content_hash(image_file), max_pixels, quality)
+    return memoize(_model_inputs, MODEL_INPUT_CACHE_SIZE, key,
+                   lambda: prepare_model_image(image_file, max_pixels, quality))
+
+
+@contextmanager
+def spill_to_tmpfs(data: bytes, mime: str) -> Iterator[str]:
+    """Writes data to a RAM-backed temp file (falling back to the system temp dir) and always removes it."""
+    directory = TMPFS_DIR if os.access(TMPFS_DIR, os.W_OK) else tempfile.gettempdir()
+    suffix = {"image/png": ".png", "image/gif": ".gif", "image/webp": ".webp", "image/bmp": ".bmp"}.get(mime, ".jpg")
+    fd, path = tempfile.mkstemp(prefix="copilot_", suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def agent_images(image_file) -> Iterator[List]:
+    """Yields the `images` argument for a phi Agent run.
+
+    The prepared bytes are handed over in memory when phi supports image content; older phi
+    releases only take paths, so the bytes are spilled to tmpfs for the duration of the run.
+    """
+    data, mime = model_input(image_file)
+    try:
+        from phi.model.content import Image as AgentImage
+    except ImportError:
+        AgentImage = None
+    if AgentImage is not None:
+        yield [AgentImage(content=data)]
+        return
+    with spill_to_tmpfs(data, mime) as path:
+        yield [path]
+
+
+def warm_example_thumbnails(width: int = MAX_IMAGE_WIDTH) -> int:
+    """Precomputes thumbnails and model inputs for the bundled example images; returns how many exist."""
+    warmed = 0
+    for path in EXAMPLE_IMAGES.values():
+        if os.path.exists(path):
+            resize_image_for_display(path, width)
+            model_input(path)
+            warmed += 1
+    return warmed
@@ -0,0 +1,12 @@
+"""Makes the modules shared with the LangGraph apps (tracing, throttle, service, search_cache, ...) importable.
+
+Every Agno module that imports one of them imports this module first; it is the only place that
+touches sys.path. The two directories share no module names, so the order on the path does not matter.
+"""
+import os
+import sys
+
+LANGGRAPH_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "LangGraph"))
+
+if LANGGRAPH_DIR not in (os.path.normpath(os.path.abspath(path)) for path in sys.path):
+    sys.path.append(LANGGRAPH_DIR)
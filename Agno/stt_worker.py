@@ -0,0 +1,147 @@
+import itertools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import speech_recognition as sr
+
+CALIBRATION_TTL_SECONDS = float(os.getenv("STT_CALIBRATION_TTL", 600))
+PHRASE_TIME_LIMIT = float(os.getenv("STT_PHRASE_TIME_LIMIT", 10))
+PAUSE_THRESHOLD = 0.6  # Seconds of silence that end a voice segment
+
+# Energy threshold per microphone, with the time it was measured
+_calibrations: Dict[Optional[int], Tuple[float, float]] = {}
+_calibrations_lock = threading.Lock()
+
+
+class RecognizerBackend(ABC):
+    """Turns one voice segment into text; raise sr.UnknownValueError when nothing was understood."""
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, audio: sr.AudioData) -> str:
+        """Transcript of one voice segment."""
+
+
+class GoogleRecognizer(RecognizerBackend):
+    """Google Web Speech API, as used by SpeechRecognition's recognize_google."""
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self._recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxRecognizer(RecognizerBackend):
+    """Offline CMU Sphinx recognition (needs the pocketsphinx package)."""
+    name = "sphinx"
+
+    def __init__(self, language: str = "en-US"):
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self._recognizer.recognize_sphinx(audio, language=self.language)
+
+
+class StubRecognizer(RecognizerBackend):
+    """Offline recognizer returning canned text per segment, for tests."""
+    name = "stub"
+
+    def __init__(self, transcribe: Callable[[sr.AudioData], str]):
+        self.transcribe = transcribe
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        return self.transcribe(audio)
+
+
+def calibrated_recognizer(source: sr.AudioSource, device_index: Optional[int] = None,
+                          ttl: float = CALIBRATION_TTL_SECONDS) -> sr.Recognizer:
+    """Returns a Recognizer using the cached ambient-noise calibration for this microphone."""
+    recognizer = sr.Recognizer()
+    recognizer.pause_threshold = PAUSE_THRESHOLD
+    with _calibrations_lock:
+        cached = _calibrations.get(device_index)
+    if cached is not None and time.time() - cached[1] < ttl:
+        recognizer.energy_threshold = cached[0]
+        recognizer.dynamic_energy_threshold = False
+        return recognizer
+    with source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+    with _calibrations_lock:
+        _calibrations[device_index] = (recognizer.energy_threshold, time.time())
+    return recognizer
+
+
+class CaptureSession:
+    """Captures speech on a background thread and recognizes each voice segment as it completes.
+
+    SpeechRecognition's energy-based voice activity detection splits the microphone stream into
+    segments; each segment is recognized on a worker pool so partial transcripts arrive while the
+    user is still speaking.
+    """
+
+    def __init__(self, backend: RecognizerBackend, device_index: Optional[int] = None,
+                 phrase_time_limit: float = PHRASE_TIME_LIMIT, max_workers: int = 2):
+        self.backend = backend
+        self.device_index = device_index
+        self.phrase_time_limit = phrase_time_limit
+        self.errors: List[str] = []
+        self._segments: Dict[int, str] = {}
+        self._pending = 0
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt")
+        self._stop_listening = None
+
+    @property
+    def running(self) -> bool:
+        return self._stop_listening is not None
+
+    def start(self) -> None:
+        """Opens the microphone and starts listening in the background."""
+        microphone = sr.Microphone(device_index=self.device_index)
+        recognizer = calibrated_recognizer(microphone, self.device_index)
+        self._stop_listening = recognizer.listen_in_background(
+            microphone, lambda _, audio: self.submit_segment(audio), phrase_time_limit=self.phrase_time_limit
+        )
+
+    def submit_segment(self, audio: sr.AudioData) -> None:
+        """Queues one completed voice segment for recognition."""
+        sequence = next(self._sequence)
+        with self._lock:
+            self._pending += 1
+        self._pool.submit(self._recognize, sequence, audio)
+
+    def _recognize(self, sequence: int, audio: sr.AudioData) -> None:
+        text = ""
+        try:
+            text = self.backend.recognize(audio)
+        except sr.UnknownValueError:
+            pass
+        except Exception as e:
+            with self._lock:
+                self.errors.append(str(e))
+        with self._lock:
+            self._segments[sequence] = text
+            self._pending -= 1
+
+    def partial(self) -> Tuple[str, int]:
+        """Returns the transcript recognized so far and the number of segments still being recognized."""
+        with self._lock:
+            text = " ".join(self._segments[i] for i in sorted(self._segments) if self._segments[i])
+            return text, self._pending
+
+    def stop(self) -> str:
+        """Stops listening, waits for in-flight segments and returns the final transcript."""
+        if self._stop_listening is not None:
+            self._stop_listening(wait_for_stop=True)
+            self._stop_listening = None
+        self._pool.shutdown(wait=True)
+        return self.partial()[0]
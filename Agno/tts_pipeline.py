@@ -0,0 +1,179 @@
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Tuple
+
+import shared_modules  # noqa: F401
+from tracing import in_context, span
+
+MAX_CHUNK_CHARS = 300
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", 4))
+TTS_CACHE_DIR = os.path.join(
+    os.getenv("COPILOT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")), "tts")
+
+
+class TTSBackend(ABC):
+    """Synthesizes one chunk of plain text to audio bytes in a single container format."""
+    name = "base"
+    mime = "audio/mp3"
+    extension = ".mp3"
+
+    @abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        """Audio bytes for one chunk of text."""
+
+    def join(self, chunks: List[bytes]) -> bytes:
+        """Concatenates chunk audio; MP3 frames can simply be appended."""
+        return b"".join(chunks)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS through gTTS (needs network access)."""
+    name = "gtts"
+
+    def __init__(self, lang: str = "en"):
+        self.lang = lang
+        self.name = f"gtts-{lang}"
+
+    def synthesize(self, text: str) -> bytes:
+        from gtts import gTTS
+
+        buf = io.BytesIO()
+        gTTS(text=text, lang=self.lang).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class SilentBackend(TTSBackend):
+    """Offline backend producing silent WAV audio sized to the text, for tests and benchmarks."""
+    name = "silent"
+    mime = "audio/wav"
+    extension = ".wav"
+
+    def __init__(self, rate: int = 8000, seconds_per_char: float = 0.06, latency: Callable[[str], float] = None):
+        self.rate = rate
+        self.seconds_per_char = seconds_per_char
+        self.latency = latency
+
+    def synthesize(self, text: str) -> bytes:
+        if self.latency is not None:
+            time.sleep(self.latency(text))
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(self.rate)
+            f.writeframes(b"\x80" * int(len(text) * self.seconds_per_char * self.rate))
+        return buf.getvalue()
+
+    def join(self, chunks: List[bytes]) -> bytes:
+        out = io.BytesIO()
+        with wave.open(out, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(1)
+            writer.setframerate(self.rate)
+            for chunk in chunks:
+                with wave.open(io.BytesIO(chunk), "rb") as reader:
+                    writer.writeframes(reader.readframes(reader.getnframes()))
+        return out.getvalue()
+
+
+def strip_markdown(text: str) -> str:
+    """Removes Markdown syntax that would otherwise be read aloud."""
+    text = re.sub(r"```.*?```", " ", text, flags=re.DOTALL)  # Code blocks are not worth reading aloud
+    text = re.sub(r"`([^`]*)`", r"\1", text)
+    text = re.sub(r"!\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"^\s{0,3}#{1,6}\s*(.*)$", r"\1.", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*(?:[-*+]|\d+\.)\s+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\|?(?:\s*:?-{3,}:?\s*\|)+\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\|(.*)\|\s*$", r"\1.", text, flags=re.MULTILINE)
+    text = re.sub(r"\s*\|\s*", ", ", text)
+    text = re.sub(r"(\*\*|__|\*|_|~~)(.+?)\1", r"\2", text)
+    text = re.sub(r"^\s*>\s?", "", text, flags=re.MULTILINE)
+    text = re.sub(r"\.\.+", ".", text)
+    return re.sub(r"[ \t]+", " ", text).strip()
+
+
+def split_sentences(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Splits text at sentence boundaries into chunks of at most about max_chars characters."""
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+|\n+", text) if s.strip()]
+    chunks: List[str] = []
+    current = ""
+    for sentence in sentences:
+        while len(sentence) > max_chars:  # Overlong sentence: break at the last space before the limit
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TTSPipeline:
+    """Synthesizes sentence chunks concurrently, in order, with an on-disk cache per chunk."""
+
+    def __init__(self, backend: TTSBackend = None, max_workers: int = TTS_WORKERS,
+                 max_chars: int = MAX_CHUNK_CHARS, cache_dir: str = None):
+        self.backend = backend or GTTSBackend()
+        self.max_workers = max_workers
+        self.max_chars = max_chars
+        self.cache_dir = cache_dir or TTS_CACHE_DIR
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def _chunk_path(self, chunk: str) -> str:
+        digest = hashlib.sha256(f"{self.backend.name}\x00{chunk}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + self.backend.extension)
+
+    def _synthesize_chunk(self, chunk: str) -> bytes:
+        with span("tts_chunk", backend=self.backend.name, chars=len(chunk)) as s:
+            audio, hit = self._cached_chunk(chunk)
+            s.set(cache_hit=hit, bytes_out=len(audio))
+            return audio
+
+    def _cached_chunk(self, chunk: str) -> Tuple[bytes, bool]:
+        path = self._chunk_path(chunk)
+        if os.path.exists(path):
+            with self._lock:
+                self.stats["hits"] += 1
+            with open(path, "rb") as f:
+                return f.read(), True
+        with self._lock:
+            self.stats["misses"] += 1
+        audio = self.backend.synthesize(chunk)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        return audio, False
+
+    def stream(self, markdown_text: str) -> Iterator[bytes]:
+        """Yields chunk audio in reading order; the first chunk is yielded as soon as it is ready."""
+        chunks = split_sentences(strip_markdown(markdown_text), self.max_chars)
+        if not chunks:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(in_context(self._synthesize_chunk), chunk) for chunk in chunks]
+            for future in futures:
+                yield future.result()
+
+    def synthesize(self, markdown_text: str) -> bytes:
+        """Returns the whole report as one audio clip."""
+        return self.backend.join(list(self.stream(markdown_text)))
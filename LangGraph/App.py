@@ -1,60 +1,64 @@
 
 import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-import re
-from typing import List
-
-def llm_call(prompt: str, system_prompt: str = "", llm: ChatGoogleGenerativeAI = None) -> str:
-    """Calls the LLM with the given prompt and returns the response."""
-    if system_prompt:
-        prompt = f"{system_prompt}\n{prompt}"
-    response = llm.invoke(prompt)
-    return response.content
-
-def chain(input: str, prompts: List[str], llm: ChatGoogleGenerativeAI) -> str:
-    """Chain multiple LLM calls sequentially, passing results between steps."""
-    result = input
-    for i, prompt in enumerate(prompts, 1):
-        print(f"\nStep {i}:")
-        result = llm_call(f"{prompt}\nInput: {result}", llm=llm)
-        print(result)
-    return result
+import itertools
+import time
+from step_graph import stream_steps
+from llm_cache import get_cache
+from prompts import Designcopilot, data_processing_steps
+from router import MODEL_CHOICES, select_model, warm_model
+from service import QueueFullError, get_service, session_user_id
+from streaming import TimedStream
+from throttle import throttle_stats
+from warmup import warm_up
 
 st.title("Chip Design Copilot")
+model_name = st.sidebar.selectbox("Model", MODEL_CHOICES, help="'router' sends analysis steps to the strong tier and formatting steps to the fastest cheap model, failing over between providers")
+# Build the chosen model and load its SDK in the background while the page renders (once per process)
+warm_up({"response_cache": get_cache, f"model:{model_name}": lambda: warm_model(model_name)})
 
-# Define the prompt chaining steps
-data_processing_steps = [
-    """Highlight potential issues or areas for improvement in chip design, including:
-        * Performance
-        * Reliability
-        * Cost
-        * Security
-        * Area
-        * Pin count
-        * Manufacturing complexity""",
-    """Suggest how traditional chip design can be upgraded with AI capabilities.""",
-    """Generate a blueprint report of the chip design, detailing:
-        * The current architecture and its analysis
-        * Suggested improvements for optimization covering performance, reliability, cost, security, area, pin count, and manufacturing complexity
-        * How AI can be incorporated into the existing design""",
-    """Mention and describe the changes incorporated during the upgrade to AI-enhanced design.""",
-    """Use technical terminology appropriately and provide explanations for complex concepts.""",
-    """Present the information in a clear and organized manner. Use headings, bullet points, and formatting to enhance readability.""",
-    """Remember the user may not be an expert in chip design; explain technical concepts in simple terms.""",
-]
-
-# Define the initial input (Designcopilot)
-Designcopilot = """Expert Chip Design Copilot Agent specializing in chip design architecture. Your role is to assist users in understanding and improving their chip designs by providing detailed analysis, insights, and optimization suggestions. You combine technical knowledge to deliver comprehensive and actionable information for users. Your guidance accelerates the design process, offering prescriptive insights and recommendations. Return your response in Markdown format."""
+def generate_report(job, llm):
+    """Job body: runs the report steps, executing independent steps concurrently, and streams the final step."""
+    def on_step(name, output, seconds):
+        job.emit("step", f"Finished step {name} in {seconds:.2f}s")
+    report_stream, step_timings = stream_steps(Designcopilot, data_processing_steps, llm, on_step=on_step)
+    yield from report_stream
+    job.emit("timings", step_timings)
 
 # Button to trigger report generation
 if st.button("Generate Report"):
-    #Initialize Gemini model
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.0)
-    # Initialize Groq LLM
-    #llm = ChatGroq(model_name="deepseek-r1-distill-qwen-32b", temperature=0)  # Replace with your Groq model
-    # Perform prompt chaining
-    formatted_result = chain(Designcopilot, data_processing_steps, llm)
+    # Router or a single model (created once per process and shared by all sessions)
+    llm = select_model(model_name)
+    # Queue the report on the shared job service instead of running it on the script thread
+    start = time.perf_counter()
+    service = get_service()
+    try:
+        job_id = service.submit(session_user_id(st.session_state), generate_report, llm, name="report")
+    except QueueFullError as e:
+        st.warning(f"{e}. Please wait for your earlier reports to finish.")
+        st.stop()
+    step_timings = {}
+    with st.status("Preparing report...", expanded=False) as status:
+        def on_event(kind, data):
+            if kind == "timings":
+                step_timings.update(data)
+            else:
+                status.write(data)
+        chunks = service.stream(job_id, on_event=on_event)
+        first_chunk = next(chunks, "")  # Step progress is written to the status box until the report starts
+        status.update(label="Writing report...", state="complete")
+
+    # Display the generated report as it streams in
+    report_stream = TimedStream(itertools.chain([first_chunk], chunks), name="report", start=start)
+    st.write_stream(report_stream)
+    st.caption(report_stream.summary())
 
-    # Display the generated report
-    st.markdown(formatted_result)
+    # Show per-step wall time and response cache hits and misses
+    with st.expander("Step timings"):
+        st.table({step: {"seconds": round(seconds, 2)} for step, seconds in step_timings.items()})
+    with st.expander("Cache statistics"):
+        st.table({step: counts for step, counts in get_cache().stats.items()})
+    if hasattr(llm, "summary"):
+        with st.expander("Provider latency"):
+            st.table(llm.summary())
+    with st.expander("Throttling"):
+        st.table(throttle_stats())
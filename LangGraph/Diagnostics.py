@@ -0,0 +1,55 @@
+import streamlit as st
+import time
+from collections import defaultdict
+from streaming import TTFT_SAMPLES, ttft_percentiles
+from throttle import throttle_stats
+import tracing
+from warmup import warmup_stats
+from semantic_cache import get_semantic_cache
+
+# Reads the spans every copilot process has exported to the SQLite trace sink
+st.title("Copilot Diagnostics")
+window = st.sidebar.selectbox("Window", ["15 minutes", "1 hour", "24 hours", "7 days"], index=1)
+seconds = {"15 minutes": 900, "1 hour": 3600, "24 hours": 86400, "7 days": 604800}[window]
+spans = tracing.load_spans(since=time.time() - seconds)
+
+if not tracing.enabled():
+    st.warning("Tracing is disabled in this process (COPILOT_TRACING=0).")
+if tracing.TRACE_SINK != "sqlite":
+    st.info(f"Spans are exported to the {tracing.TRACE_SINK} sink; only SQLite traces are shown here.")
+if not spans:
+    st.write("No spans recorded in this window yet.")
+    st.stop()
+
+st.subheader("Latency per step")
+st.caption(f"{len(spans)} spans in the last {window}")
+st.table(tracing.span_stats(spans))
+
+st.subheader("Recent traces")
+children = defaultdict(list)
+for s in spans:
+    children[s["parent_id"]].append(s)
+roots = [s for s in spans if s["parent_id"] is None][:20]
+
+def render(s, depth=0):
+    attrs = ", ".join(f"{key}={value}" for key, value in s["attrs"].items())
+    marker = " ❌" if s["error"] else ""
+    lines = [f"{'    ' * depth}{s['name']}  {s['duration_ms']:.1f} ms{marker}  {attrs}"]
+    for child in sorted(children[s["span_id"]], key=lambda c: c["start"]):
+        lines.extend(render(child, depth + 1))
+    return lines
+
+for root in roots:
+    label = time.strftime("%H:%M:%S", time.localtime(root["start"]))
+    with st.expander(f"{label}  {root['name']}  {root['duration_ms']:.0f} ms" + ("  ❌" if root["error"] else "")):
+        st.code("\n".join(render(root)), language=None)
+
+with st.expander("Time to first token (this process)"):
+    st.table({name: ttft_percentiles(name) for name in list(TTFT_SAMPLES)})
+with st.expander("Throttling (this process)"):
+    st.table(throttle_stats())
+with st.expander("Warm-up (this process)"):
+    st.table(warmup_stats())
+with st.expander("Semantic answer cache (this process)"):
+    answer_cache = get_semantic_cache()
+    st.table({**answer_cache.stats, "entries": len(answer_cache), "threshold": answer_cache.threshold})
@@ -1,32 +1,24 @@
 
 
 import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
-import re
-from typing import List
-
-def llm_call(prompt: str, system_prompt: str = "", llm: ChatGoogleGenerativeAI = None) -> str:
-    """Calls the LLM with the given prompt and returns the response."""
-    if system_prompt:
-        prompt = f"{system_prompt}\n{prompt}"
-    response = llm.invoke(prompt)
-    return response.content
-
-def extract_xml(text: str, tag: str) -> str:
-    """Extracts the content of the specified XML tag from the given text."""
-    match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
-    return match.group(1) if match else ""
-
-def chain(input: str, prompts: List[str], llm: ChatGoogleGenerativeAI) -> str:
-    """Chain multiple LLM calls sequentially, passing results between steps."""
-    result = input
-    for i, prompt in enumerate(prompts, 1):
-        print(f"\nStep {i}:")
-        result = llm_call(f"{prompt}\nInput: {result}", llm=llm)
-        print(result)
-    return result
+import itertools
+import time
+from step_graph import stream_steps
+from hdl_facts import analyze_design
+from hdl_ingest import IncrementalDesign, ingest_design
+from llm_cache import get_cache
+from llm_chain import llm_stream
+from prompts import VerilogDesigncopilot, verilog_processing_steps
+from router import MODEL_CHOICES, select_model, warm_model
+from service import QueueFullError, get_service, session_user_id
+from streaming import TimedStream
+from throttle import throttle_stats
+from warmup import warm_up
 
 st.title("Chip Design Copilot report generator based on Agentic Workflows")
+model_name = st.sidebar.selectbox("Model", MODEL_CHOICES, help="'router' sends analysis steps to the strong tier and formatting steps to the fastest cheap model, failing over between providers")
+# Build the chosen model and load its SDK in the background while the page renders (once per process)
+warm_up({"response_cache": get_cache, f"model:{model_name}": lambda: warm_model(model_name)})
 
 # Input for Verilog code
 verilog_code = st.text_area("Enter your Verilog code here:", value="""
@@ -40,42 +32,94 @@ module example (
 endmodule
 """)
 
-# Define the prompt chaining steps
-data_processing_steps = [
-    """Analyze the uploaded Verilog code, offer suggestions for optimization and debugging.""",
-    f"""Verilog code: \n
-""",
-    """Highlight any potential issues or areas for improvement in the design, including:
-        * Performance
-        * Reliability
-        * Cost
-        * Security
-        * Area
-        * Pin count
-        * Manufacturing complexity""",
-    """Suggest how the traditional chip design can be upgraded with AI capabilities.""",
-    """Generate a blueprint report of the chip design detailing:
-        * The current architecture and its analysis
-        * Suggested improvements for optimization covering performance, reliability, cost, security, area, pin count, and manufacturing complexity
-        * How AI can be incorporated into the existing design""",
-    """Mention and describe the changes incorporated during the upgrade to AI-enhanced design.""",
-    """Use technical terminology appropriately and provide explanations for complex concepts.""",
-    """Present the information in a clear and organized manner. Use headings, bullet points, and formatting to enhance readability.""",
-    """Remember the user may not be an expert in chip design; explain technical concepts in simple terms""",
-]
-
-# Define the initial input (Designcopilot)
-Designcopilot = """Expert Chip Design Copilot Agent specializing in analyzing Verilog code. Your role is to assist users in understanding and improving their chip designs by providing detailed analysis and suggestions for optimization and debugging. Begin by analyzing the Verilog code or VHDL code provided by the user."""
+def generate_report(job, verilog_code, llm, design_state):
+    """Job body: ingests the design, then streams the report.
+
+    The first report runs the whole step graph. After an edit, one call revises the previous report
+    for the changed units, so the cost follows the size of the edit; an unchanged design reuses it.
+    Jobs for the same design state run one after another.
+    """
+    def on_step(name, output, seconds):
+        job.emit("step", f"Finished step {name} in {seconds:.2f}s")
+    with design_state.lock:
+        # Summarize each module/entity in parallel so the report steps only see a compact digest
+        facts = analyze_design(verilog_code)
+        job.emit("facts", facts)
+        digest, unit_timings = ingest_design(verilog_code, llm, on_unit=on_step, facts=facts, state=design_state)
+        run = design_state.last_run
+        if not run["units"]:
+            yield "No HDL source was provided. Enter Verilog or VHDL code to generate a report."
+            return
+        job.emit("step", f"Re-analyzed {len(run['changed']) + len(run['dependents'])} of {run['units']} design units "
+                         f"({len(run['dependents'])} because a module they instantiate changed)")
+        revision = design_state.revision_prompt(facts)
+        step_timings = {}
+        if revision is not None and not design_state.changed():
+            job.emit("step", "No design unit changed; showing the previous report")
+            yield design_state.report
+            job.emit("timings", unit_timings)
+            return
+        if revision is not None:
+            job.emit("step", "Revising the previous report for the changed units")
+            report_stream = llm_stream(revision, llm=llm, step="report_revision")
+        else:
+            report_stream, step_timings = stream_steps(f"{VerilogDesigncopilot}\n\n{digest}", verilog_processing_steps,
+                                                       llm, on_step=on_step)
+        parts = []
+        start = time.perf_counter()
+        for chunk in report_stream:
+            parts.append(chunk)
+            yield chunk
+        if revision is not None:
+            step_timings["report_revision"] = time.perf_counter() - start
+        design_state.report = "".join(parts)  # Only a completed report is revised next time
+        job.emit("timings", {**unit_timings, **step_timings})
 
 # Button to trigger report generation
 if st.button("Generate Report"):
-    # Initialize Google Generative AI
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.0)  # Replace with your Google model
-    # Perform prompt chaining
-    formatted_result = chain(Designcopilot, data_processing_steps, llm)
-
-    # Display the generated report
-    st.markdown(formatted_result)
+    # Shared process-wide router or single model
+    llm = select_model(model_name)
+    # Per-module summaries and the last report survive reruns, so an edit re-analyzes only the edited modules
+    # and the modules above them, and revises the report for them
+    if "design_state" not in st.session_state:
+        st.session_state.design_state = IncrementalDesign()
+    # Queue the report on the shared job service instead of running it on the script thread
+    start = time.perf_counter()
+    service = get_service()
+    try:
+        job_id = service.submit(session_user_id(st.session_state), generate_report, verilog_code, llm,
+                                st.session_state.design_state, name="verilog_report")
+    except QueueFullError as e:
+        st.warning(f"{e}. Please wait for your earlier reports to finish.")
+        st.stop()
+    results = {"facts": {}, "timings": {}}
+    with st.status("Preparing report...", expanded=False) as status:
+        def on_event(kind, data):
+            if kind in results:
+                results[kind] = data
+            else:
+                status.write(data)
+        chunks = service.stream(job_id, on_event=on_event)
+        first_chunk = next(chunks, "")  # Progress is written to the status box until the report starts
+        status.update(label="Writing report...", state="complete")
+
+    # Display the generated report as it streams in
+    report_stream = TimedStream(itertools.chain([first_chunk], chunks), name="report", start=start)
+    st.write_stream(report_stream)
+    st.caption(report_stream.summary())
+
+    # Show per-step wall time and response cache hits and misses
+    with st.expander("Step timings"):
+        st.table({step: {"seconds": round(seconds, 2)} for step, seconds in results["timings"].items()})
+    with st.expander("Structural facts"):
+        st.json(results["facts"])
+    with st.expander("Cache statistics"):
+        st.table({step: counts for step, counts in get_cache().stats.items()})
+    if hasattr(llm, "summary"):
+        with st.expander("Provider latency"):
+            st.table(llm.summary())
+    with st.expander("Throttling"):
+        st.table(throttle_stats())
 
 
 
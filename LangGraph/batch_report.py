@@ -0,0 +1,141 @@
+"""Headless batch report generation over directories of Verilog/SystemVerilog/VHDL files.
+
+Example, from the LangGraph directory (needs GOOGLE_API_KEY):
+
+    python batch_report.py ../rtl --out reports --concurrency 4 --rpm 15 --tpm 1000000
+
+Writes one Markdown report per design plus reports/summary.jsonl, and skips designs whose
+report is already current for the same source, prompts and model. All designs share the model's
+throttle, so calls queue just under the quota and rate limits are retried instead of failing a design.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from hdl_ingest import ingest_design
+from models import get_chat_model
+from prompts import DIGEST_REDUCE_PROMPT, MODULE_SUMMARY_PROMPT, VerilogDesigncopilot, verilog_processing_steps
+from step_graph import run_steps
+from throttle import configure_throttle, throttle_stats
+
+HDL_EXTENSIONS = (".v", ".sv", ".vhd", ".vhdl")
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+
+def find_designs(patterns: List[str]) -> List[str]:
+    """Expands directories (recursively) and glob patterns into a sorted list of HDL files."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(os.path.join(root, name) for name in names if name.lower().endswith(HDL_EXTENSIONS))
+        else:
+            files.update(path for path in glob.glob(pattern, recursive=True)
+                         if os.path.isfile(path) and path.lower().endswith(HDL_EXTENSIONS))
+    return sorted(files)
+
+
+def design_input(source: str, llm) -> str:
+    """Builds the chain input for one design from its per-module digest."""
+    digest, _ = ingest_design(source, llm)
+    return f"{VerilogDesigncopilot}\n\n{digest}"
+
+
+def report_fingerprint(source: str, model: str) -> str:
+    """Identifies a report by everything that determines its content."""
+    digest = hashlib.sha256()
+    parts = [model, source, MODULE_SUMMARY_PROMPT, DIGEST_REDUCE_PROMPT]
+    for part in parts + [f"{step.name}:{step.prompt}:{step.inputs}" for step in verilog_processing_steps]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def report_path(path: str, root: str, out_dir: str) -> str:
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    return os.path.join(out_dir, relative + ".md")
+
+
+def is_current(report: str, fingerprint: str) -> bool:
+    """True if the report exists and was generated from the same fingerprint."""
+    try:
+        with open(report, encoding="utf-8") as f:
+            return f.readline().strip() == f"<!-- fingerprint: {fingerprint} -->"
+    except FileNotFoundError:
+        return False
+
+
+def process(path: str, report: str, llm, model: str, force: bool) -> Dict:
+    """Generates the report for one design unless it is already current."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        source = f.read()
+    fingerprint = report_fingerprint(source, model)
+    entry = {"file": path, "report": report, "fingerprint": fingerprint}
+    if not force and is_current(report, fingerprint):
+        return {**entry, "status": "skipped"}
+    start = time.perf_counter()
+    try:
+        result, timings = run_steps(design_input(source, llm), verilog_processing_steps, llm)
+    except Exception as e:
+        return {**entry, "status": "failed", "error": str(e), "seconds": time.perf_counter() - start}
+    os.makedirs(os.path.dirname(report) or ".", exist_ok=True)
+    tmp_path = report + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"<!-- fingerprint: {fingerprint} -->\n# {os.path.basename(path)}\n\n{result}\n")
+    os.replace(tmp_path, report)
+    return {**entry, "status": "generated", "seconds": time.perf_counter() - start, "step_seconds": timings}
+
+
+def run_batch(patterns: List[str], out_dir: str, llm, model: str, concurrency: int = 4,
+              force: bool = False) -> List[Dict]:
+    """Processes all designs with a bounded pool and writes summary.jsonl; returns the summary entries."""
+    files = find_designs(patterns)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]) if files else ""
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(process, path, report_path(os.path.abspath(path), root, out_dir), llm, model, force): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            entry = future.result()
+            entries.append(entry)
+            print(f"[{len(entries)}/{len(files)}] {entry['status']:<9} {entry['file']}")
+    entries.sort(key=lambda entry: entry["file"])
+    with open(os.path.join(out_dir, "summary.jsonl"), "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="Directories or glob patterns of .v/.sv/.vhd files")
+    parser.add_argument("--out", default="reports", help="Output directory for reports and summary.jsonl")
+    parser.add_argument("--concurrency", type=int, default=4, help="Designs processed at once")
+    parser.add_argument("--rpm", type=float, help="Provider requests-per-minute quota (default: provider free tier, 0 = unlimited)")
+    parser.add_argument("--tpm", type=float, help="Provider tokens-per-minute quota (default: provider free tier, 0 = unlimited)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help='"provider:model"; the provider defaults to google')
+    parser.add_argument("--force", action="store_true", help="Regenerate reports even if they are current")
+    args = parser.parse_args()
+
+    key = args.model if ":" in args.model else f"google:{args.model}"
+    if args.rpm is not None or args.tpm is not None:
+        configure_throttle(key, rpm=args.rpm, tpm=args.tpm)
+    llm = get_chat_model(key)
+    entries = run_batch(args.paths, args.out, llm, args.model, args.concurrency, args.force)
+    counts = {status: sum(entry["status"] == status for entry in entries) for status in ("generated", "skipped", "failed")}
+    print(", ".join(f"{count} {status}" for status, count in counts.items()))
+    for name, stats in throttle_stats().items():
+        print(f"{name}: {stats['calls']} calls, {stats['throttled']} throttled ({stats['throttle_seconds']}s queued), "
+              f"{stats['retried']} retried, {stats['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
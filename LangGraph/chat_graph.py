@@ -0,0 +1,133 @@
+"""The chatbot's graph and job bodies, without Streamlit.
+
+Chatbot.py renders the page and follows the jobs; the benchmark suite runs the same graph and
+turn logic with a replayed model and an offline search backend.
+
+    job_id, match = start_turn(service, user_id, get_graph, user_input, config, opening=True)
+"""
+import os
+from typing import Annotated, Callable, List, Optional, Tuple, TypedDict
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import tools_condition
+
+from doc_index import get_doc_index, make_retriever_tool
+from memory import ConversationMemory, compact_tool_payload, estimate_tokens, llm_summarizer, message_content
+from models import get_chat_model
+from search_cache import CachedSearch, get_search, make_search_tool
+from semantic_cache import Match, answer_namespace, get_semantic_cache
+from service import CopilotService
+from streaming import chunk_text
+from throttle import describe_failure
+from tool_executor import ToolExecutor
+from tracing import span
+
+CHAT_MODEL = "google:gemini-1.5-flash"
+# Bump when the prompt or tools change so answers cached for the old version stop being served
+ANSWER_VERSION = os.getenv("CHATBOT_ANSWER_VERSION", "2")
+ANSWER_NAMESPACE = answer_namespace(CHAT_MODEL, ANSWER_VERSION)
+
+
+class State(TypedDict):
+    messages: Annotated[List[dict], add_messages]
+    summary: str  # Rolling summary of turns that fell out of the verbatim window
+    summarized: int  # Number of leading messages covered by the summary
+
+
+def chat_tools(search: Optional[CachedSearch] = None) -> List:
+    """The local reference docs, tried before the web, and the cached, coalesced web search."""
+    # No human-assistance tool: tools run on job and executor threads, where Streamlit widgets cannot render
+    return [make_retriever_tool(get_doc_index()), make_search_tool(search or get_search(max_results=2))]
+
+
+def build_graph(checkpointer, llm=None, tools: Optional[List] = None):
+    """Builds the tools, model binding, memory and compiled graph; called once per process, not on every rerun.
+
+    `llm` defaults to the shared CHAT_MODEL and `tools` to chat_tools().
+    """
+    tools = chat_tools() if tools is None else tools
+    llm = llm or get_chat_model(CHAT_MODEL)  # Shared by all sessions of the process
+    llm_with_tools = llm.bind_tools(tools)
+
+    # Keep the model context bounded: recent turns verbatim, older turns summarized
+    memory = ConversationMemory(
+        token_budget=int(os.getenv("CHATBOT_TOKEN_BUDGET", 4000)),
+        keep_turns=int(os.getenv("CHATBOT_KEEP_TURNS", 4)),
+        summarize=llm_summarizer(llm),
+    )
+
+    # Run every tool call of an assistant message concurrently, once per distinct call
+    tool_executor = ToolExecutor(
+        tools,
+        timeout=float(os.getenv("CHATBOT_TOOL_TIMEOUT", 20)),
+        format_result=lambda result: compact_tool_payload(result, memory.tool_payload_chars),
+    )
+
+    # Chatbot function: calls the model only; requested tools run once in the "tools" node
+    def chatbot(state: State):
+        context, summary, summarized = memory.prepare(
+            state["messages"], state.get("summary", ""), state.get("summarized", 0)
+        )
+        with span("chatbot_node", messages=len(context), summarized=summarized) as s:
+            try:
+                message = llm_with_tools.invoke(context)  # Queued under the provider quota, rate limits retried
+            except Exception as e:
+                # Say what failed once the retries are exhausted; marked so it is never cached as an answer
+                message = AIMessage(content=describe_failure(e), additional_kwargs={"error": type(e).__name__})
+                s.set(failed=type(e).__name__)
+            s.set(tool_calls=len(getattr(message, "tool_calls", None) or []), tokens_out=estimate_tokens(message))
+        return {"messages": [message], "summary": summary, "summarized": summarized}
+
+    def run_tools(state: State):
+        """Executes the tool calls of the last assistant message concurrently."""
+        return {"messages": tool_executor.run(state["messages"][-1].tool_calls)}
+
+    # Graph setup
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_node("tools", run_tools)
+    graph_builder.add_conditional_edges("chatbot", tools_condition)
+    graph_builder.add_edge("tools", "chatbot")
+    graph_builder.add_edge(START, "chatbot")
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def stream_reply(job, get_graph: Callable, state: State, config: dict, cache_question: str = None):
+    """Job body: streams the chatbot node's tokens from the graph; the checkpointer stores the resulting state.
+
+    `get_graph` is called on the job thread, so a graph still being built holds up the job, not the page.
+    With `cache_question` the final answer is stored in the semantic cache, unless the model call failed.
+    """
+    graph = get_graph()
+    for chunk, metadata in graph.stream(state, config, stream_mode="messages"):
+        if metadata.get("langgraph_node") == "chatbot":
+            yield chunk_text(chunk)
+    if cache_question:
+        answer = graph.get_state(config).values["messages"][-1]
+        if not answer.additional_kwargs.get("error") and message_content(answer):
+            get_semantic_cache().store(cache_question, ANSWER_NAMESPACE, message_content(answer))
+
+
+def replay_answer(job, get_graph: Callable, state: State, config: dict, answer: str):
+    """Job body: records a cached answer in the thread as if the chatbot node had produced it."""
+    get_graph().update_state(config, {"messages": state["messages"] + [AIMessage(content=answer)]},
+                             as_node="chatbot")
+    yield answer
+
+
+def start_turn(service: CopilotService, user_id: str, get_graph: Callable, user_input: str, config: dict,
+               opening: bool) -> Tuple[str, Optional[Match]]:
+    """Submits one chat turn and returns (job id, the semantic cache match it replays, if any).
+
+    Only an opening question stands on its own, so only those are answered from and stored in the
+    semantic cache; later turns depend on the conversation so far. Raises QueueFullError.
+    """
+    state = {"messages": [{"role": "user", "content": user_input}]}
+    match = get_semantic_cache().lookup(user_input, ANSWER_NAMESPACE) if opening else None
+    if match:
+        return service.submit(user_id, replay_answer, get_graph, state, config, match.answer,
+                              name="chat_turn_cached"), match
+    return service.submit(user_id, stream_reply, get_graph, state, config, user_input if opening else None,
+                          name="chat_turn"), None
@@ -0,0 +1,318 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "chatbot_checkpoints.sqlite")
+SNAPSHOT_EVERY = 50  # Store a full copy of a list channel after this many deltas
+RECENT_VALUES = 256  # Channel values kept in memory to diff the next turn against
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB,
+    base_version TEXT,
+    start INTEGER NOT NULL DEFAULT 0,
+    length INTEGER,
+    depth INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SQLiteDeltaSaver(BaseCheckpointSaver):
+    """File-local SQLite checkpointer that stores only what changed in each checkpoint.
+
+    Channels are written only when their version changes, and list channels such as `messages`
+    are stored as the items appended since the previous version, with a full snapshot every
+    SNAPSHOT_EVERY turns to bound reconstruction cost.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, serde=None, snapshot_every: int = SNAPSHOT_EVERY):
+        super().__init__(serde=serde)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._recent: "OrderedDict[Tuple[str, str, str, str], Tuple[Any, int]]" = OrderedDict()
+
+    # Channel blobs
+
+    def _remember(self, key: Tuple[str, str, str, str], value: Any, depth: int) -> None:
+        self._recent[key] = (list(value) if isinstance(value, list) else value, depth)
+        self._recent.move_to_end(key)
+        while len(self._recent) > RECENT_VALUES:
+            self._recent.popitem(last=False)
+
+    def _load_channel(self, thread_id: str, ns: str, channel: str, version: str) -> Optional[Tuple[Any, int]]:
+        key = (thread_id, ns, channel, version)
+        if key in self._recent:
+            value, depth = self._recent[key]
+            return (list(value) if isinstance(value, list) else value), depth
+        row = self.conn.execute(
+            "SELECT value_type, value, base_version, depth FROM blobs "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            (thread_id, ns, channel, version),
+        ).fetchone()
+        if row is None or row[0] == "empty":
+            return None
+        value = self.serde.loads_typed((row[0], row[1]))
+        if row[2] is not None:
+            base = self._load_channel(thread_id, ns, channel, row[2])
+            value = (base[0] if base else []) + value
+        self._remember(key, value, row[3])
+        return value, row[3]
+
+    def _put_channel(self, thread_id: str, ns: str, channel: str, version: str, value: Any,
+                     base_version: Optional[str]) -> None:
+        base = None
+        if isinstance(value, list) and base_version is not None and base_version != version:
+            base = self._load_channel(thread_id, ns, channel, base_version)
+        if (base is not None and isinstance(base[0], list) and base[1] + 1 < self.snapshot_every
+                and len(base[0]) <= len(value) and value[:len(base[0])] == base[0]):
+            start, depth = len(base[0]), base[1] + 1
+            value_type, blob = self.serde.dumps_typed(value[start:])
+        else:
+            base_version, start, depth = None, 0, 0
+            value_type, blob = self.serde.dumps_typed(value)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, value_type, value, "
+            "base_version, start, length, depth) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, ns, channel, version, value_type, blob, base_version, start,
+             len(value) if isinstance(value, list) else None, depth),
+        )
+        self._remember((thread_id, ns, channel, version), value, depth)
+
+    # BaseCheckpointSaver interface
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values", {})
+        with self.lock:
+            parent_versions = self._checkpoint_versions(thread_id, ns, parent_id) if parent_id else {}
+            for channel, version in new_versions.items():
+                if channel in values:
+                    self._put_channel(thread_id, ns, channel, str(version), values[channel],
+                                      _version_key(parent_versions.get(channel)))
+                else:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO blobs (thread_id, checkpoint_ns, channel, version, value_type) "
+                        "VALUES (?, ?, ?, ?, 'empty')",
+                        (thread_id, ns, channel, str(version)),
+                    )
+            checkpoint_type, checkpoint_blob = self.serde.dumps_typed(stored)
+            metadata_type, metadata_blob = self.serde.dumps_typed(dict(metadata))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "checkpoint_type, checkpoint, metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, ns, checkpoint["id"], parent_id, checkpoint_type, checkpoint_blob,
+                 metadata_type, metadata_blob),
+            )
+            self.conn.commit()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        configurable = config["configurable"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append((configurable["thread_id"], configurable.get("checkpoint_ns", ""),
+                         configurable["checkpoint_id"], task_id, WRITES_IDX_MAP.get(channel, idx),
+                         channel, value_type, blob, task_path))
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, "
+                "value_type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable.get("checkpoint_id")
+        query = ("SELECT checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata "
+                 "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?")
+        with self.lock:
+            if checkpoint_id:
+                row = self.conn.execute(query + " AND checkpoint_id = ?", (thread_id, ns, checkpoint_id)).fetchone()
+            else:
+                row = self.conn.execute(query + " ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, ns)).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, ns, row)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints WHERE 1 = 1")
+        params: List[Any] = []
+        if config is not None:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if "checkpoint_ns" in config["configurable"]:
+                query += " AND checkpoint_ns = ?"
+                params.append(config["configurable"]["checkpoint_ns"])
+        if before is not None:
+            query += " AND checkpoint_id < ?"
+            params.append(before["configurable"]["checkpoint_id"])
+        query += " ORDER BY checkpoint_id DESC"
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        returned = 0
+        for row in rows:
+            if limit is not None and returned >= limit:
+                break
+            with self.lock:
+                item = self._to_tuple(row[0], row[1], row[2:])
+            if filter and any(item.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            returned += 1
+            yield item
+
+    def _checkpoint_versions(self, thread_id: str, ns: str, checkpoint_id: str) -> Dict[str, Any]:
+        row = self.conn.execute(
+            "SELECT checkpoint_type, checkpoint FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, ns, checkpoint_id),
+        ).fetchone()
+        return self.serde.loads_typed((row[0], row[1])).get("channel_versions", {}) if row else {}
+
+    def _to_tuple(self, thread_id: str, ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_id = row[0], row[1]
+        checkpoint = self.serde.loads_typed((row[2], row[3]))
+        values = {}
+        for channel, version in checkpoint.get("channel_versions", {}).items():
+            loaded = self._load_channel(thread_id, ns, channel, str(version))
+            if loaded is not None:
+                values[channel] = loaded[0]
+        checkpoint["channel_values"] = values
+        writes = self.conn.execute(
+            "SELECT task_id, channel, value_type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed((row[4], row[5])),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_type, value)))
+                            for task_id, channel, value_type, value in writes],
+        )
+
+    # History paging for the UI
+
+    def load_messages(self, thread_id: str, limit: int = 20, offset: int = 0, channel: str = "messages",
+                      ns: str = "") -> Tuple[List[Any], int]:
+        """Returns up to `limit` messages ending `offset` messages before the latest one, and the total count.
+
+        Only the delta rows that overlap the requested page are deserialized.
+        """
+        with self.lock:
+            latest = self.conn.execute(
+                "SELECT checkpoint_type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, ns),
+            ).fetchone()
+            if latest is None:
+                return [], 0
+            version = _version_key(self.serde.loads_typed(latest).get("channel_versions", {}).get(channel))
+            pieces = []
+            total = None
+            while version is not None:
+                row = self.conn.execute(
+                    "SELECT base_version, start, length FROM blobs "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, ns, channel, version),
+                ).fetchone()
+                if row is None or row[2] is None:
+                    break
+                base_version, start, length = row
+                if total is None:
+                    total = length
+                    hi = max(total - offset, 0)
+                    lo = max(hi - limit, 0)
+                if start < hi:
+                    pieces.append((version, start))
+                if start <= lo:
+                    break
+                version = base_version
+            if total is None:
+                return [], 0
+            page: List[Any] = []
+            for version, start in reversed(pieces):
+                value_type, blob = self.conn.execute(
+                    "SELECT value_type, value FROM blobs "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, ns, channel, version),
+                ).fetchone()
+                items = self.serde.loads_typed((value_type, blob))
+                page.extend(items[max(lo - start, 0):max(hi - start, 0)])
+            return page, total
+
+    def list_threads(self, limit: int = 20, ns: str = "") -> List[str]:
+        """Returns the most recently active thread ids."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT thread_id FROM checkpoints WHERE checkpoint_ns = ? "
+                "GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC LIMIT ?",
+                (ns, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+def _version_key(version) -> Optional[str]:
+    return None if version is None else str(version)
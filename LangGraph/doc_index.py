@@ -0,0 +1,296 @@
+"""Local retrieval index over EDA/HDL reference documents, searched before going to the web.
+
+Markdown, text and PDF files (the bundled Medium post by default; COPILOT_DOCS lists files or
+directories, separated by os.pathsep) are split into overlapping passages of a few paragraphs.
+The passages are embedded offline with embeddings.HashingEmbedder into the rows of a
+memory-mapped float32 matrix; their text and the state of every ingested file live in SQLite
+next to it. update() only re-reads files whose size or modification time changed and only
+re-embeds files whose content changed, reusing the rows of passages it drops.
+
+A search is one matrix product for a whole batch of queries followed by an argpartition top-k per
+query, so the multi-agent pipeline retrieves for all of its dimensions at once.
+
+    python doc_index.py --query "check_timing syntax in Design Compiler"
+    python doc_index.py ~/eda-docs --query "create a design library in Cadence Virtuoso"
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from embeddings import HashingEmbedder, get_embedder
+from llm_cache import CACHE_DIR
+from tracing import span
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCES = os.getenv("COPILOT_DOCS", os.path.join(ROOT, "Medium_Post_AI_Agents_in_Hardware_Design.pdf")).split(os.pathsep)
+DOC_EXTENSIONS = (".md", ".markdown", ".txt", ".rst", ".pdf")
+PASSAGE_CHARS = int(os.getenv("COPILOT_DOC_PASSAGE_CHARS", 1200))
+PASSAGE_OVERLAP = 200
+MIN_SCORE = 0.2  # Passages below this share little more than common words with the query
+INITIAL_ROWS = 1024
+HEADING = re.compile(r"^#{1,6}\s+(.+)$", re.MULTILINE)
+
+
+class Passage(NamedTuple):
+    score: float
+    source: str
+    location: str
+    text: str
+
+
+def read_sections(path: str) -> List[Tuple[str, str]]:
+    """(location, text) sections of a document: PDF pages, Markdown headings, or the whole text file."""
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader  # Optional; only needed for PDF documents
+
+        return [(f"p. {number}", page.extract_text() or "")
+                for number, page in enumerate(PdfReader(path).pages, 1)]
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    starts = [match.start() for match in HEADING.finditer(text)]
+    if not starts:
+        return [("", text)]
+    sections = [("", text[:starts[0]])] if starts[0] else []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        body = text[start:end]
+        sections.append((HEADING.match(body).group(1).strip(), body))
+    return sections
+
+
+def split_passages(text: str, max_chars: int = PASSAGE_CHARS, overlap: int = PASSAGE_OVERLAP) -> List[str]:
+    """Paragraph-aligned passages of at most ~max_chars, each repeating the end of the previous one."""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    pieces = []
+    for paragraph in paragraphs:  # Paragraphs longer than a passage are cut at sentence ends
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(". ", 0, max_chars) + 1 or max_chars
+            pieces.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        pieces.append(paragraph)
+    passages, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            passages.append(current)
+            current = current[-overlap:].split(" ", 1)[-1] if overlap else ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def document_files(sources: Iterable[str]) -> List[str]:
+    """Supported documents among the given files and directories (recursively)."""
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for directory, _, names in os.walk(source):
+                files += [os.path.join(directory, name) for name in sorted(names) if name.lower().endswith(DOC_EXTENSIONS)]
+        elif os.path.isfile(source):
+            files.append(source)
+    return [os.path.abspath(path) for path in files]
+
+
+class DocIndex:
+    """Memory-mapped passage embeddings with batched cosine top-k search, backed by a SQLite passage store."""
+
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[HashingEmbedder] = None):
+        self.embedder = embedder or get_embedder()
+        self.directory = os.path.join(directory or os.path.join(CACHE_DIR, "docs"), self.embedder.name)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(self.directory, "passages.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS passages (
+                row INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                location TEXT NOT NULL,
+                text TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS passages_source ON passages (source)")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                digest TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        rows = [row for row, in self._conn.execute("SELECT row FROM passages")]
+        self._used = max(rows, default=-1) + 1  # Rows below this may hold a passage
+        self._open(max(INITIAL_ROWS, self._used))
+        self._live[rows] = True
+
+    def _open(self, capacity: int) -> None:
+        """Maps the vector file with room for `capacity` rows, growing the file and the row mask."""
+        size = capacity * self.embedder.dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.embedder.dim))
+        live = np.zeros(capacity, dtype=bool)
+        if hasattr(self, "_live"):
+            live[:len(self._live)] = self._live
+        self._live = live
+        self.capacity = capacity
+
+    def _rows(self, count: int) -> List[int]:
+        """`count` rows to write: free rows first, then new ones at the end of the matrix."""
+        rows = [int(row) for row in np.flatnonzero(~self._live[:self._used])[:count]]
+        extra = count - len(rows)
+        if self._used + extra > self.capacity:
+            capacity = self.capacity
+            while self._used + extra > capacity:
+                capacity *= 2
+            self._open(capacity)
+        rows += list(range(self._used, self._used + extra))
+        self._used += extra
+        return rows
+
+    def _drop(self, path: str) -> None:
+        rows = [row for row, in self._conn.execute("SELECT row FROM passages WHERE source = ?", (path,))]
+        self._live[rows] = False
+        self._conn.execute("DELETE FROM passages WHERE source = ?", (path,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def update(self, sources: Iterable[str] = DEFAULT_SOURCES) -> Dict[str, int]:
+        """Brings the index in line with the documents under `sources`; returns what changed."""
+        changes = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "passages": 0, "failed": 0}
+        paths = document_files(sources)
+        with self._lock, span("doc_index_update", files=len(paths)) as s:
+            known = {path: (size, mtime, digest)
+                     for path, size, mtime, digest in self._conn.execute("SELECT path, size, mtime, digest FROM files")}
+            for path in set(known) - set(paths):
+                self._drop(path)
+                changes["removed"] += 1
+            for path in paths:
+                stat = os.stat(path)
+                if path in known and known[path][:2] == (stat.st_size, stat.st_mtime):
+                    changes["unchanged"] += 1
+                    continue
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                if path in known and known[path][2] == digest:  # Touched, not edited
+                    self._conn.execute("UPDATE files SET size = ?, mtime = ? WHERE path = ?",
+                                       (stat.st_size, stat.st_mtime, path))
+                    changes["unchanged"] += 1
+                    continue
+                try:
+                    passages = [(location, text) for location, section in read_sections(path)
+                                for text in split_passages(section)]
+                except Exception as e:  # Unreadable file or pypdf not installed: keep the previous passages
+                    s.set(failed=f"{os.path.basename(path)}: {type(e).__name__}")
+                    changes["failed"] += 1
+                    continue
+                changes["updated" if path in known else "added"] += 1
+                self._drop(path)
+                rows = self._rows(len(passages))
+                if rows:
+                    self._vectors[rows] = self.embedder.embed_many(
+                        f"{os.path.basename(path)} {location}\n{text}" for location, text in passages)
+                    self._live[rows] = True
+                self._conn.executemany("INSERT OR REPLACE INTO passages (row, source, location, text) VALUES (?, ?, ?, ?)",
+                                       [(row, path, location, text) for row, (location, text) in zip(rows, passages)])
+                self._conn.execute("INSERT INTO files (path, size, mtime, digest) VALUES (?, ?, ?, ?)",
+                                   (path, stat.st_size, stat.st_mtime, digest))
+                changes["passages"] += len(passages)
+            self._vectors.flush()
+            self._conn.commit()
+            s.set(**{key: value for key, value in changes.items() if value})
+        return changes
+
+    def search_many(self, queries: List[str], k: int = 3, min_score: float = MIN_SCORE) -> List[List[Passage]]:
+        """The k best passages for each query, best first; one matrix product for the whole batch."""
+        if not queries:
+            return []
+        matrix = self.embedder.embed_many(queries)
+        with self._lock, span("doc_search", queries=len(queries), k=k) as s:
+            scores = matrix @ self._vectors[:self._used].T
+            scores[:, ~self._live[:self._used]] = -1.0
+            if k < scores.shape[1]:
+                top = np.argpartition(-scores, k, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(scores.shape[1]), (len(queries), 1))
+            wanted = []
+            for i, rows in enumerate(top):
+                wanted.append([int(row) for row in rows[np.argsort(-scores[i, rows])] if scores[i, row] >= min_score])
+            needed = sorted({row for rows in wanted for row in rows})
+            stored = {}
+            if needed:
+                placeholders = ",".join("?" * len(needed))
+                stored = {row: (source, location, text) for row, source, location, text in self._conn.execute(
+                    f"SELECT row, source, location, text FROM passages WHERE row IN ({placeholders})", needed)}
+            s.set(passages=len(needed))
+        return [[Passage(float(scores[i, row]), *stored[row]) for row in rows if row in stored]
+                for i, rows in enumerate(wanted)]
+
+    def search(self, query: str, k: int = 3, min_score: float = MIN_SCORE) -> List[Passage]:
+        return self.search_many([query], k, min_score)[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._live[:self._used]))
+
+
+def format_passages(passages: List[Passage]) -> str:
+    """Passages as prompt context, each headed by its document and page or section."""
+    return "\n\n".join(
+        f"[{os.path.basename(p.source)}{', ' + p.location if p.location else ''}]\n{p.text}" for p in passages
+    )
+
+
+_index: Optional[DocIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_doc_index() -> DocIndex:
+    """Returns the process-wide index, brought up to date with DEFAULT_SOURCES on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = DocIndex()
+            index.update()
+            _index = index
+        return _index
+
+
+def make_retriever_tool(index: DocIndex, k: int = 3):
+    """Wraps the index as a LangChain tool the chatbot can call before searching the web."""
+    from langchain_core.tools import tool
+
+    @tool("search_reference_docs")
+    def search_reference_docs(query: str) -> List[Dict[str, Any]]:
+        """Searches the local EDA, HDL and chip design reference documents. Use this first for questions about
+        tool commands, syntax, flows and concepts; use the web search only if it returns nothing relevant."""
+        return [{"source": os.path.basename(p.source), "location": p.location, "score": round(p.score, 3),
+                 "content": p.text} for p in index.search(query, k)]
+    return search_reference_docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES, help="Documents or directories to index")
+    parser.add_argument("--query", action="append", default=[], help="Search the index (repeatable)")
+    parser.add_argument("-k", type=int, default=3, help="Passages per query")
+    args = parser.parse_args()
+
+    index = DocIndex()
+    print(f"{index.update(args.sources)}; {len(index)} passages indexed")
+    for query, passages in zip(args.query, index.search_many(args.query, args.k)):
+        print(f"\n## {query}")
+        for p in passages:
+            print(f"{p.score:.2f}  {os.path.basename(p.source)} {p.location}: {p.text[:160]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Offline text embeddings for the semantic cache and the document index.
+
+No model download and no network: a text is reduced to normalized word stems, word bigrams and
+character trigrams, which are feature-hashed (signed) into a fixed number of dimensions with
+sublinear term weights and L2-normalized. The dot product of two embeddings is their cosine
+similarity, so a whole matrix of them is searched with one matrix-vector product.
+
+Paraphrases that share their key terms ("low power chip design" / "optimizing a chip design for
+low power", 0.85) score well above unrelated questions, which score near zero; rewordings with few
+words in common score lower ("how do I reduce power consumption of my chip", 0.4). A learned model would also match synonyms; swap in any object with the
+same name/dim/embed/embed_many surface if one is available.
+"""
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+DEFAULT_DIM = int(os.getenv("COPILOT_EMBED_DIM", 256))
+WORD = re.compile(r"[a-z0-9][a-z0-9_+]*")
+STOPWORDS = frozenset("""
+a about an and any are as at be but by can could do does for from give have how i in into is it its
+me my of on or our please should show tell than that the their them then there these this to us use
+using was we what when where which who why will with would you your explain describe write
+""".split())
+SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ied", "ers", "er", "ed", "es", "s")
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.7
+TRIGRAM_WEIGHT = 0.25
+
+
+def stem(word: str) -> str:
+    """Strips a common English suffix so "optimizing"/"optimization"/"optimized" share a stem."""
+    for suffix in SUFFIXES:
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased content word stems, without stopwords."""
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def features(text: str) -> Dict[str, float]:
+    """Weighted features of a text: stems, adjacent stem pairs and character trigrams of each stem."""
+    words = tokenize(text)
+    counts: Counter = Counter()
+    for word in words:
+        counts[f"w:{word}"] += 1
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            counts[f"c:{padded[i:i + 3]}"] += 1
+    for first, second in zip(words, words[1:]):
+        counts[f"b:{first} {second}"] += 1
+    weights = {"w": WORD_WEIGHT, "b": BIGRAM_WEIGHT, "c": TRIGRAM_WEIGHT}
+    return {feature: weights[feature[0]] * (1 + math.log(count)) for feature, count in counts.items()}
+
+
+class HashingEmbedder:
+    """Signed feature hashing into `dim` float32 dimensions."""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+        self._slots: Dict[str, int] = {}  # feature -> signed slot (+/- (index + 1)), memoized
+
+    def _slot(self, feature: str) -> int:
+        slot = self._slots.get(feature)
+        if slot is None:
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            slot = (value % self.dim + 1) * (1 if value >> 63 else -1)
+            if len(self._slots) < 200_000:
+                self._slots[feature] = slot
+        return slot
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in features(text).items():
+            slot = self._slot(feature)
+            vector[abs(slot) - 1] += weight if slot > 0 else -weight
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+
+_embedders: Dict[int, HashingEmbedder] = {}
+
+
+def get_embedder(dim: int = DEFAULT_DIM) -> HashingEmbedder:
+    """Returns the process-wide embedder for `dim` dimensions."""
+    return _embedders.setdefault(dim, HashingEmbedder(dim))
@@ -0,0 +1,593 @@
+"""Deterministic structural facts about an HDL design, computed without the LLM.
+
+A single pass over each design unit's tokens yields its port table, parameters, instances, always
+blocks, clock and reset domains, register bits and latches inferred from incomplete if/case
+statements; the units are then linked into a module graph.
+
+    python hdl_facts.py design.v > facts.json
+"""
+import ast
+import bisect
+import json
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from hdl_lexer import DesignUnit, detect_language, mask_comments, split_design_units
+
+TOKEN = re.compile(r"[A-Za-z_$][\w$]*|\d[\w']*|'[sS]?[bodhBODH]?[\w?]+|<=|>=|===|!==|==|!=|&&|\|\||\S")
+RESET_NAME = re.compile(r"(^|_)(rst|reset|clr|clear)(_?n|_b)?($|_)", re.IGNORECASE)
+CLOCK_NAME = re.compile(r"(^|_)(clk|clock)", re.IGNORECASE)
+# Bounds for constant expressions in ranges and parameters; larger values are treated as unknown
+MAX_CONSTANT = 2 ** 32
+MAX_SHIFT = 32
+
+DIRECTIONS = {"input", "output", "inout", "ref"}
+NET_TYPES = {"wire", "reg", "logic", "bit", "integer", "int", "byte", "shortint", "longint", "tri", "wand", "wor",
+             "supply0", "supply1", "uwire", "var", "signed", "unsigned", "genvar"}
+BLOCK_PREFIX = {"begin", "end", "endcase", "endgenerate", "endfunction", "endtask", "generate", "else", "fork", "join"}
+ALWAYS = {"always", "always_ff", "always_comb", "always_latch"}
+VERILOG_KEYWORDS = DIRECTIONS | NET_TYPES | BLOCK_PREFIX | ALWAYS | {
+    "module", "endmodule", "macromodule", "interface", "endinterface", "package", "endpackage", "program",
+    "endprogram", "assign", "parameter", "localparam", "defparam", "function", "task", "initial", "if", "case",
+    "casez", "casex", "for", "while", "repeat", "forever", "return", "typedef", "struct", "enum", "import",
+    "export", "modport", "clocking", "assert", "property", "sequence", "covergroup", "class", "default",
+    "posedge", "negedge", "or", "and", "not", "buf", "nand", "nor", "xor", "xnor", "automatic", "static", "const",
+}
+
+
+def _tokens(masked: str) -> List[Tuple[str, int]]:
+    return [(m.group(0), m.start()) for m in TOKEN.finditer(masked)]
+
+
+def _skip_group(tokens: List[Tuple[str, int]], i: int, open_: str = "(", close: str = ")") -> int:
+    """Given tokens[i] == open_, returns the index just past its matching close."""
+    depth = 0
+    while i < len(tokens):
+        if tokens[i][0] == open_:
+            depth += 1
+        elif tokens[i][0] == close:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+_OPERATORS = {ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+              ast.FloorDiv: lambda a, b: a // b, ast.Mod: lambda a, b: a % b,
+              ast.LShift: lambda a, b: a << b, ast.RShift: lambda a, b: a >> b}
+
+
+def _evaluate_node(node: ast.AST) -> Optional[int]:
+    """Integer value of a constant expression node, or None if it is not one or leaves MAX_CONSTANT."""
+    if isinstance(node, ast.Constant):
+        value = node.value if type(node.value) is int else None
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _evaluate_node(node.operand)
+        if value is not None and isinstance(node.op, ast.USub):
+            value = -value
+    elif isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        left, right = _evaluate_node(node.left), _evaluate_node(node.right)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, (ast.LShift, ast.RShift)) and not 0 <= right <= MAX_SHIFT:
+            return None
+        value = _OPERATORS[type(node.op)](left, right)
+    else:
+        return None
+    return value if value is not None and abs(value) <= MAX_CONSTANT else None
+
+
+def _evaluate(expression: str, parameters: Dict[str, str]) -> Optional[int]:
+    """Evaluates an integer constant expression over literals and already known parameters.
+
+    Operands are bounded by MAX_CONSTANT and shift counts by MAX_SHIFT, so a hostile range such as
+    [1<<(1<<40):0] reads as unknown width instead of exhausting memory.
+    """
+    expression = re.sub(r"\b[A-Za-z_]\w*\b", lambda m: f"({parameters.get(m.group(0), 'x')})", expression)
+    if not re.fullmatch(r"[\d\s()+\-*/%<>]*", expression) or len(expression) > 200:
+        return None
+    try:
+        return _evaluate_node(ast.parse(expression.replace("/", "//"), mode="eval").body)
+    except (SyntaxError, ArithmeticError, ValueError, MemoryError, RecursionError):
+        return None
+
+
+def _range_width(text: str, parameters: Dict[str, str]) -> Optional[int]:
+    """Width of a [msb:lsb] range, or None if its bounds are not constant."""
+    match = re.fullmatch(r"\[(.*):(.*)\]", text)
+    if match is None:
+        return None
+    msb, lsb = _evaluate(match.group(1), parameters), _evaluate(match.group(2), parameters)
+    return abs(msb - lsb) + 1 if msb is not None and lsb is not None else None
+
+
+class _BlockParser:
+    """Recursive-descent walk over one always block that tracks which signals every path assigns."""
+
+    def __init__(self, tokens: List[Tuple[str, int]], line_of):
+        self.tokens = tokens
+        self.line_of = line_of
+        self.first_if_condition: Optional[List[str]] = None
+        self.cases = 0
+
+    def statement(self, i: int) -> Tuple[int, Dict[str, int], Set[str]]:
+        """Parses one statement; returns (next index, signals maybe assigned -> line, signals always assigned)."""
+        tokens = self.tokens
+        token = tokens[i][0]
+        if token == "begin":
+            i += 1
+            if tokens[i][0] == ":":
+                i += 2
+            maybe: Dict[str, int] = {}
+            definite: Set[str] = set()
+            while tokens[i][0] != "end":
+                i, m, d = self.statement(i)
+                maybe = {**m, **maybe}
+                definite |= d
+            i += 1
+            if i < len(tokens) and tokens[i][0] == ":":
+                i += 2
+            return i, maybe, definite
+        if token in ("unique", "unique0", "priority"):
+            return self.statement(i + 1)
+        if token == "if":
+            end = _skip_group(tokens, i + 1)
+            if self.first_if_condition is None:
+                self.first_if_condition = [t for t, _ in tokens[i + 1:end]]
+            i, then_maybe, then_definite = self.statement(end)
+            if i < len(tokens) and tokens[i][0] == "else":
+                i, else_maybe, else_definite = self.statement(i + 1)
+                return i, {**else_maybe, **then_maybe}, then_definite & else_definite
+            return i, then_maybe, set()
+        if token in ("case", "casez", "casex"):
+            self.cases += 1
+            i = _skip_group(tokens, i + 1)
+            maybe, branches, has_default = {}, [], False
+            while tokens[i][0] != "endcase":
+                if tokens[i][0] == "default":
+                    has_default = True
+                    i += 1
+                    if tokens[i][0] == ":":
+                        i += 1
+                else:
+                    depth = 0
+                    while not (tokens[i][0] == ":" and depth == 0):
+                        depth += tokens[i][0] in ("(", "[", "{")
+                        depth -= tokens[i][0] in (")", "]", "}")
+                        i += 1
+                    i += 1
+                i, m, d = self.statement(i)
+                maybe = {**m, **maybe}
+                branches.append(d)
+            definite = set.intersection(*branches) if has_default and branches else set()
+            return i + 1, maybe, definite
+        if token in ("for", "while", "repeat"):
+            return self.statement(_skip_group(tokens, i + 1))
+        if token == "forever":
+            return self.statement(i + 1)
+        if token == ";":
+            return i + 1, {}, set()
+        return self.assignment(i)
+
+    def assignment(self, i: int) -> Tuple[int, Dict[str, int], Set[str]]:
+        tokens = self.tokens
+        start, depth, split = i, 0, None
+        while not (tokens[i][0] == ";" and depth == 0):
+            token = tokens[i][0]
+            depth += token in ("(", "[", "{")
+            depth -= token in (")", "]", "}")
+            if split is None and depth == 0 and token in ("=", "<="):
+                split = i
+            i += 1
+        if split is None:  # Task or system call such as $display
+            return i + 1, {}, set()
+        names, depth = set(), 0
+        for token, _ in tokens[start:split]:
+            depth += token == "["
+            depth -= token == "]"
+            if depth == 0 and re.match(r"[A-Za-z_]", token):
+                names.add(token)
+        line = self.line_of(tokens[start][1])
+        return i + 1, {name: line for name in names}, names
+
+
+def _split_commas(tokens: List[Tuple[str, int]]) -> List[List[Tuple[str, int]]]:
+    items, depth = [[]], 0
+    for token in tokens:
+        if token[0] in ("(", "[", "{"):
+            depth += 1
+        elif token[0] in (")", "]", "}"):
+            depth -= 1
+        if token[0] == "," and depth == 0:
+            items.append([])
+        else:
+            items[-1].append(token)
+    return items
+
+
+def _assignments(items: List[List[Tuple[str, int]]], parameters: Dict[str, str]) -> None:
+    for item in items:
+        words = [token for token, _ in item]
+        if "=" in words:
+            eq = words.index("=")
+            parameters[words[eq - 1]] = " ".join(words[eq + 1:])
+
+
+def _skip_prefix(tokens: List[Tuple[str, int]], i: int) -> int:
+    """Skips begin/end/generate keywords, labels and generate for/if headers in front of a module item."""
+    while i < len(tokens):
+        token = tokens[i][0]
+        if token in BLOCK_PREFIX:
+            i += 1
+        elif token == ":":
+            i += 2
+        elif token in ("for", "if") and i + 1 < len(tokens) and tokens[i + 1][0] == "(":
+            i = _skip_group(tokens, i + 1)
+        elif i + 1 < len(tokens) and tokens[i + 1][0] == ":" and token not in VERILOG_KEYWORDS:
+            i += 2
+        else:
+            return i
+    return i
+
+
+def _analyze_verilog_unit(unit: DesignUnit) -> Dict:
+    masked = mask_comments(unit.text, "verilog")
+    newlines = [m.start() for m in re.finditer("\n", masked)]
+
+    def line_of(offset: int) -> int:
+        return unit.start_line + bisect.bisect_right(newlines, offset)
+
+    tokens = _tokens(masked)
+    ports: Dict[str, Dict] = {}
+    widths: Dict[str, Optional[int]] = {}
+    parameters: Dict[str, str] = {}
+    instances: List[Dict] = []
+    metrics = {"lines": unit.end_line - unit.start_line + 1, "always_blocks": 0, "sequential_blocks": 0,
+               "combinational_blocks": 0, "assign_statements": 0, "case_statements": 0, "register_bits": 0}
+    clocks: Set[str] = set()
+    resets: Dict[str, str] = {}
+    latches: List[Dict] = []
+
+    def declare(items: List[List[Tuple[str, int]]], ansi: bool) -> None:
+        """Records declaration items; items that are a bare name inherit the previous item's direction and width."""
+        direction, width = None, 1
+        for item in items:
+            words = [token for token, _ in item]
+            name, range_text, depth = None, "", 0
+            for token in words:
+                if token == "=" and depth == 0:
+                    break
+                depth += token == "["
+                if depth and name is None:
+                    range_text += token
+                elif depth == 0 and re.match(r"[A-Za-z_]", token) and token not in NET_TYPES \
+                        and token not in DIRECTIONS:
+                    name = token
+                depth -= token == "]"
+            if name is None:
+                continue
+            if len(words) > 1 or words[0] in DIRECTIONS:
+                if words[0] in DIRECTIONS:
+                    direction = words[0]
+                elif ansi and "." in words:
+                    direction = "interface"
+                elif not ansi:
+                    direction = None
+                width = _range_width(range_text, parameters) if range_text else (32 if "integer" in words else 1)
+            widths[name] = width
+            if direction is not None:
+                ports[name] = {"name": name, "direction": direction, "width": width}
+            elif name in ports:
+                ports[name]["width"] = width
+
+    # Header: optional parameter port list, then the port list
+    i = next((k for k, (token, _) in enumerate(tokens) if token == unit.name), 0) + 1
+    if i < len(tokens) and tokens[i][0] == "#":
+        end = _skip_group(tokens, i + 1)
+        _assignments(_split_commas(tokens[i + 2:end - 1]), parameters)
+        i = end
+    if i < len(tokens) and tokens[i][0] == "(":
+        end = _skip_group(tokens, i)
+        items = _split_commas(tokens[i + 1:end - 1])
+        if any(item and item[0][0] in DIRECTIONS for item in items):
+            declare(items, ansi=True)
+        else:
+            for item in items:
+                if item:
+                    ports[item[-1][0]] = {"name": item[-1][0], "direction": None, "width": None}
+        i = end
+
+    # Body: one module item at a time; always blocks are walked by the block parser
+    while True:
+        i = _skip_prefix(tokens, i)
+        if i >= len(tokens):
+            break
+        token = tokens[i][0]
+        if token in ("endmodule", "endinterface", "endpackage", "endprogram"):
+            break
+        if token in ("function", "task"):
+            end_token = "end" + token
+            while i < len(tokens) and tokens[i][0] != end_token:
+                i += 1
+            i += 1
+            continue
+        if token in ALWAYS or token == "initial":
+            i += 1
+            edges: List[str] = []
+            if i < len(tokens) and tokens[i][0] == "@":
+                i += 1
+                if tokens[i][0] == "(":
+                    end = _skip_group(tokens, i)
+                    sensitivity = [t for t, _ in tokens[i + 1:end - 1]]
+                    edges = [sensitivity[j + 1] for j in range(len(sensitivity) - 1)
+                             if sensitivity[j] in ("posedge", "negedge")]
+                    i = end
+                else:
+                    i += 1  # @*
+            parser = _BlockParser(tokens, line_of)
+            try:
+                i, maybe, definite = parser.statement(i)
+            except (IndexError, MemoryError, RecursionError):
+                break  # Unbalanced or pathologically nested block; stop rather than guess
+            if token == "initial":
+                continue
+            metrics["always_blocks"] += 1
+            metrics["case_statements"] += parser.cases
+            if token == "always_latch":
+                metrics["combinational_blocks"] += 1
+                latches.extend({"signal": name, "line": line, "reason": "always_latch"} for name, line in maybe.items())
+            elif token == "always_comb" or not edges:
+                metrics["combinational_blocks"] += 1
+                latches.extend(
+                    {"signal": name, "line": maybe[name],
+                     "reason": "not assigned on every path (if without else or case without default)"}
+                    for name in sorted(set(maybe) - definite)
+                )
+            else:
+                metrics["sequential_blocks"] += 1
+                async_resets = []
+                if len(edges) > 1:
+                    async_resets = [s for s in edges if RESET_NAME.search(s)] or edges[1:]
+                for signal in async_resets:
+                    resets[signal] = "async"
+                block_clocks = [s for s in edges if s not in async_resets]
+                if block_clocks:
+                    clocks.add(next((s for s in block_clocks if CLOCK_NAME.search(s)), block_clocks[0]))
+                if not async_resets and parser.first_if_condition:
+                    for name in parser.first_if_condition:
+                        if RESET_NAME.search(name):
+                            resets.setdefault(name, "sync")
+                metrics["register_bits"] += sum(widths.get(name) or 1 for name in maybe)
+            continue
+
+        # Any other item runs up to the next top-level semicolon
+        start, depth = i, 0
+        while i < len(tokens) and not (tokens[i][0] == ";" and depth == 0):
+            depth += tokens[i][0] in ("(", "[", "{")
+            depth -= tokens[i][0] in (")", "]", "}")
+            i += 1
+        statement = tokens[start:i]
+        i += 1
+        if not statement:
+            continue
+        head = statement[0][0]
+        if head == "assign":
+            metrics["assign_statements"] += 1
+        elif head in ("parameter", "localparam"):
+            _assignments(_split_commas(statement[1:]), parameters)
+        elif head in DIRECTIONS or head in NET_TYPES:
+            declare(_split_commas(statement), ansi=False)
+        elif head not in VERILOG_KEYWORDS and re.match(r"[A-Za-z_]", head):
+            # module_name [#(...)] instance_name [range] (...) [, instance_name (...)]
+            j = 1
+            if j < len(statement) and statement[j][0] == "#":
+                j = _skip_group(statement, j + 1)
+            while j + 1 < len(statement) and re.match(r"[A-Za-z_]", statement[j][0]):
+                k = j + 1
+                if statement[k][0] == "[":
+                    k = _skip_group(statement, k, "[", "]")
+                if k >= len(statement) or statement[k][0] != "(":
+                    break
+                instances.append({"module": head, "name": statement[j][0], "line": line_of(statement[j][1])})
+                j = _skip_group(statement, k)
+                if j < len(statement) and statement[j][0] == ",":
+                    j += 1
+
+    return {
+        "name": unit.name,
+        "kind": unit.kind,
+        "language": "verilog",
+        "lines": [unit.start_line, unit.end_line],
+        "parameters": parameters,
+        "ports": list(ports.values()),
+        "instances": instances,
+        "metrics": metrics,
+        "clocks": sorted(clocks),
+        "resets": [{"signal": name, "type": kind} for name, kind in sorted(resets.items())],
+        "latches": latches,
+    }
+
+
+VHDL_PORTS = re.compile(r"\b(port|generic)\s*\(", re.IGNORECASE)
+VHDL_INSTANCE = re.compile(
+    r"\b(\w+)\s*:\s*(?:entity\s+(?:\w+\.)?(\w+)(?:\s*\(\s*\w+\s*\))?|component\s+(\w+)|(\w+))\s+(?:generic|port)\s+map\b",
+    re.IGNORECASE,
+)
+VHDL_PROCESS = re.compile(r"\bprocess\b(.*?)\bend\s+process\b", re.IGNORECASE | re.DOTALL)
+VHDL_EDGE = re.compile(r"\b(?:rising_edge|falling_edge)\s*\(\s*(\w+)\s*\)|\b(\w+)\s*'\s*event\b", re.IGNORECASE)
+
+
+def _vhdl_width(type_text: str) -> Optional[int]:
+    match = re.search(r"\(\s*(\d+)\s+(?:downto|to)\s+(\d+)\s*\)", type_text, re.IGNORECASE)
+    if match:
+        return abs(int(match.group(1)) - int(match.group(2))) + 1
+    return 1 if re.match(r"\s*(std_u?logic|bit|boolean)\s*$", type_text, re.IGNORECASE) else None
+
+
+def _analyze_vhdl_unit(unit: DesignUnit) -> Dict:
+    masked = mask_comments(unit.text, "vhdl")
+    newlines = [m.start() for m in re.finditer("\n", masked)]
+
+    def line_of(offset: int) -> int:
+        return unit.start_line + bisect.bisect_right(newlines, offset)
+
+    ports, parameters = [], {}
+    if unit.kind == "entity":
+        for match in VHDL_PORTS.finditer(masked):
+            depth, end = 0, match.end() - 1
+            for end in range(match.end() - 1, len(masked)):
+                depth += masked[end] == "("
+                depth -= masked[end] == ")"
+                if depth == 0:
+                    break
+            for declaration in masked[match.end():end].split(";"):
+                if ":" not in declaration:
+                    continue
+                names, _, rest = declaration.partition(":")
+                rest = rest.split(":=")
+                if match.group(1).lower() == "generic":
+                    for name in names.split(","):
+                        parameters[name.strip()] = rest[1].strip() if len(rest) > 1 else ""
+                    continue
+                parts = rest[0].split(None, 1)
+                direction = parts[0].lower() if parts and parts[0].lower() in ("in", "out", "inout", "buffer") else None
+                type_text = parts[1] if direction and len(parts) > 1 else rest[0]
+                for name in names.split(","):
+                    ports.append({"name": name.strip(), "direction": {"in": "input", "out": "output"}.get(direction, direction),
+                                  "width": _vhdl_width(type_text)})
+
+    clocks, resets, latches = set(), {}, []
+    processes = list(VHDL_PROCESS.finditer(masked))
+    sequential = 0
+    for process in processes:
+        body = process.group(1)
+        edge = VHDL_EDGE.search(body)
+        line = line_of(process.start())
+        if edge:
+            sequential += 1
+            clocks.add(edge.group(1) or edge.group(2))
+            for reset in re.finditer(r"\bif\s+(\w+)\s*=\s*'[01]'", body, re.IGNORECASE):
+                if RESET_NAME.search(reset.group(1)):
+                    resets.setdefault(reset.group(1), "async" if reset.start() < edge.start() else "sync")
+        else:
+            ifs = len(re.findall(r"\bif\b", body, re.IGNORECASE)) - len(re.findall(r"\bend\s+if\b", body, re.IGNORECASE))
+            if ifs > len(re.findall(r"\belse\b", body, re.IGNORECASE)):
+                latches.append({"signal": None, "line": line, "reason": "if without else in combinational process"})
+    entity = unit.name.split("(")[0]
+    return {
+        "name": unit.name,
+        "kind": unit.kind,
+        "language": "vhdl",
+        "entity": entity if unit.kind == "architecture" else None,
+        "lines": [unit.start_line, unit.end_line],
+        "parameters": parameters,
+        "ports": ports,
+        "instances": [
+            {"module": m.group(2) or m.group(3) or m.group(4), "name": m.group(1),
+             "line": line_of(m.start())}
+            for m in VHDL_INSTANCE.finditer(masked)
+        ],
+        "metrics": {"lines": unit.end_line - unit.start_line + 1, "processes": len(processes),
+                    "sequential_blocks": sequential, "combinational_blocks": len(processes) - sequential},
+        "clocks": sorted(clocks),
+        "resets": [{"signal": name, "type": kind} for name, kind in sorted(resets.items())],
+        "latches": latches,
+    }
+
+
+def analyze_units(units: List[DesignUnit]) -> Dict:
+    """Builds the facts document for already split design units."""
+    analyzed = [_analyze_vhdl_unit(unit) if unit.language == "vhdl" else _analyze_verilog_unit(unit) for unit in units]
+    # VHDL architectures belong to their entity in the module graph
+    owner = {unit["name"]: unit.get("entity") or unit["name"] for unit in analyzed}
+    modules = {owner[unit["name"]] for unit in analyzed}
+    edges, instantiated = set(), set()
+    for unit in analyzed:
+        for instance in unit["instances"]:
+            edges.add((owner[unit["name"]], instance["module"]))
+            if instance["module"] in modules:
+                instantiated.add(instance["module"])
+    tops = sorted(modules - instantiated)
+    pin_units = {unit["name"]: unit for unit in analyzed if unit["ports"]}
+    top_pins = sum(port["width"] or 1 for top in tops if top in pin_units for port in pin_units[top]["ports"])
+    return {
+        "language": units[0].language if units else None,
+        "units": analyzed,
+        "hierarchy": {
+            "tops": tops,
+            "edges": sorted(edges),
+            "external_modules": sorted({child for _, child in edges} - modules),
+        },
+        "totals": {
+            "design_units": len(analyzed),
+            "lines": sum(unit["metrics"]["lines"] for unit in analyzed),
+            "instances": sum(len(unit["instances"]) for unit in analyzed),
+            "top_level_pins": top_pins,
+            "register_bits": sum(unit["metrics"].get("register_bits", 0) for unit in analyzed),
+            "latches": sum(len(unit["latches"]) for unit in analyzed),
+            "clocks": sorted({clock for unit in analyzed for clock in unit["clocks"]}),
+        },
+    }
+
+
+def analyze_design(source: str, language: str = None) -> Dict:
+    """Returns the facts document (module graph, port tables, per-unit metrics) for HDL source."""
+    language = language or detect_language(source)
+    return analyze_units([unit for unit in split_design_units(source, language) if unit.kind != "fragment"])
+
+
+def unit_facts_line(unit: Dict, relative_lines: bool = False) -> str:
+    """One-line summary of a unit's facts for prompts; line numbers can be made relative to the unit."""
+    ports = unit["ports"]
+    pins = sum(port["width"] or 1 for port in ports)
+    parts = [f"{len(ports)} ports ({pins} pins)"] if ports else []
+    metrics = unit["metrics"]
+    if metrics.get("sequential_blocks") or metrics.get("combinational_blocks"):
+        parts.append(f"{metrics['sequential_blocks']} sequential / {metrics['combinational_blocks']} combinational blocks")
+    if metrics.get("register_bits"):
+        parts.append(f"{metrics['register_bits']} register bits")
+    if unit["clocks"]:
+        parts.append("clocks " + ", ".join(unit["clocks"]))
+    if unit["resets"]:
+        parts.append("resets " + ", ".join(f"{r['signal']} ({r['type']})" for r in unit["resets"]))
+    if unit["instances"]:
+        counts: Dict[str, int] = {}
+        for instance in unit["instances"]:
+            counts[instance["module"]] = counts.get(instance["module"], 0) + 1
+        parts.append("instantiates " + ", ".join(f"{m} x{n}" if n > 1 else m for m, n in counts.items()))
+    if unit["latches"]:
+        parts.append("inferred latches " + ", ".join(
+            f"{latch['signal'] or 'process'} (line {latch['line'] - unit['lines'][0] + 1 if relative_lines else latch['line']})"
+            for latch in unit["latches"]))
+    return f"{unit['kind']} {unit['name']}: " + "; ".join(parts)
+
+
+def _names(names: List[str], limit: int = 20) -> str:
+    shown = ", ".join(names[:limit])
+    return f"{shown} and {len(names) - limit} more" if len(names) > limit else shown
+
+
+def facts_context(facts: Dict, max_units: int = 25) -> str:
+    """Compact, prompt-ready rendering of the facts; the largest units are listed individually."""
+    totals = facts["totals"]
+    lines = [
+        f"Structural facts (computed by a static parser): {totals['design_units']} design units, {totals['lines']} lines, "
+        f"{totals['instances']} instances, {totals['top_level_pins']} top-level pins, "
+        f"{totals['register_bits']} register bits, {totals['latches']} inferred latches, "
+        f"clocks: {', '.join(totals['clocks']) or 'none'}.",
+        f"Top-level units: {_names(facts['hierarchy']['tops']) or 'none'}.",
+    ]
+    if facts["hierarchy"]["external_modules"]:
+        lines.append(f"Instantiated but not defined here: {_names(facts['hierarchy']['external_modules'])}.")
+    units = sorted(facts["units"], key=lambda unit: -unit["metrics"]["lines"])
+    lines += [f"- {unit_facts_line(unit)}" for unit in units[:max_units]]
+    if len(units) > max_units:
+        lines.append(f"- ... {len(units) - max_units} smaller units omitted")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], encoding="utf-8", errors="replace") as f:
+        print(json.dumps(analyze_design(f.read()), indent=2))
@@ -0,0 +1,269 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from hdl_facts import analyze_units, facts_context, unit_facts_line
+from hdl_lexer import DesignUnit, chunk_unit, split_design_units
+from llm_cache import ResponseCache
+from llm_chain import llm_call
+from prompts import DIGEST_REDUCE_PROMPT, MODULE_SUMMARY_PROMPT, REPORT_REVISION_PROMPT
+from tracing import in_context, span
+
+# Design units larger than this are summarized in parts; the digest is condensed until it fits its limit
+MAX_UNIT_CHARS = int(os.getenv("HDL_MAX_UNIT_CHARS", 12000))
+MAX_DIGEST_CHARS = int(os.getenv("HDL_MAX_DIGEST_CHARS", 16000))
+INGEST_WORKERS = int(os.getenv("HDL_INGEST_WORKERS", 8))
+MAX_CHILD_SUMMARY_CHARS = 600
+# When more than this share of the units is re-analyzed, the report is rebuilt by the step graph instead of revised
+REVISE_MAX_CHANGED = float(os.getenv("HDL_REVISE_MAX_CHANGED", 0.5))
+
+
+def _empty_run(units: int = 0) -> Dict:
+    return {"units": units, "reused": [], "changed": [], "dependents": [], "removed": []}
+
+
+def _timed_call(prompt: str, llm, cache: Optional[ResponseCache], step: str) -> Tuple[str, float]:
+    start = time.perf_counter()
+    output = llm_call(prompt, llm=llm, cache=cache, step=step)
+    return output, time.perf_counter() - start
+
+
+class ModuleGraph:
+    """Instantiation graph over the units being summarized; VHDL architectures belong to their entity."""
+
+    def __init__(self, units: List[DesignUnit], facts: Dict):
+        self.facts_by_name = {entry["name"]: entry for entry in facts["units"]}
+        self.entries = [self.facts_by_name.get(unit.name.split(" [part ")[0]) for unit in units]  # Facts per unit
+        self.owners = [(entry.get("entity") or entry["name"]) if entry else unit.name
+                       for unit, entry in zip(units, self.entries)]
+        known = set(self.owners)
+        self.children: Dict[str, List[str]] = {owner: [] for owner in known}
+        for entry in facts["units"]:
+            owner = entry.get("entity") or entry["name"]
+            if owner in known:
+                for instance in entry["instances"]:
+                    if instance["module"] in known and instance["module"] not in self.children[owner] \
+                            and instance["module"] != owner:
+                        self.children[owner].append(instance["module"])
+        self.levels = self._levels()
+
+    def _levels(self) -> Dict[str, int]:
+        """Height of every module above the leaves; back edges of recursive instantiation are ignored."""
+        levels: Dict[str, int] = {}
+        for root in self.children:
+            if root in levels:
+                continue
+            stack, on_stack = [(root, iter(self.children[root]))], {root}
+            while stack:
+                name, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    stack.pop()
+                    on_stack.discard(name)
+                    levels[name] = 1 + max((levels[c] for c in self.children[name] if c in levels), default=-1)
+                elif child not in levels and child not in on_stack:
+                    stack.append((child, iter(self.children[child])))
+                    on_stack.add(child)
+        return levels
+
+    def module_hashes(self, units: List[DesignUnit]) -> Dict[str, str]:
+        """Merkle-style hash of every module: its own text plus the hashes of the modules below it."""
+        texts: Dict[str, List[str]] = {}
+        for unit, owner in zip(units, self.owners):
+            texts.setdefault(owner, []).append(unit.text)
+        hashes: Dict[str, str] = {}
+        for name in sorted(self.children, key=lambda name: self.levels[name]):
+            digest = hashlib.sha256("\x00".join(texts[name]).encode("utf-8"))
+            for child in self.children[name]:
+                if self.levels[child] < self.levels[name]:
+                    digest.update(hashes[child].encode("ascii"))
+            hashes[name] = digest.hexdigest()
+        return hashes
+
+
+def unit_prompt(unit: DesignUnit, entry: Optional[Dict] = None,
+                submodules: Optional[List[Tuple[Dict, str]]] = None) -> str:
+    """Summary prompt for one unit, with its parser facts entry and the facts and summaries of the units it instantiates.
+
+    The prompt holds no absolute line numbers, so edits elsewhere in the file leave it unchanged.
+    """
+    header = f"{unit.kind} {unit.name}"
+    if entry is not None:
+        header += f"\nParser facts: {unit_facts_line(entry, relative_lines=True)}"
+    if submodules:
+        header += "\nInstantiated units:" + "".join(
+            f"\n- {unit_facts_line(child, relative_lines=True)}\n  Summary: {summary[:MAX_CHILD_SUMMARY_CHARS]}"
+            for child, summary in submodules[:10]
+        )
+    return f"{MODULE_SUMMARY_PROMPT}\nInput: {header}\n{unit.text}"
+
+
+class IncrementalDesign:
+    """Per-module summaries of one design, kept between submissions so only changed modules are re-analyzed.
+
+    Units are keyed by a hash of their own text and of every module below them in the instantiation
+    graph, so editing a module invalidates it and the modules instantiating it, and nothing else.
+    """
+
+    def __init__(self):
+        self.summaries: Dict[str, Tuple[str, str, str]] = {}  # Unit key -> (own hash, design hash, summary)
+        self.last_run = _empty_run()
+        self.report: Optional[str] = None  # Final report of the previous submission
+        # Held by a job from ingestion until its report is stored, so submissions of one design run one at a time
+        self.lock = threading.Lock()
+
+    def changed(self) -> bool:
+        """Whether the last ingestion re-analyzed, added or removed any unit."""
+        run = self.last_run
+        return bool(run["changed"] or run["dependents"] or run["removed"])
+
+    def revision_prompt(self, facts: Optional[Dict] = None) -> Optional[str]:
+        """Prompt revising the previous report for the units re-analyzed by the last ingestion.
+
+        Returns None when there is no previous report or more than REVISE_MAX_CHANGED of the units
+        changed; the report is then rebuilt by the full step graph.
+        """
+        run = self.last_run
+        touched = run["changed"] + run["dependents"]
+        if self.report is None or not run["units"] or len(touched) > REVISE_MAX_CHANGED * run["units"]:
+            return None
+        sections = [f"### {key}\n{self.summaries[key][2]}" for key in touched]
+        if run["removed"]:
+            sections.append(f"Removed design units: {', '.join(run['removed'])}")
+        if facts and facts["units"]:
+            sections.insert(0, facts_context(facts))
+        return f"{REPORT_REVISION_PROMPT}\nPrevious report:\n{self.report}\n\nChanged design units:\n" + "\n\n".join(sections)
+
+
+def summarize_units(units: List[DesignUnit], llm, max_workers: int = INGEST_WORKERS,
+                    cache: Optional[ResponseCache] = None,
+                    on_unit: Optional[Callable[[str, str, float], None]] = None,
+                    facts: Optional[Dict] = None,
+                    state: Optional[IncrementalDesign] = None) -> Tuple[List[str], Dict[str, float]]:
+    """Summarizes the design units bottom-up through the instantiation graph; returns summaries in unit order.
+
+    Units at the same height run concurrently, and each unit's prompt carries the summaries of the
+    modules it instantiates. With a state, units whose design hash is unchanged since the previous
+    call reuse their summary without an LLM call.
+    """
+    facts = facts or {"units": []}
+    graph = ModuleGraph(units, facts)
+    keys = [f"{unit.kind} {unit.name}" for unit in units]
+    own = {key: hashlib.sha256(unit.text.encode("utf-8")).hexdigest() for key, unit in zip(keys, units)}
+    module_hashes = graph.module_hashes(units)
+    design = {key: hashlib.sha256(f"{own[key]}\x00{module_hashes[owner]}".encode("ascii")).hexdigest()
+              for key, owner in zip(keys, graph.owners)}
+
+    summaries: Dict[str, str] = {}
+    if state is not None:
+        state.last_run = _empty_run(len(units))
+        state.last_run["removed"] = [key for key in state.summaries if key not in own]
+        for key in keys:
+            stored = state.summaries.get(key)
+            if stored is not None and stored[1] == design[key]:
+                summaries[key] = stored[2]
+                state.last_run["reused"].append(key)
+            elif stored is not None and stored[0] == own[key]:
+                state.last_run["dependents"].append(key)  # Unchanged itself, but a module below it changed
+            else:
+                state.last_run["changed"].append(key)
+
+    keys_by_owner: Dict[str, List[str]] = {}
+    for key, owner in zip(keys, graph.owners):
+        keys_by_owner.setdefault(owner, []).append(key)
+
+    def module_summary(name: str) -> str:
+        return "\n".join(summaries[key] for key in keys_by_owner[name])
+
+    timings: Dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in sorted(set(graph.levels.values())):
+            wave = [(unit, key, owner, entry)
+                    for unit, key, owner, entry in zip(units, keys, graph.owners, graph.entries)
+                    if graph.levels[owner] == level and key not in summaries]
+            futures = []
+            for unit, key, owner, entry in wave:
+                submodules = [(graph.facts_by_name[child], module_summary(child)) for child in graph.children[owner]
+                              if graph.levels[child] < level and child in graph.facts_by_name]
+                futures.append(executor.submit(in_context(_timed_call), unit_prompt(unit, entry, submodules), llm, cache,
+                                               "module_summary"))
+            for (unit, key, _, _), future in zip(wave, futures):
+                summaries[key], timings[unit.label] = future.result()
+                if on_unit is not None:
+                    on_unit(unit.label, summaries[key], timings[unit.label])
+    if state is not None:
+        state.summaries = {key: (own[key], design[key], summaries[key]) for key in keys}
+    return [summaries[key] for key in keys], timings
+
+
+def _span_heading(group: List[str]) -> str:
+    """Heading covering a group of sections, from the first unit of the first to the last unit of the last."""
+    first = group[0].splitlines()[0][4:].split(" ... ")[0]
+    last = group[-1].splitlines()[0][4:].split(" ... ")[-1]
+    return f"### {first}" if first == last else f"### {first} ... {last}"
+
+
+def condense_sections(sections: List[str], llm, max_chars: int = MAX_DIGEST_CHARS, max_workers: int = INGEST_WORKERS,
+                      cache: Optional[ResponseCache] = None) -> Tuple[List[str], Dict[str, float]]:
+    """Condenses groups of digest sections until their combined size fits max_chars."""
+    timings: Dict[str, float] = {}
+    level = 0
+    while len(sections) > 1 and sum(len(section) + 2 for section in sections) > max_chars:
+        level += 1
+        groups: List[List[str]] = [[]]
+        size = 0
+        for section in sections:
+            if groups[-1] and size + len(section) > max_chars:
+                groups.append([])
+                size = 0
+            groups[-1].append(section)
+            size += len(section) + 2
+        if len(groups) == len(sections):  # Every section is already too large to share a group; pair them up
+            groups = [sections[i:i + 2] for i in range(0, len(sections), 2)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(in_context(_timed_call), f"{DIGEST_REDUCE_PROMPT}\nInput: " + "\n\n".join(group),
+                                llm, cache, "digest_reduce")
+                for group in groups
+            ]
+            sections = []
+            for i, (group, future) in enumerate(zip(groups, futures), 1):
+                summary, timings[f"condense level {level} group {i}"] = future.result()
+                sections.append(f"{_span_heading(group)}\n{summary}")
+    return sections, timings
+
+
+def ingest_design(source: str, llm, max_workers: int = INGEST_WORKERS, cache: Optional[ResponseCache] = None,
+                  on_unit: Optional[Callable[[str, str, float], None]] = None,
+                  max_unit_chars: int = MAX_UNIT_CHARS,
+                  max_digest_chars: int = MAX_DIGEST_CHARS,
+                  facts: Optional[Dict] = None,
+                  state: Optional[IncrementalDesign] = None) -> Tuple[str, Dict[str, float]]:
+    """Turns HDL source into a compact design digest for the report steps.
+
+    The source is split at module/entity boundaries, every unit is summarized on its own, and the
+    summaries are condensed further when needed, so downstream prompts stay bounded however large
+    the design grows. Structural facts from hdl_facts.py (computed here unless given) are attached
+    to every unit prompt and to the digest. With an IncrementalDesign state, only modules that changed
+    since the previous call, and the modules instantiating them, are summarized again.
+    Returns the digest and the wall time of every LLM call made.
+    """
+    design_units = split_design_units(source)
+    units = [chunk for unit in design_units for chunk in chunk_unit(unit, max_unit_chars)]
+    if not units:
+        if state is not None:
+            state.last_run = _empty_run()  # Nothing was ingested; never report the previous run's edits
+        return "No HDL source was provided.", {}
+    if facts is None:
+        facts = analyze_units([unit for unit in design_units if unit.kind != "fragment"])
+    summaries, timings = summarize_units(units, llm, max_workers, cache, on_unit, facts, state)
+    sections = [f"### {unit.label}\n{summary}" for unit, summary in zip(units, summaries)]
+    sections, condense_timings = condense_sections(sections, llm, max_digest_chars, max_workers, cache)
+    timings.update(condense_timings)
+    header = f"Design digest: {len(units)} {units[0].language.upper()} design unit(s), {source.count(chr(10)) + 1} lines"
+    if facts["units"]:
+        header += "\n\n" + facts_context(facts)
+    return header + "\n\n" + "\n\n".join(sections), timings
@@ -0,0 +1,148 @@
+import bisect
+import re
+from dataclasses import dataclass
+from typing import List
+
+VERILOG_START = re.compile(r"\b(module|macromodule|interface|package|program)\b(?:\s+(?:automatic|static))?\s+(\w+)")
+VERILOG_END = {
+    "module": "endmodule",
+    "macromodule": "endmodule",
+    "interface": "endinterface",
+    "package": "endpackage",
+    "program": "endprogram",
+}
+VHDL_START = re.compile(
+    r"\b(?:(entity)\s+(\w+)\s+is|(architecture)\s+(\w+)\s+of\s+(\w+)\s+is|(package\s+body|package)\s+(\w+)\s+is"
+    r"|(configuration)\s+(\w+)\s+of\s+\w+\s+is)\b",
+    re.IGNORECASE,
+)
+VHDL_END = re.compile(r"\bend\b[^;]*;", re.IGNORECASE)
+
+
+@dataclass
+class DesignUnit:
+    """A module, interface, package, entity or architecture and where it sits in the source."""
+    kind: str
+    name: str
+    language: str
+    text: str
+    start_line: int
+    end_line: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind} {self.name} (lines {self.start_line}-{self.end_line})"
+
+
+def mask_comments(source: str, language: str) -> str:
+    """Blanks out comments and string literals, keeping offsets and newlines intact."""
+    if language == "vhdl":
+        pattern = re.compile(r'--[^\n]*|"(?:[^"\n])*"')
+    else:
+        pattern = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"', re.DOTALL)
+    return pattern.sub(lambda m: re.sub(r"[^\n]", " ", m.group(0)), source)
+
+
+def detect_language(source: str) -> str:
+    """Returns "vhdl" if the source declares VHDL design units, otherwise "verilog"."""
+    masked = mask_comments(source, "vhdl")
+    if re.search(r"\b(entity\s+\w+\s+is|architecture\s+\w+\s+of)\b", masked, re.IGNORECASE):
+        return "vhdl"
+    return "verilog"
+
+
+class _LineIndex:
+    """Maps offsets to 1-based line numbers with a binary search over newline positions."""
+
+    def __init__(self, source: str):
+        self.newlines = [m.start() for m in re.finditer("\n", source)]
+
+    def line(self, offset: int) -> int:
+        return bisect.bisect_left(self.newlines, offset) + 1
+
+
+def _unit(source: str, lines: _LineIndex, kind: str, name: str, language: str, start: int, end: int) -> DesignUnit:
+    start = source.rfind("\n", 0, start) + 1
+    return DesignUnit(
+        kind=kind,
+        name=name,
+        language=language,
+        text=source[start:end],
+        start_line=lines.line(start),
+        end_line=lines.line(end),
+    )
+
+
+def _split_verilog(source: str, masked: str) -> List[DesignUnit]:
+    lines = _LineIndex(source)
+    units = []
+    pos = 0
+    while True:
+        match = VERILOG_START.search(masked, pos)
+        if match is None:
+            return units
+        kind, name = match.group(1), match.group(2)
+        end_match = re.compile(rf"\b{VERILOG_END[kind]}\b").search(masked, match.end())
+        end = end_match.end() if end_match else len(source)
+        units.append(_unit(source, lines, kind, name, "verilog", match.start(), end))
+        pos = end
+
+
+def _split_vhdl(source: str, masked: str) -> List[DesignUnit]:
+    starts = list(VHDL_START.finditer(masked))
+    lines = _LineIndex(source)
+    units = []
+    for i, match in enumerate(starts):
+        limit = starts[i + 1].start() if i + 1 < len(starts) else len(source)
+        ends = list(VHDL_END.finditer(masked, match.end(), limit))  # The unit closes at its last "end ...;"
+        end = ends[-1].end() if ends else limit
+        if match.group(1):
+            kind, name = "entity", match.group(2)
+        elif match.group(3):
+            kind, name = "architecture", f"{match.group(5)}({match.group(4)})"
+        elif match.group(6):
+            kind, name = re.sub(r"\s+", " ", match.group(6).lower()), match.group(7)
+        else:
+            kind, name = "configuration", match.group(9)
+        units.append(_unit(source, lines, kind, name, "vhdl", match.start(), end))
+    return units
+
+
+def split_design_units(source: str, language: str = None) -> List[DesignUnit]:
+    """Splits HDL source at module/entity boundaries in a single pass over the text.
+
+    Source without any recognizable design unit (a fragment or snippet) is returned as one unit.
+    """
+    language = language or detect_language(source)
+    masked = mask_comments(source, language)
+    units = _split_vhdl(source, masked) if language == "vhdl" else _split_verilog(source, masked)
+    if not units and source.strip():
+        units = [DesignUnit("fragment", "design", language, source, 1, source.count("\n") + 1)]
+    return units
+
+
+def chunk_unit(unit: DesignUnit, max_chars: int) -> List[DesignUnit]:
+    """Splits an oversized unit at line boundaries into parts of at most about max_chars characters."""
+    if len(unit.text) <= max_chars:
+        return [unit]
+    parts: List[List[str]] = [[]]
+    size = 0
+    for line in unit.text.splitlines(keepends=True):
+        if size and size + len(line) > max_chars:
+            parts.append([])
+            size = 0
+        parts[-1].append(line)
+        size += len(line)
+    chunks = []
+    line = unit.start_line
+    for i, lines in enumerate(parts, 1):
+        chunks.append(DesignUnit(
+            kind=unit.kind,
+            name=f"{unit.name} [part {i}/{len(parts)}]",
+            language=unit.language,
+            text="".join(lines),
+            start_line=line,
+            end_line=line + len(lines) - 1,
+        ))
+        line += len(lines)
+    return chunks
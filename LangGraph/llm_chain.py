@@ -0,0 +1,85 @@
+import re
+import time
+from typing import Iterator, List, Optional
+
+from llm_cache import ResponseCache, get_cache, make_key, model_id, model_temperature
+from memory import estimate_tokens
+from streaming import chunk_text
+from tracing import span, start_span
+
+
+def llm_call(prompt: str, system_prompt: str = "", llm=None, cache: Optional[ResponseCache] = None,
+             step: str = "default") -> str:
+    """Calls the LLM with the given prompt and returns the response, served from cache when possible.
+
+    llm may be an LLMRouter, which picks the model tier for the step.
+    """
+    cache = cache if cache is not None else get_cache()
+    llm = llm.route(step) if hasattr(llm, "route") else llm
+    model = model_id(llm)
+    with span("llm_call", step=step, model=model) as s:
+        key = make_key(model, model_temperature(llm), system_prompt, prompt)
+        cached = cache.get(key, step=step)
+        s.set(cache_hit=cached is not None, tokens_in=estimate_tokens(system_prompt + prompt))
+        if cached is not None:
+            s.set(tokens_out=estimate_tokens(cached))
+            return cached
+        if system_prompt:
+            prompt = f"{system_prompt}\n{prompt}"
+        response = llm.invoke(prompt)
+        cache.put(key, response.content, model=model)
+        s.set(tokens_out=estimate_tokens(response.content))
+        return response.content
+
+
+def llm_stream(prompt: str, system_prompt: str = "", llm=None, cache: Optional[ResponseCache] = None,
+               step: str = "default") -> Iterator[str]:
+    """Streams the LLM response token by token, caching the full text once the stream completes."""
+    cache = cache if cache is not None else get_cache()
+    llm = llm.route(step) if hasattr(llm, "route") else llm
+    model = model_id(llm)
+    s = start_span("llm_stream", step=step, model=model)  # Not made current: the caller runs between chunks
+    key = make_key(model, model_temperature(llm), system_prompt, prompt)
+    cached = cache.get(key, step=step)
+    s.set(cache_hit=cached is not None, tokens_in=estimate_tokens(system_prompt + prompt))
+    if cached is not None:
+        s.set(tokens_out=estimate_tokens(cached))
+        s.end()
+        yield cached
+        return
+    if system_prompt:
+        prompt = f"{system_prompt}\n{prompt}"
+    parts = []
+    start = time.perf_counter()
+    try:
+        for chunk in llm.stream(prompt):
+            text = chunk_text(chunk)
+            if not parts:
+                s.set(ttft_ms=round((time.perf_counter() - start) * 1000, 1))
+            parts.append(text)
+            yield text
+    except GeneratorExit:  # The reader stopped early
+        s.set(abandoned=True)
+        s.end()
+        raise
+    except Exception as e:
+        s.end(e)
+        raise
+    cache.put(key, "".join(parts), model=model)
+    s.set(tokens_out=estimate_tokens("".join(parts)))
+    s.end()
+
+
+def extract_xml(text: str, tag: str) -> str:
+    """Extracts the content of the specified XML tag from the given text."""
+    match = re.search(f"<{tag}>(.*?)</{tag}>", text, re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def chain(input: str, prompts: List[str], llm, cache: Optional[ResponseCache] = None) -> str:
+    """Chain multiple LLM calls sequentially, passing results between steps."""
+    result = input
+    with span("chain", steps=len(prompts)):
+        for i, prompt in enumerate(prompts, 1):  # Each llm_call records its own child span with timing and tokens
+            result = llm_call(f"{prompt}\nInput: {result}", llm=llm, cache=cache, step=f"Step {i}")
+    return result
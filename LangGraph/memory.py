@@ -0,0 +1,142 @@
+import json
+from typing import Callable, List, Optional, Tuple
+
+DEFAULT_TOKEN_BUDGET = 4000
+DEFAULT_KEEP_TURNS = 4
+DEFAULT_TOOL_PAYLOAD_CHARS = 1500
+SUMMARY_TOKEN_LIMIT = 600
+
+SUMMARY_PROMPT = """Update the running summary of a chip design conversation.
+Keep design decisions, requirements, numbers and open questions; drop pleasantries and search noise.
+Reply with the updated summary only.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+def estimate_tokens(text) -> int:
+    """Cheap local token estimate (~4 characters per token for English and code).
+
+    Takes a string, a dict or LangChain message, or a list of them (a prompt's messages).
+    """
+    if isinstance(text, (list, tuple)):
+        return sum(estimate_tokens(message) for message in text)
+    if not isinstance(text, str):
+        text = message_content(text)
+    return (len(text) + 3) // 4
+
+
+def message_role(message) -> str:
+    """Returns the role of a dict or LangChain message."""
+    if isinstance(message, dict):
+        return message.get("role", "unknown")
+    role = getattr(message, "role", None) or getattr(message, "type", "unknown")
+    return {"human": "user", "ai": "assistant"}.get(role, role)
+
+
+def message_content(message) -> str:
+    """Returns the text content of a dict or LangChain message."""
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+    return content if isinstance(content, str) else json.dumps(content, default=str)
+
+
+def compact_tool_payload(payload, max_chars: int = DEFAULT_TOOL_PAYLOAD_CHARS) -> str:
+    """Shrinks a tool result (e.g. a list of Tavily hits) to at most about max_chars characters."""
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            pass
+    if isinstance(payload, list) and payload and all(isinstance(hit, dict) for hit in payload):
+        per_hit = max(max_chars // len(payload), 80)
+        lines = []
+        for hit in payload:
+            content = str(hit.get("content", ""))
+            if len(content) > per_hit:
+                content = content[:per_hit].rstrip() + " …"
+            lines.append(f"- {hit.get('url', '')}: {content}")
+        text = "\n".join(lines)
+    else:
+        text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    if len(text) > max_chars:
+        text = text[:max_chars].rstrip() + " …[truncated]"
+    return text
+
+
+def extractive_summary(summary: str, messages: List) -> str:
+    """Offline summarizer: keeps the opening of each message and caps the total size."""
+    lines = [summary] if summary else []
+    for message in messages:
+        if message_role(message) == "tool":
+            continue
+        content = " ".join(message_content(message).split())
+        lines.append(f"{message_role(message)}: {content[:200]}")
+    text = "\n".join(lines)
+    limit = SUMMARY_TOKEN_LIMIT * 4
+    return text[-limit:] if len(text) > limit else text
+
+
+def llm_summarizer(llm) -> Callable[[str, List], str]:
+    """Returns a summarizer that folds new messages into the running summary with the given model."""
+    def summarize(summary: str, messages: List) -> str:
+        transcript = "\n".join(
+            f"{message_role(message)}: {compact_tool_payload(message_content(message), 500)}"
+            for message in messages
+        )
+        try:
+            return llm.invoke(SUMMARY_PROMPT.format(summary=summary or "(empty)", messages=transcript)).content
+        except Exception:
+            return extractive_summary(summary, messages)
+    return summarize
+
+
+class ConversationMemory:
+    """Keeps the last turns verbatim and rolls older turns into an incrementally maintained summary."""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, keep_turns: int = DEFAULT_KEEP_TURNS,
+                 tool_payload_chars: int = DEFAULT_TOOL_PAYLOAD_CHARS,
+                 summarize: Optional[Callable[[str, List], str]] = None):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.tool_payload_chars = tool_payload_chars
+        self.summarize = summarize or extractive_summary
+
+    def _message_tokens(self, message) -> int:
+        content = message_content(message)
+        if message_role(message) == "tool":
+            content = compact_tool_payload(content, self.tool_payload_chars)
+        return estimate_tokens(content) + 4
+
+    def prepare(self, messages: List, summary: str = "", summarized: int = 0) -> Tuple[List, str, int]:
+        """Builds the model context for the next turn.
+
+        Returns the context messages, the updated summary and the number of messages it covers.
+        """
+        turn_starts = [i for i, message in enumerate(messages) if message_role(message) == "user"] or [0]
+        kept = turn_starts[-self.keep_turns:] if self.keep_turns > 0 else [len(messages)]
+        recent_start = max(kept[0], summarized)
+
+        # Only the unsummarized tail is measured, so cost stays flat as the session grows
+        sizes = {i: self._message_tokens(messages[i]) for i in range(recent_start, len(messages))}
+        budget = self.token_budget - estimate_tokens(summary)
+        later_starts = [i for i in turn_starts if i > recent_start]
+        while sum(sizes[i] for i in range(recent_start, len(messages))) > budget and later_starts:
+            recent_start = later_starts.pop(0)
+
+        if recent_start > summarized:
+            summary = self.summarize(summary, messages[summarized:recent_start])
+            summarized = recent_start
+
+        context = []
+        if summary:
+            context.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        for message in messages[recent_start:]:
+            if message_role(message) == "tool":
+                content = compact_tool_payload(message_content(message), self.tool_payload_chars)
+                message = {**message, "content": content} if isinstance(message, dict) \
+                    else message.model_copy(update={"content": content})
+            context.append(message)
+        return context, summary, summarized
@@ -0,0 +1,137 @@
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, Tuple
+
+from throttle import ThrottledModel
+
+DEFAULT_MODEL = os.getenv("COPILOT_MODEL", "google:gemini-1.5-flash")
+
+_models: Dict[Tuple[str, float], object] = {}
+_factories: Dict[str, Callable[[str, float], object]] = {}
+_lock = threading.Lock()
+
+
+class FakeMessage:
+    """Minimal stand-in for a LangChain AIMessage/AIMessageChunk."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.tool_calls = []
+
+
+class FakeProviderError(Exception):
+    """Error raised by FakeChatModel, carrying an HTTP status code like provider SDK errors do."""
+
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"Simulated provider error {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatModel:
+    """In-process chat model with the invoke/stream surface the pipelines use, for tests and benchmarks.
+
+    `respond` maps a prompt to the response text; the default echoes the start of the prompt.
+    `latency` is the delay before the first token, in seconds or as a callable of the prompt.
+    A fraction `error_rate` of calls fails with FakeProviderError(`error_status`) after that delay.
+    """
+
+    def __init__(self, model: str = "fake", temperature: float = 0.0, respond: Callable[[str], str] = None,
+                 latency=0.0, chunk_chars: int = 16, token_delay: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: int = None):
+        self.model = model
+        self.temperature = temperature
+        self.respond = respond or (lambda prompt: f"Response to: {str(prompt)[:80]}")
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _start(self, prompt) -> str:
+        with self._lock:
+            self.calls += 1
+            fail = self.error_rate and self._random.random() < self.error_rate
+        delay = self.latency(prompt) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise FakeProviderError(self.error_status)
+        return self.respond(prompt)
+
+    def invoke(self, prompt, **kwargs) -> FakeMessage:
+        return FakeMessage(self._start(prompt))
+
+    def stream(self, prompt, **kwargs) -> Iterator[FakeMessage]:
+        text = self._start(prompt)
+        for i in range(0, len(text), self.chunk_chars):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield FakeMessage(text[i:i + self.chunk_chars])
+
+    def bind_tools(self, tools, **kwargs) -> "FakeChatModel":
+        return self
+
+
+def _google(model: str, temperature: float):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=model, temperature=temperature, max_retries=0)  # The throttle retries
+
+
+def _groq(model: str, temperature: float):
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(model_name=model, temperature=temperature, max_retries=0)
+
+
+def _ollama(model: str, temperature: float):
+    from langchain_community.chat_models import ChatOllama
+
+    return ChatOllama(model=model, temperature=temperature)
+
+
+def _fake(model: str, temperature: float):
+    return FakeChatModel(model=f"fake:{model}", temperature=temperature)
+
+
+def register_provider(prefix: str, factory: Callable[[str, float], object]) -> None:
+    """Registers a model factory for names of the form "<prefix>:<model>"."""
+    with _lock:
+        _factories[prefix] = factory
+
+
+def get_chat_model(name: str = DEFAULT_MODEL, temperature: float = 0.0):
+    """Returns the process-wide chat model for "<provider>:<model>" (provider defaults to google).
+
+    Models are created once per process and shared by every session, so their HTTP clients and
+    connection pools stay warm across Streamlit reruns. Calls go through the provider's shared
+    throttle (throttle.get_throttle), which queues under the quota and retries rate limits.
+    """
+    key = (name, float(temperature))
+    with _lock:
+        if key in _models:
+            return _models[key]
+    provider, _, model = name.partition(":") if ":" in name else ("google", "", name)
+    factory = _factories.get(provider)
+    if factory is None:
+        raise ValueError(f"Unknown model provider '{provider}' in '{name}'; known: {sorted(_factories)}")
+    instance = ThrottledModel(factory(model, float(temperature)), f"{provider}:{model}")
+    with _lock:
+        return _models.setdefault(key, instance)
+
+
+for _prefix, _factory in (("google", _google), ("groq", _groq), ("ollama", _ollama), ("fake", _fake)):
+    register_provider(_prefix, _factory)
+
+
+def reset_models() -> int:
+    """Drops all cached model instances; returns how many there were."""
+    with _lock:
+        count = len(_models)
+        _models.clear()
+    return count
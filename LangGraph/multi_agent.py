@@ -0,0 +1,218 @@
+"""Orchestrator / AI model / Design multi-agent pipeline with parallel workers.
+
+The notebooks run the three agents one after another (a linear StateGraph, sequential CrewAI tasks,
+an Autogen GroupChat of up to six turns). Here the AI model analysis is split into one worker per
+dimension (power, area, performance, ...) that all run at once, their suggestions are merged, and
+the Design agent validates them in parallel batches before the Orchestrator writes the report. The
+wall time is the slowest dimension plus the slowest batch plus the report, not the sum of all calls.
+Any agent replying with FINAL ANSWER (or a TERMINATE line) ends the run early with that reply.
+With --docs every dimension worker also gets the passages of the local reference index
+(doc_index.py) closest to the task and its dimension, retrieved for all dimensions in one batch.
+
+    python multi_agent.py "How to choose the number of input pins in a chip architecture?" --model router --docs
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from doc_index import DocIndex, format_passages
+from llm_cache import ResponseCache
+from llm_chain import llm_call, llm_stream
+from prompts import (AI_MODEL_ROLE, ANALYSIS_DIMENSIONS, DESIGN_VALIDATION_PROMPT, DIMENSION_PROMPT, ORCHESTRATOR_PROMPT,
+                     REFERENCE_PROMPT)
+from streaming import TimedStream
+from tracing import in_context
+
+AGENT_WORKERS = int(os.getenv("COPILOT_AGENT_WORKERS", 8))
+VALIDATION_BATCH_SIZE = int(os.getenv("COPILOT_VALIDATION_BATCH", 4))
+MAX_SUGGESTIONS_PER_DIMENSION = 5
+# "FINAL ANSWER" anywhere, or "TERMINATE" on a line of its own so "terminate the bus" in a review doesn't count
+TERMINATION = re.compile(r"FINAL ANSWER|^\s*TERMINATE\W*$", re.IGNORECASE | re.MULTILINE)
+SUGGESTION_LINE = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s+(.+)")
+
+
+class Terminated(Exception):
+    """An agent declared the work done; carries its reply."""
+
+    def __init__(self, agent: str, output: str, timings: Dict[str, float]):
+        super().__init__(agent)
+        self.agent = agent
+        self.output = output
+        self.timings = timings
+
+
+def is_final(text: str) -> bool:
+    """True if an agent declared the work done (the LangGraph "FINAL ANSWER" and Autogen "TERMINATE" conventions)."""
+    return bool(TERMINATION.search(text))
+
+
+def strip_final(text: str) -> str:
+    return TERMINATION.sub("", text, count=1).lstrip(" :\n")
+
+
+def parse_suggestions(output: str, limit: int = MAX_SUGGESTIONS_PER_DIMENSION) -> List[str]:
+    """Numbered or bulleted lines of a worker reply; the whole reply if it has no list."""
+    items = [match.group(1).strip() for match in map(SUGGESTION_LINE.match, output.splitlines()) if match]
+    return items[:limit] if items else [output.strip()]
+
+
+def merge_suggestions(analyses: Dict[str, str]) -> List[Tuple[str, str]]:
+    """(dimension, suggestion) pairs in dimension order, dropping suggestions repeated across dimensions."""
+    seen = set()
+    merged = []
+    for dimension, output in analyses.items():
+        for suggestion in parse_suggestions(output):
+            key = re.sub(r"\W+", " ", suggestion.lower()).strip()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append((dimension, suggestion))
+    return merged
+
+
+def _run_parallel(calls: Dict[str, Callable[[], str]], max_workers: int,
+                  on_agent: Optional[Callable[[str, str, float], None]]) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Runs named agent calls concurrently; raises Terminated as soon as one declares the work done."""
+    outputs: Dict[str, str] = {}
+    timings: Dict[str, float] = {}
+
+    def timed(call):
+        start = time.perf_counter()
+        output = call()
+        return output, time.perf_counter() - start
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    running = {executor.submit(in_context(timed), call): name for name, call in calls.items()}
+    try:
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                outputs[name], timings[name] = future.result()
+                if on_agent is not None:
+                    on_agent(name, outputs[name], timings[name])
+                if is_final(outputs[name]):
+                    raise Terminated(name, strip_final(outputs[name]), timings)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)  # After a termination, queued agents never start
+    return {name: outputs[name] for name in calls}, timings
+
+
+def analyze_dimensions(task: str, llm, dimensions: Dict[str, str] = None, max_workers: int = AGENT_WORKERS,
+                       cache: Optional[ResponseCache] = None,
+                       on_agent: Optional[Callable[[str, str, float], None]] = None,
+                       references: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """AI model agent: one worker per dimension, all at once, each with its reference notes if given."""
+    dimensions = dimensions or ANALYSIS_DIMENSIONS
+    references = references or {}
+    calls = {
+        f"ai_model:{name}": (lambda focus=focus, name=name: llm_call(
+            f"{DIMENSION_PROMPT.format(dimension=focus)}\nTask: {task}"
+            + (f"\n{REFERENCE_PROMPT.format(passages=references[name])}" if references.get(name) else ""),
+            system_prompt=AI_MODEL_ROLE, llm=llm, cache=cache, step=f"ai_model:{name}"))
+        for name, focus in dimensions.items()
+    }
+    outputs, timings = _run_parallel(calls, max_workers, on_agent)
+    return {name.split(":", 1)[1]: output for name, output in outputs.items()}, timings
+
+
+def validate_suggestions(task: str, suggestions: List[Tuple[str, str]], llm, batch_size: int = VALIDATION_BATCH_SIZE,
+                         max_workers: int = AGENT_WORKERS, cache: Optional[ResponseCache] = None,
+                         on_agent: Optional[Callable[[str, str, float], None]] = None) -> Tuple[List[str], Dict[str, float]]:
+    """Design agent: validates the merged suggestions in batches of batch_size, all batches at once."""
+    batches = [suggestions[i:i + batch_size] for i in range(0, len(suggestions), batch_size)]
+    calls = {}
+    for i, batch in enumerate(batches, 1):
+        listing = "\n".join(f"{n}. [{dimension}] {suggestion}" for n, (dimension, suggestion) in enumerate(batch, 1))
+        prompt = f"{DESIGN_VALIDATION_PROMPT}\nTask: {task}\nSuggestions:\n{listing}"
+        calls[f"design:batch {i}/{len(batches)}"] = lambda prompt=prompt: llm_call(prompt, llm=llm, cache=cache,
+                                                                                 step="design_validation")
+    outputs, timings = _run_parallel(calls, max_workers, on_agent)
+    return list(outputs.values()), timings
+
+
+def orchestrator_prompt(task: str, dimensions: List[str], validations: List[str]) -> str:
+    sections = "\n\n".join(f"### Design review {i}\n{text}" for i, text in enumerate(validations, 1))
+    return f"{ORCHESTRATOR_PROMPT}\nTask: {task}\nDimensions analyzed: {', '.join(dimensions)}\nInputs:\n{sections}"
+
+
+def retrieve_references(task: str, docs: DocIndex, dimensions: Dict[str, str] = None, k: int = 2) -> Dict[str, str]:
+    """Reference notes per dimension: the passages closest to the task and the dimension, in one batched search."""
+    dimensions = dimensions or ANALYSIS_DIMENSIONS
+    results = docs.search_many([f"{task}\n{focus}" for focus in dimensions.values()], k)
+    return {name: format_passages(passages) for name, passages in zip(dimensions, results) if passages}
+
+
+def _prepare(task: str, llm, dimensions, max_workers, batch_size, cache, on_agent, docs=None):
+    """Runs the AI model and Design stages; returns the Orchestrator prompt and the timings so far."""
+    references = retrieve_references(task, docs, dimensions) if docs is not None else None
+    analyses, timings = analyze_dimensions(task, llm, dimensions, max_workers, cache, on_agent, references)
+    suggestions = merge_suggestions(analyses)
+    try:
+        validations, validation_timings = validate_suggestions(task, suggestions, llm, batch_size, max_workers, cache,
+                                                               on_agent)
+    except Terminated as final:
+        final.timings = {**timings, **final.timings}
+        raise
+    timings.update(validation_timings)
+    return orchestrator_prompt(task, list(analyses), validations), timings
+
+
+def run_pipeline(task: str, llm, dimensions: Dict[str, str] = None, max_workers: int = AGENT_WORKERS,
+                 batch_size: int = VALIDATION_BATCH_SIZE, cache: Optional[ResponseCache] = None,
+                 on_agent: Optional[Callable[[str, str, float], None]] = None,
+                 docs: Optional[DocIndex] = None) -> Tuple[str, Dict[str, float]]:
+    """Runs the pipeline; returns the Orchestrator's report (or an early FINAL ANSWER) and each agent call's wall time."""
+    try:
+        prompt, timings = _prepare(task, llm, dimensions, max_workers, batch_size, cache, on_agent, docs)
+    except Terminated as final:
+        return final.output, final.timings
+    start = time.perf_counter()
+    report = llm_call(prompt, llm=llm, cache=cache, step="orchestrator")
+    timings["orchestrator"] = time.perf_counter() - start
+    return strip_final(report), timings
+
+
+def stream_pipeline(task: str, llm, dimensions: Dict[str, str] = None, max_workers: int = AGENT_WORKERS,
+                    batch_size: int = VALIDATION_BATCH_SIZE, cache: Optional[ResponseCache] = None,
+                    on_agent: Optional[Callable[[str, str, float], None]] = None,
+                    start: Optional[float] = None, docs: Optional[DocIndex] = None) -> Tuple[TimedStream, Dict[str, float]]:
+    """Runs the AI model and Design stages, then returns a token stream of the Orchestrator's report."""
+    start = start if start is not None else time.perf_counter()
+    try:
+        prompt, timings = _prepare(task, llm, dimensions, max_workers, batch_size, cache, on_agent, docs)
+    except Terminated as final:
+        return TimedStream(iter([final.output]), name="multi_agent", start=start), final.timings
+
+    def tokens() -> Iterator[str]:
+        step_start = time.perf_counter()
+        yield from llm_stream(prompt, llm=llm, cache=cache, step="orchestrator")
+        timings["orchestrator"] = time.perf_counter() - step_start
+
+    return TimedStream(tokens(), name="multi_agent", start=start), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("task", help="Chip design question or upgrade request")
+    parser.add_argument("--model", default="router", help='"router" or "provider:model"')
+    parser.add_argument("--workers", type=int, default=AGENT_WORKERS, help="Agent calls run at once")
+    parser.add_argument("--batch-size", type=int, default=VALIDATION_BATCH_SIZE, help="Suggestions per Design review")
+    parser.add_argument("--docs", action="store_true", help="Give the dimension workers notes from the local docs index")
+    args = parser.parse_args()
+
+    from doc_index import get_doc_index
+    from router import select_model
+
+    report, timings = run_pipeline(args.task, select_model(args.model), max_workers=args.workers,
+                                   batch_size=args.batch_size,
+                                   on_agent=lambda name, output, seconds: print(f"{name}: {seconds:.2f}s"),
+                                   docs=get_doc_index() if args.docs else None)
+    print(f"\n{report}\n")
+    print(f"agent time {sum(timings.values()):.2f}s across {len(timings)} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from step_graph import INPUT, Step
+
+# Initial input for the architecture report (App.py)
+Designcopilot = """Expert Chip Design Copilot Agent specializing in chip design architecture. Your role is to assist users in understanding and improving their chip designs by providing detailed analysis, insights, and optimization suggestions. You combine technical knowledge to deliver comprehensive and actionable information for users. Your guidance accelerates the design process, offering prescriptive insights and recommendations. Return your response in Markdown format."""
+
+# Initial input for the Verilog report (Workflow_app.py)
+VerilogDesigncopilot = """Expert Chip Design Copilot Agent specializing in analyzing Verilog code. Your role is to assist users in understanding and improving their chip designs by providing detailed analysis and suggestions for optimization and debugging. Begin by analyzing the Verilog code or VHDL code provided by the user."""
+
+# Steps shared by both reports once the design has been described
+ISSUES_PROMPT = """Highlight potential issues or areas for improvement in chip design, including:
+        * Performance
+        * Reliability
+        * Cost
+        * Security
+        * Area
+        * Pin count
+        * Manufacturing complexity"""
+
+AI_UPGRADE_PROMPT = """Suggest how traditional chip design can be upgraded with AI capabilities."""
+
+BLUEPRINT_PROMPT = """Generate a blueprint report of the chip design, detailing:
+        * The current architecture and its analysis
+        * Suggested improvements for optimization covering performance, reliability, cost, security, area, pin count, and manufacturing complexity
+        * How AI can be incorporated into the existing design"""
+
+CHANGES_PROMPT = """Mention and describe the changes incorporated during the upgrade to AI-enhanced design."""
+
+FORMATTING_PROMPTS = [
+    """Use technical terminology appropriately and provide explanations for complex concepts.""",
+    """Present the information in a clear and organized manner. Use headings, bullet points, and formatting to enhance readability.""",
+    """Remember the user may not be an expert in chip design; explain technical concepts in simple terms.""",
+]
+
+
+def report_steps(source: str = INPUT):
+    """Returns the issue/upgrade/blueprint/formatting steps, reading the design from `source`."""
+    return [
+        Step("issues", ISSUES_PROMPT, [source]),
+        Step("ai_upgrade", AI_UPGRADE_PROMPT, [source]),
+        Step("blueprint", BLUEPRINT_PROMPT, ["issues", "ai_upgrade"]),
+        Step("changes", CHANGES_PROMPT, ["blueprint"]),
+        Step("terminology", FORMATTING_PROMPTS[0], ["changes"], fusable=True),
+        Step("layout", FORMATTING_PROMPTS[1], ["terminology"], fusable=True),
+        Step("plain_language", FORMATTING_PROMPTS[2], ["layout"], fusable=True),
+    ]
+
+
+# Re-report after an edit (Workflow_app.py): one call revises the previous report for the changed units only
+REPORT_REVISION_PROMPT = """The Verilog/VHDL design behind the chip design report below was edited. Revise the report for the changed, added or removed design units listed after it: update their analysis, issues, suggested improvements, AI upgrades and the described changes, and any overall conclusions they affect. Keep every other part of the report as it is, with the same headings, formatting and plain-language explanations. Return the complete revised report in Markdown format."""
+
+# Define the prompt chaining steps for App.py
+data_processing_steps = report_steps()
+
+# Per-design-unit prompts for the HDL ingestion stage (hdl_ingest.py)
+MODULE_SUMMARY_PROMPT = """Summarize this HDL design unit for a chip design review in at most 150 words. Cover its purpose, ports and parameters, clocks and resets, instantiated submodules, and any bugs, inferred latches, timing or optimization concerns."""
+
+DIGEST_REDUCE_PROMPT = """Condense these design unit summaries into one summary of at most 300 words, keeping unit names, the hierarchy between them, and every bug or optimization concern."""
+
+# Define the prompt chaining steps for Workflow_app.py; the input is the design digest from hdl_ingest.py
+verilog_processing_steps = [
+    Step("analyze", """Analyze the Verilog or VHDL design described by the design unit summaries, offer suggestions for optimization and debugging."""),
+] + report_steps("analyze")
+
+# Multi-agent pipeline (multi_agent.py): Orchestrator -> parallel AI model workers -> batched Design validation
+AI_MODEL_ROLE = """You are the AI Model Agent of a chip design team. Analyze the chip design task and suggest actionable improvements with justifications and predicted impact."""
+
+ANALYSIS_DIMENSIONS = {
+    "power": "Power consumption: dynamic and static power, efficiency, clock and power gating.",
+    "area": "Area: logic and memory footprint, resource sharing, floorplan.",
+    "performance": "Performance: speed, latency, throughput, critical paths.",
+    "reliability": "Reliability: robustness, failure rate, error detection and correction, aging.",
+    "cost": "Cost: manufacturing complexity, yield, process node and packaging.",
+    "security": "Security: side channels, debug interfaces, secure boot, fault injection.",
+    "pin_count": "Pin count: number and type of I/O pins, multiplexing, packaging constraints.",
+}
+
+DIMENSION_PROMPT = """Focus only on this dimension: {dimension}
+List at most 5 concrete suggestions as a numbered list, one line each, with a short justification. If the task can be answered completely from this dimension alone, start your reply with FINAL ANSWER."""
+
+REFERENCE_PROMPT = """Reference notes from the local documentation; rely on them where they apply and say which you used:
+{passages}"""
+
+DESIGN_VALIDATION_PROMPT = """You are the Design Copilot Agent, a gatekeeper with deep EDA and chip architecture expertise. Validate each AI-generated suggestion below for feasibility, correctness and compliance with design constraints. For every suggestion give ACCEPT, MODIFY (with the updated version) or REJECT, a one-line justification, and any risks or conflicts with the other suggestions."""
+
+ORCHESTRATOR_PROMPT = """You are the Orchestrator of the chip design team. Integrate the validated suggestions into a final chip design report for the task: accepted and modified changes grouped by dimension, rejected suggestions with reasons, risks, and the expected impact of the upgrade. Return your response in Markdown format."""
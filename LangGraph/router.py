@@ -0,0 +1,263 @@
+"""Routes LLM calls across providers by step cost tier, with latency tracking, failover and hedging.
+
+llm_call/llm_stream ask the router for a tier-bound model per step (route(step)); formatting steps
+go to the cheap tier and analysis steps to the strong tier. Within a tier, providers are tried
+fastest first; 429/5xx and connection errors fail over to the next provider, and an invoke that
+runs past the primary's p95 latency (hedge_quantile) can be hedged with a second request.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from models import FakeChatModel, get_chat_model
+from throttle import is_retryable
+from tracing import in_context, span
+
+CHEAP, STRONG = "cheap", "strong"
+DEFAULT_TIERS = {
+    STRONG: os.getenv("COPILOT_ROUTER_STRONG", "google:gemini-1.5-flash,groq:llama3-70b-8192").split(","),
+    CHEAP: os.getenv("COPILOT_ROUTER_CHEAP", "groq:llama3-8b-8192,google:gemini-1.5-flash").split(","),
+}
+# Steps that only reformat text; everything else is analysis and goes to the strong tier
+CHEAP_STEPS = {"terminology", "layout", "plain_language", "digest_reduce"}
+# Options of the apps' model picker; "router" routes each step across the tiers above
+MODEL_CHOICES = ["router", "google:gemini-1.5-flash", "groq:llama3-70b-8192", "groq:llama3-8b-8192",
+                 "groq:deepseek-r1-distill-qwen-32b", "ollama:llama3.2:1b"]
+COOLDOWN_SECONDS = 30.0
+MIN_SAMPLES = 5  # Latency samples needed before a provider's percentiles are trusted
+
+
+def step_tier(step: str) -> str:
+    """Cheap tier for formatting steps (including fused runs of them), strong tier otherwise."""
+    return CHEAP if step and all(part in CHEAP_STEPS for part in step.split("+")) else STRONG
+
+
+class ProviderStats:
+    """Rolling latency and outcome window of one provider."""
+
+    def __init__(self, window: int = 200):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.cooldown_until = 0.0
+        self.counts = {"calls": 0, "errors": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0}
+
+    def percentile(self, q: float) -> Optional[float]:
+        ordered = sorted(self.latencies)
+        if len(ordered) < MIN_SAMPLES:
+            return None
+        return ordered[int(q * (len(ordered) - 1))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def expected_latency(self) -> float:
+        """p50 inflated by the error rate; unmeasured providers rank first so they get measured."""
+        p50 = self.percentile(0.50)
+        return 0.0 if p50 is None else p50 * (1 + 4 * self.error_rate)
+
+
+class RoutedModel:
+    """Chat-model view of one tier; llm_call and llm_stream use it like any LangChain model."""
+
+    def __init__(self, router: "LLMRouter", tier: str):
+        self.router = router
+        self.tier = tier
+        self.model = f"router:{tier}:{'/'.join(router.tiers[tier])}"
+        self.temperature = router.temperature
+
+    def invoke(self, prompt, **kwargs):
+        return self.router.invoke(self.tier, prompt, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        return self.router.stream(self.tier, prompt, **kwargs)
+
+
+class LLMRouter:
+    """Multi-provider router; providers are "provider:model" names resolved through get_chat_model."""
+
+    def __init__(self, tiers: Dict[str, List[str]] = None, temperature: float = 0.0, hedge: bool = True,
+                 hedge_quantile: float = 0.95, cooldown: float = COOLDOWN_SECONDS, resolve: Callable[[str, float], object] = get_chat_model,
+                 max_workers: int = 16):
+        self.tiers = {tier: [name.strip() for name in names if name.strip()] for tier, names in (tiers or DEFAULT_TIERS).items()}
+        self.temperature = temperature
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.cooldown = cooldown
+        self.resolve = resolve
+        self.stats: Dict[str, ProviderStats] = {
+            name: ProviderStats() for names in self.tiers.values() for name in names
+        }
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+        self._routes = {tier: RoutedModel(self, tier) for tier in self.tiers}
+
+    def route(self, step: str) -> RoutedModel:
+        """Returns the tier-bound model for a chain step."""
+        tier = step_tier(step)
+        return self._routes.get(tier) or self._routes[STRONG]
+
+    def candidates(self, tier: str) -> List[str]:
+        """Providers of a tier, fastest healthy first; providers cooling down after errors go last."""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.tiers[tier], key=lambda name: (
+                self.stats[name].cooldown_until > now, self.stats[name].expected_latency()))
+
+    def _record(self, name: str, seconds: Optional[float], error: Optional[Exception] = None) -> None:
+        with self._lock:
+            stats = self.stats[name]
+            stats.counts["calls"] += 1
+            stats.outcomes.append(error is None)
+            if error is None:
+                stats.latencies.append(seconds)
+            else:
+                stats.counts["errors"] += 1
+                if is_retryable(error):
+                    stats.cooldown_until = time.monotonic() + self.cooldown
+
+    def _model(self, name: str):
+        """Resolves a provider; a provider that cannot be built (missing key or package) counts as down."""
+        try:
+            model = self.resolve(name, self.temperature)
+        except Exception as e:
+            raise ConnectionError(f"{name} is unavailable: {e}") from e
+        # Fail over to the next provider instead of backing off on this one
+        return model.with_retries(0) if hasattr(model, "with_retries") else model
+
+    def warm(self) -> Dict[str, str]:
+        """Builds every provider's client ahead of the first call; returns the ones that could not be built."""
+        failed = {}
+        for name in self.stats:
+            try:
+                self._model(name)
+            except ConnectionError as e:
+                failed[name] = str(e)
+        return failed
+
+    def _call(self, name: str, prompt, kwargs):
+        start = time.perf_counter()
+        try:
+            with span("provider_call", provider=name):
+                response = self._model(name).invoke(prompt, **kwargs)
+        except Exception as e:
+            self._record(name, None, e)
+            raise
+        self._record(name, time.perf_counter() - start)
+        return response
+
+    def invoke(self, tier: str, prompt, **kwargs):
+        """Invokes the fastest provider, failing over on retryable errors and hedging slow calls."""
+        names = self.candidates(tier)
+        errors = []
+        pending = {}  # Future -> provider name
+        primary = None
+        while names or pending:
+            if not pending:
+                primary = names.pop(0)
+                pending[self._executor.submit(in_context(self._call), primary, prompt, kwargs)] = primary
+            hedge_after = None
+            if self.hedge and names and len(pending) == 1:
+                hedge_after = self.stats[primary].percentile(self.hedge_quantile)
+            done, _ = wait(pending, timeout=hedge_after, return_when=FIRST_COMPLETED)
+            if not done:  # The primary is past its usual latency: race the next provider against it
+                with self._lock:
+                    self.stats[primary].counts["hedges"] += 1
+                name = names.pop(0)
+                pending[self._executor.submit(in_context(self._call), name, prompt, kwargs)] = name
+                continue
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    errors.append(f"{name}: {e}")
+                    with self._lock:
+                        self.stats[name].counts["failovers"] += 1
+                    continue
+                if name != primary:
+                    with self._lock:
+                        self.stats[name].counts["hedge_wins"] += 1
+                return response  # A losing hedge finishes in the background and only updates the stats
+        raise RuntimeError(f"All providers of the {tier} tier failed: {'; '.join(errors)}")
+
+    def stream(self, tier: str, prompt, **kwargs) -> Iterator:
+        """Streams from the fastest provider, failing over on retryable errors before the first chunk."""
+        errors = []
+        for name in self.candidates(tier):
+            start = time.perf_counter()
+            try:
+                chunks = iter(self._model(name).stream(prompt, **kwargs))
+                first = next(chunks)
+            except StopIteration:
+                self._record(name, time.perf_counter() - start)
+                return
+            except Exception as e:
+                self._record(name, None, e)
+                if not is_retryable(e):
+                    raise
+                errors.append(f"{name}: {e}")
+                with self._lock:
+                    self.stats[name].counts["failovers"] += 1
+                continue
+            self._record(name, time.perf_counter() - start)  # Time to first chunk
+            yield first
+            yield from chunks
+            return
+        raise RuntimeError(f"All providers of the {tier} tier failed: {'; '.join(errors)}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-provider p50/p95 latency, error rate and failover/hedge counts."""
+        with self._lock:
+            return {
+                name: {
+                    "p50": stats.percentile(0.50),
+                    "p95": stats.percentile(0.95),
+                    "error_rate": round(stats.error_rate, 3),
+                    **stats.counts,
+                }
+                for name, stats in self.stats.items()
+            }
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> LLMRouter:
+    """Returns the process-wide router over DEFAULT_TIERS."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter()
+        return _router
+
+
+def select_model(name: str):
+    """Model for a picker choice: the shared router, or one fixed "provider:model"."""
+    return get_router() if name == "router" else get_chat_model(name)
+
+
+def warm_model(name: str) -> None:
+    """Warm-up task for a picker choice: builds the model (every provider, for the router) and its SDK."""
+    model = select_model(name)
+    if hasattr(model, "warm"):
+        model.warm()
+
+
+def simulated_provider(name: str, median: float, sigma: float = 0.5, error_rate: float = 0.0,
+                       error_status: int = 503, seed: int = None) -> FakeChatModel:
+    """Local stub provider with log-normal latency around `median` seconds, for tests and benchmarks.
+
+        stubs = {"fast": simulated_provider("fast", 0.05), "flaky": simulated_provider("flaky", 0.02, error_rate=0.3)}
+        router = LLMRouter({"strong": ["flaky", "fast"], "cheap": ["fast"]}, resolve=lambda name, t: stubs[name])
+    """
+    rng = random.Random(seed)
+    return FakeChatModel(model=name, latency=lambda prompt: rng.lognormvariate(0, sigma) * median,
+                         error_rate=error_rate, error_status=error_status, seed=seed)
@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_cache import CACHE_DIR, ResponseCache, make_key
+
+SEARCH_TTL_SECONDS = 24 * 3600
+SEARCH_MAX_ENTRIES = 5000
+
+# A backend takes (query, max_results) and returns a list of {"url", "content", ...} hits
+SearchBackend = Callable[[str, int], List[Dict[str, Any]]]
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a query so trivially different phrasings share a cache entry."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.strip(" ?!.,;:\"'")
+
+
+def tavily_backend(api_key: Optional[str] = None) -> SearchBackend:
+    """Returns a backend that queries the Tavily search API."""
+    from tavily import TavilyClient
+
+    client = TavilyClient(api_key=api_key or os.getenv("TAVILY_API_KEY"))
+
+    def search(query: str, max_results: int) -> List[Dict[str, Any]]:
+        response = client.search(query, max_results=max_results)
+        return [{"url": hit.get("url", ""), "content": hit.get("content", "")} for hit in response.get("results", [])]
+    return search
+
+
+def stub_backend(results: Optional[Dict[str, List[Dict[str, Any]]]] = None, latency: float = 0.0) -> SearchBackend:
+    """Returns an offline backend serving canned hits, for tests and benchmarks."""
+    calls = []
+
+    def search(query: str, max_results: int) -> List[Dict[str, Any]]:
+        calls.append(query)
+        if latency:
+            time.sleep(latency)
+        hits = (results or {}).get(normalize_query(query))
+        if hits is None:
+            hits = [{"url": f"https://example.com/{i}", "content": f"Result {i} for {query}"} for i in range(max_results)]
+        return hits[:max_results]
+    search.calls = calls
+    return search
+
+
+class CachedSearch:
+    """Search wrapper with a normalized-query disk cache and in-flight request coalescing."""
+
+    def __init__(self, backend: SearchBackend, max_results: int = 5, cache: Optional[ResponseCache] = None,
+                 name: str = "tavily"):
+        if cache is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            cache = ResponseCache(
+                path=os.path.join(CACHE_DIR, "search_results.sqlite"),
+                max_entries=SEARCH_MAX_ENTRIES,
+                ttl_seconds=SEARCH_TTL_SECONDS,
+            )
+        self.backend = backend
+        self.max_results = max_results
+        self.cache = cache
+        self.name = name
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def search(self, query: str, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Returns hits for query, from cache, from an identical in-flight call, or from the backend."""
+        max_results = max_results or self.max_results
+        normalized = normalize_query(query)
+        key = make_key(f"search:{self.name}", max_results, "", normalized)
+        cached = self.cache.get(key, step=f"search:{self.name}")
+        if cached is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return json.loads(cached)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            hits = self.backend(normalized, max_results)
+            self.cache.put(key, json.dumps(hits), model=f"search:{self.name}")
+            future.set_result(hits)
+            return hits
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+_searches: Dict[int, CachedSearch] = {}
+_searches_lock = threading.Lock()
+
+
+def get_search(max_results: int = 5) -> CachedSearch:
+    """Returns the process-wide Tavily search wrapper for the given result count."""
+    with _searches_lock:
+        if max_results not in _searches:
+            _searches[max_results] = CachedSearch(tavily_backend(), max_results=max_results)
+        return _searches[max_results]
+
+
+def make_search_tool(search: CachedSearch):
+    """Wraps a CachedSearch as a LangChain tool with the same name as TavilySearchResults."""
+    from langchain_core.tools import tool
+
+    @tool("tavily_search_results_json")
+    def tavily_search_results_json(query: str) -> List[Dict[str, Any]]:
+        """A search engine optimized for comprehensive, accurate, and trusted results.
+        Useful for when you need to answer questions about current events. Input should be a search query."""
+        return search.search(query)
+    return tavily_search_results_json
+
+
+def make_tavily_tools(search: CachedSearch):
+    """Returns a phi TavilyTools toolkit whose searches go through the shared cache."""
+    from phi.tools.tavily import TavilyTools
+
+    class CachedTavilyTools(TavilyTools):
+        def web_search_using_tavily(self, query: str, max_results: int = 5) -> str:
+            """Use this function to search the web for a given query.
+            This function uses the Tavily API to provide realtime online information about the query.
+
+            Args:
+                query (str): Query to search for.
+                max_results (int): Maximum number of results to return. Defaults to 5.
+
+            Returns:
+                str: JSON string of results related to the query.
+            """
+            return json.dumps({"query": query, "results": search.search(query, max_results)})
+
+    return CachedTavilyTools(api_key=os.getenv("TAVILY_API_KEY"))
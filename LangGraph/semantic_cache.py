@@ -0,0 +1,247 @@
+"""Semantic answer cache: serves a stored answer when a new question means the same as an earlier one.
+
+Questions are embedded offline (embeddings.HashingEmbedder) into the rows of a memory-mapped
+float32 matrix; the answers and bookkeeping live in SQLite next to it. A lookup is one
+matrix-vector product over the occupied rows plus an argpartition top-k: 0.8 ms median at
+20,000 entries of the default 256 dimensions, bound by reading the matrix from memory
+(benchmarks/semantic_cache_bench.py).
+
+A candidate is a hit when its cosine similarity reaches the threshold and it names the same
+identifiers, numbers and design topics ("check_timing" is not "report_timing", a 16-to-1 MUX is
+not an 8-to-1 MUX, area is not power). The default threshold of 0.6 serves 27 of 39 paraphrases
+of the Demo Sample Queries (69%) and no wrong answer to them or to 19 related questions; at 0.55
+the first wrong answer appears (benchmarks/semantic_cache_bench.py). Entries belong to a namespace built from the model and a prompt version, so changing
+either stops old answers from being served; invalidate() drops them for good. Beyond
+max_entries the least recently used entry's row is reused; entries older than ttl_seconds
+are never served.
+
+One process writes a cache directory; Streamlit serves every session from one process.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from embeddings import WORD, HashingEmbedder, get_embedder, stem
+from llm_cache import CACHE_DIR, DEFAULT_TTL_SECONDS
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("COPILOT_SEMANTIC_MAX_ENTRIES", 50000))
+DEFAULT_THRESHOLD = float(os.getenv("COPILOT_SEMANTIC_THRESHOLD", 0.6))
+INITIAL_ROWS = 1024
+DUPLICATE_SIMILARITY = 0.98  # Storing a near-identical question replaces the earlier entry
+CANDIDATES = 5
+# Design metrics and tasks that change the answer when swapped ("area optimization" is not "power optimization")
+TOPIC_WORDS = ("power", "area", "timing", "performance", "latency", "throughput", "skew", "period", "leakage",
+               "reliability", "security", "cost", "yield", "verification", "simulation", "testing", "placement",
+               "routing", "schematic", "layout", "library", "coherence")
+TOPIC_STEMS = frozenset(stem(word) for word in TOPIC_WORDS)
+
+
+class Match(NamedTuple):
+    score: float
+    question: str
+    answer: str
+
+
+def answer_namespace(model: str, *prompts: str) -> str:
+    """Identifies the model and prompt version an answer was produced with."""
+    digest = hashlib.sha256()
+    for part in (model, *prompts):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+def _namespace_id(namespace: str) -> int:
+    """Non-zero 63-bit id of a namespace; 0 marks a free row."""
+    value = int.from_bytes(hashlib.blake2b(namespace.encode("utf-8"), digest_size=8).digest(), "little")
+    return (value >> 1) or 1
+
+
+def key_terms(text: str) -> frozenset:
+    """Identifiers, numbers and design topics in a question; answers about different ones are not interchangeable."""
+    words = WORD.findall(text.lower())
+    return frozenset(word for word in words if any(c.isdigit() or c == "_" for c in word)) | \
+        frozenset(stem(word) for word in words if stem(word) in TOPIC_STEMS)
+
+
+class SemanticCache:
+    """Memory-mapped embedding matrix with cosine top-k lookup, backed by a SQLite answer store."""
+
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[HashingEmbedder] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, threshold: float = DEFAULT_THRESHOLD,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        self.embedder = embedder or get_embedder()
+        # One directory per embedder, so a dimension or feature change starts an empty cache
+        self.directory = os.path.join(directory or os.path.join(CACHE_DIR, "semantic"), self.embedder.name)
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._touched = set()  # Rows whose access time changed since the last store
+        self._conn = sqlite3.connect(os.path.join(self.directory, "answers.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS answers (
+                row INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        rows = self._conn.execute("SELECT row, namespace, created, accessed FROM answers").fetchall()
+        self._used = max((row for row, *_ in rows), default=-1) + 1  # Rows below this may be occupied
+        self._open(max(INITIAL_ROWS, self._used))
+        for row, namespace, created, accessed in rows:
+            self._namespaces[row] = _namespace_id(namespace)
+            self._created[row] = created
+            self._accessed[row] = accessed
+
+    def _open(self, capacity: int) -> None:
+        """Maps the vector file with room for `capacity` rows, growing the file and the row arrays."""
+        size = capacity * self.embedder.dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.embedder.dim))
+        namespaces = np.zeros(capacity, dtype=np.int64)
+        created = np.zeros(capacity, dtype=np.float64)
+        accessed = np.zeros(capacity, dtype=np.float64)
+        if hasattr(self, "_namespaces"):
+            namespaces[:len(self._namespaces)] = self._namespaces
+            created[:len(self._created)] = self._created
+            accessed[:len(self._accessed)] = self._accessed
+        self._namespaces = namespaces
+        self._created = created
+        self._accessed = accessed
+        self.capacity = capacity
+
+    def _scores(self, vector: np.ndarray, namespace_id: int, now: float) -> np.ndarray:
+        """Cosine similarity of every occupied row; rows of other namespaces, free or expired rows get -1."""
+        used = self._used
+        scores = self._vectors[:used] @ vector
+        stale = self._namespaces[:used] != namespace_id
+        if self.ttl_seconds is not None:
+            stale |= self._created[:used] < now - self.ttl_seconds
+        scores[stale] = -1.0
+        return scores
+
+    def _top(self, scores: np.ndarray, k: int) -> List[int]:
+        if k < len(scores):
+            rows = np.argpartition(-scores, k)[:k]
+        else:
+            rows = np.arange(len(scores))
+        return [int(row) for row in rows[np.argsort(-scores[rows])] if scores[row] > 0]
+
+    def _candidates(self, question: str, namespace: str, k: int) -> List[tuple]:
+        """(row, Match) of the k most similar cached questions of the namespace, best first."""
+        vector = self.embedder.embed(question)
+        with self._lock:
+            scores = self._scores(vector, _namespace_id(namespace), time.time())
+            rows = self._top(scores, k)
+            if not rows:
+                return []
+            placeholders = ",".join("?" * len(rows))
+            stored = dict((row, (q, a)) for row, q, a in self._conn.execute(
+                f"SELECT row, question, answer FROM answers WHERE row IN ({placeholders})", rows))
+        return [(row, Match(float(scores[row]), *stored[row])) for row in rows if row in stored]
+
+    def search(self, question: str, namespace: str, k: int = CANDIDATES) -> List[Match]:
+        """The k most similar cached questions of the namespace, best first, whatever their score."""
+        return [match for _, match in self._candidates(question, namespace, k)]
+
+    def lookup(self, question: str, namespace: str) -> Optional[Match]:
+        """Returns the cached answer to an equivalent question, or None."""
+        terms = key_terms(question)
+        for row, match in self._candidates(question, namespace, CANDIDATES):
+            if match.score < self.threshold:
+                break
+            if key_terms(match.question) == terms:
+                with self._lock:
+                    # Kept in memory and written with the next store, so a hit never waits on the disk
+                    self._accessed[row] = time.time()
+                    self._touched.add(row)
+                    self.stats["hits"] += 1
+                return match
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def store(self, question: str, namespace: str, answer: str) -> None:
+        """Caches an answer, replacing a near-identical question's entry or the least recently used one."""
+        vector = self.embedder.embed(question)
+        namespace_id = _namespace_id(namespace)
+        now = time.time()
+        with self._lock:
+            scores = self._scores(vector, namespace_id, now)
+            rows = self._top(scores, 1)
+            if rows and scores[rows[0]] >= DUPLICATE_SIMILARITY:
+                row = rows[0]
+            else:
+                row = self._free_row()
+            self._vectors[row] = vector
+            self._vectors.flush()
+            self._namespaces[row] = namespace_id
+            self._created[row] = now
+            self._accessed[row] = now
+            self._touched.discard(row)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (row, namespace, question, answer, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (row, namespace, question, answer, now, now))
+            self._conn.executemany("UPDATE answers SET accessed = ? WHERE row = ?",
+                                   [(float(self._accessed[touched]), touched) for touched in self._touched])
+            self._touched.clear()
+            self._conn.commit()
+            self.stats["stores"] += 1
+
+    def _free_row(self) -> int:
+        """A row to write: a free one, a new one, or the least recently used entry's (evicted)."""
+        free = np.flatnonzero(self._namespaces[:self._used] == 0)
+        if len(free):
+            return int(free[0])
+        if self._used < self.max_entries:
+            if self._used == self.capacity:
+                self._open(min(self.capacity * 2, self.max_entries))
+            self._used += 1
+            return self._used - 1
+        self.stats["evictions"] += 1
+        return int(np.argmin(self._accessed[:self._used]))
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Drops every entry of a namespace (all entries if None); returns how many were dropped."""
+        with self._lock:
+            if namespace is None:
+                count = self._conn.execute("DELETE FROM answers").rowcount
+                self._namespaces[:] = 0
+            else:
+                count = self._conn.execute("DELETE FROM answers WHERE namespace = ?", (namespace,)).rowcount
+                self._namespaces[self._namespaces == _namespace_id(namespace)] = 0
+            self._conn.commit()
+            return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._namespaces[:self._used]))
+
+
+_caches: Dict[str, SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(name: str = "chatbot") -> SemanticCache:
+    """Returns the process-wide semantic cache stored under CACHE_DIR/semantic/<name>."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SemanticCache(os.path.join(CACHE_DIR, "semantic", name))
+        return _caches[name]
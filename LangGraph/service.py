@@ -0,0 +1,268 @@
+"""Process-wide job service shared by the Streamlit apps.
+
+Every app submits its model work as a job instead of running it on the script thread. An asyncio
+event loop on a background thread admits jobs under a global concurrency limit and a per-user limit,
+then runs them on a bounded worker pool; the script only follows the job's events and output.
+
+    service = get_service()
+    job_id = service.submit(user_id, generate_report, name="report")
+    st.write_stream(service.stream(job_id, on_event=lambda kind, data: status.write(data)))
+"""
+import asyncio
+import inspect
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from tracing import in_context, span
+
+MAX_CONCURRENT_JOBS = int(os.getenv("COPILOT_MAX_CONCURRENT_JOBS", 16))
+MAX_JOBS_PER_USER = int(os.getenv("COPILOT_MAX_JOBS_PER_USER", 2))
+MAX_QUEUED_PER_USER = int(os.getenv("COPILOT_MAX_QUEUED_PER_USER", 8))
+JOB_RETENTION_SECONDS = 15 * 60
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a user already has the maximum number of unfinished jobs."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's generator when the job was cancelled."""
+
+
+@dataclass
+class Job:
+    """One unit of work and everything needed to follow it from another thread."""
+    id: str
+    user_id: str
+    name: str
+    status: str = QUEUED
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    parts: List[str] = field(default_factory=list)
+    cancelled: bool = False
+    _events: "queue.Queue[Tuple[str, Any]]" = field(default_factory=queue.Queue, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def emit(self, kind: str, data: Any = None) -> None:
+        """Publishes a progress event ("step", "status", ...) to whoever follows the job."""
+        self._events.put((kind, data))
+
+    def snapshot(self) -> Dict:
+        """Status as plain data, for the job status API."""
+        now = time.time()
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "name": self.name,
+            "status": self.status,
+            "queued_seconds": ((self.started or now) - self.created),
+            "run_seconds": ((self.finished or now) - self.started) if self.started else None,
+            "output_chars": sum(len(part) for part in self.parts),
+            "error": self.error,
+        }
+
+
+class CopilotService:
+    """Job queue with global and per-user concurrency limits, driven by an asyncio loop on its own thread."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, per_user: int = MAX_JOBS_PER_USER,
+                 max_queued_per_user: int = MAX_QUEUED_PER_USER):
+        self.max_concurrent = max_concurrent
+        self.per_user = per_user
+        self.max_queued_per_user = max_queued_per_user
+        self.stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+        self._jobs: Dict[str, Job] = {}
+        self._resources: Dict[str, Any] = {}
+        self._resource_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="copilot-job")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="copilot-service", daemon=True)
+        self._thread.start()
+        self._global: asyncio.Semaphore = self._call(lambda: asyncio.Semaphore(max_concurrent))
+        self._per_user: Dict[str, asyncio.Semaphore] = {}
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        """Runs fn on the event loop thread and returns its result."""
+        async def wrapper():
+            return fn()
+        return asyncio.run_coroutine_threadsafe(wrapper(), self._loop).result()
+
+    def resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Returns a process-wide singleton (a compiled graph, an agent, ...), creating it on first use.
+
+        Concurrent first callers wait for a single build; jobs and other resources are not held up by it.
+        """
+        with self._lock:
+            if name in self._resources:
+                return self._resources[name]
+            build_lock = self._resource_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            with self._lock:
+                if name in self._resources:
+                    return self._resources[name]
+            resource = factory()
+            with self._lock:
+                self._resources[name] = resource
+            return resource
+
+    def submit(self, user_id: str, fn: Callable, *args, name: Optional[str] = None, **kwargs) -> str:
+        """Queues fn(job, *args, **kwargs) and returns the job id.
+
+        fn runs on a worker thread. If it returns a generator, each yielded string is streamed to
+        followers and the joined text becomes the result; otherwise its return value is the result.
+        """
+        with self._lock:
+            self._prune()
+            unfinished = sum(1 for job in self._jobs.values() if job.user_id == user_id and job.status not in FINISHED)
+            if unfinished >= self.max_queued_per_user:
+                self.stats["rejected"] += 1
+                raise QueueFullError(f"User {user_id} already has {unfinished} unfinished jobs")
+            job = Job(id=uuid.uuid4().hex, user_id=user_id, name=name or getattr(fn, "__name__", "job"))
+            self._jobs[job.id] = job
+            self.stats["submitted"] += 1
+        execute = in_context(self._execute)  # The job's spans nest under the submitter's span
+        asyncio.run_coroutine_threadsafe(self._run(job, execute, fn, args, kwargs), self._loop)
+        return job.id
+
+    async def _run(self, job: Job, execute: Callable, fn: Callable, args, kwargs) -> None:
+        user_limit = self._per_user.setdefault(job.user_id, asyncio.Semaphore(self.per_user))
+        async with user_limit, self._global:
+            if not job.cancelled:
+                job.status, job.started = RUNNING, time.time()
+                await self._loop.run_in_executor(self._executor, execute, job, fn, args, kwargs)
+        if job.cancelled and job.status != DONE:
+            job.status = CANCELLED
+        job.finished = job.finished or time.time()
+        with self._lock:
+            self.stats[job.status] += 1
+        job.emit("end", job.status)
+        job._done.set()
+
+    @staticmethod
+    def _execute(job: Job, fn: Callable, args, kwargs) -> None:
+        with span(f"job:{job.name}", queued_ms=round((job.started - job.created) * 1000, 1)) as s:
+            try:
+                output = fn(job, *args, **kwargs)
+                if inspect.isgenerator(output):
+                    try:
+                        for part in output:
+                            if job.cancelled:
+                                raise JobCancelled()
+                            if part:
+                                job.parts.append(part)
+                                job.emit("chunk", part)
+                    finally:
+                        output.close()
+                    output = "".join(job.parts)
+                job.result, job.status = output, DONE
+            except JobCancelled:
+                job.status = CANCELLED
+            except Exception as e:
+                job.error, job.status = f"{type(e).__name__}: {e}", FAILED
+            s.set(status=job.status, bytes_out=sum(len(part) for part in job.parts))
+        job.finished = time.time()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job.id for job in self._jobs.values() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(f"Unknown or expired job {job_id}")
+            return self._jobs[job_id]
+
+    def status(self, job_id: str) -> Dict:
+        """Returns the job's status, queue and run time, and error if any."""
+        return self.get(job_id).snapshot()
+
+    def jobs(self, user_id: Optional[str] = None) -> List[Dict]:
+        """Status of all retained jobs, optionally of one user, newest first."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if user_id is None or job.user_id == user_id]
+        return [job.snapshot() for job in sorted(jobs, key=lambda job: -job.created)]
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """Waits for the job and returns its result; raises RuntimeError if it failed or was cancelled."""
+        job = self.get(job_id)
+        if not job._done.wait(timeout):
+            raise TimeoutError(f"Job {job_id} is still {job.status}")
+        if job.status != DONE:
+            raise RuntimeError(f"Job {job_id} {job.status}: {job.error or ''}".rstrip(": "))
+        return job.result
+
+    def events(self, job_id: str, timeout: Optional[float] = None) -> Iterator[Tuple[str, Any]]:
+        """Yields (kind, data) events until the job ends; kinds are "chunk", custom ones and finally "end"."""
+        job = self.get(job_id)
+        while True:
+            try:
+                kind, data = job._events.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No event from job {job_id} within {timeout}s")
+            yield kind, data
+            if kind == "end":
+                return
+
+    def stream(self, job_id: str, on_event: Optional[Callable[[str, Any], None]] = None,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        """Yields the job's text output as it is produced, passing other events to on_event.
+
+        Raises RuntimeError after the last chunk if the job failed.
+        """
+        for kind, data in self.events(job_id, timeout):
+            if kind == "chunk":
+                yield data
+            elif kind == "end":
+                job = self.get(job_id)
+                if job.status == FAILED:
+                    raise RuntimeError(job.error)
+            elif on_event is not None:
+                on_event(kind, data)
+
+    def cancel(self, job_id: str) -> bool:
+        """Requests cancellation; queued jobs never start and streaming jobs stop at their next chunk."""
+        job = self.get(job_id)
+        if job.status in FINISHED:
+            return False
+        job.cancelled = True
+        return True
+
+    def load(self) -> Dict[str, int]:
+        """Numbers of queued and running jobs."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {"queued": statuses.count(QUEUED), "running": statuses.count(RUNNING)}
+
+
+_service: Optional[CopilotService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> CopilotService:
+    """Returns the process-wide service; every Streamlit session of every app shares it."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CopilotService()
+        return _service
+
+
+def session_user_id(session_state) -> str:
+    """Stable id for one browser session, used for per-user limits."""
+    if "user_id" not in session_state:
+        session_state["user_id"] = uuid.uuid4().hex
+    return session_state["user_id"]
@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_cache import ResponseCache
+from llm_chain import llm_call, llm_stream
+from streaming import TimedStream
+from tracing import in_context, span
+
+INPUT = "input"
+
+
+@dataclass
+class Step:
+    """A single prompt in the report graph and the names of the steps it reads from."""
+    name: str
+    prompt: str
+    inputs: List[str] = field(default_factory=lambda: [INPUT])
+    fusable: bool = False
+
+
+def validate_steps(steps: List[Step]) -> None:
+    """Raises ValueError on duplicate names, unknown inputs or dependency cycles."""
+    names = [step.name for step in steps]
+    if len(set(names)) != len(names) or INPUT in names:
+        raise ValueError(f"Step names must be unique and not '{INPUT}': {names}")
+    known = {INPUT}
+    for step in steps:
+        missing = [name for name in step.inputs if name not in known]
+        if missing:
+            raise ValueError(f"Step '{step.name}' depends on unknown or later steps: {missing}")
+        known.add(step.name)
+
+
+def fuse_steps(steps: List[Step]) -> List[Step]:
+    """Merges runs of pure formatting steps that feed only each other into a single step."""
+    referenced: Dict[str, int] = {}
+    for step in steps:
+        for name in step.inputs:
+            referenced[name] = referenced.get(name, 0) + 1
+
+    fused: List[Step] = []
+    renamed: Dict[str, str] = {}
+    run: List[Step] = []
+
+    def flush():
+        if len(run) == 1:
+            fused.append(run[0])
+        elif run:
+            name = "+".join(step.name for step in run)
+            instructions = "\n".join(f"{i}. {step.prompt.strip()}" for i, step in enumerate(run, 1))
+            fused.append(Step(
+                name=name,
+                prompt=f"Apply all of the following instructions in a single response:\n{instructions}",
+                inputs=run[0].inputs,
+                fusable=True,
+            ))
+            for step in run:
+                renamed[step.name] = name
+        run.clear()
+
+    for step in steps:
+        step = Step(step.name, step.prompt, [renamed.get(name, name) for name in step.inputs], step.fusable)
+        follows_run = bool(run) and step.inputs == [run[-1].name] and referenced.get(run[-1].name, 0) == 1
+        if step.fusable and (not run or follows_run):
+            run.append(step)
+            continue
+        flush()
+        step.inputs = [renamed.get(name, name) for name in step.inputs]
+        if step.fusable:
+            run.append(step)
+        else:
+            fused.append(step)
+    flush()
+    return fused
+
+
+def format_step_prompt(step: Step, results: Dict[str, str]) -> str:
+    """Builds the prompt for a step from the outputs of its inputs."""
+    if len(step.inputs) == 1:
+        return f"{step.prompt}\nInput: {results[step.inputs[0]]}"
+    sections = "\n\n".join(f"### {name}\n{results[name]}" for name in step.inputs)
+    return f"{step.prompt}\nInputs:\n{sections}"
+
+
+def _execute(steps: List[Step], results: Dict[str, str], llm, max_workers: int,
+             cache: Optional[ResponseCache],
+             on_step: Optional[Callable[[str, str, float], None]]) -> Dict[str, float]:
+    """Executes steps as soon as their inputs are in results, filling results in place."""
+    timings: Dict[str, float] = {}
+    pending = {step.name: step for step in steps}
+    running = {}
+
+    def run(step: Step) -> Tuple[str, float]:
+        start = time.perf_counter()
+        output = llm_call(format_step_prompt(step, results), llm=llm, cache=cache, step=step.name)
+        return output, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, step in list(pending.items()):
+                if all(dep in results for dep in step.inputs):
+                    running[executor.submit(in_context(run), step)] = name
+                    del pending[name]
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
+                if on_step is not None:
+                    on_step(name, results[name], timings[name])
+    return timings
+
+
+def run_steps(input: str, steps: List[Step], llm, max_workers: int = 4, fuse: bool = True,
+              cache: Optional[ResponseCache] = None,
+              on_step: Optional[Callable[[str, str, float], None]] = None) -> Tuple[str, Dict[str, float]]:
+    """Runs the step graph, executing independent steps concurrently.
+
+    Returns the output of the last step and the wall time of each executed step in seconds.
+    """
+    validate_steps(steps)
+    if fuse:
+        steps = fuse_steps(steps)
+    results: Dict[str, str] = {INPUT: input}
+    with span("run_steps", steps=len(steps)):
+        timings = _execute(steps, results, llm, max_workers, cache, on_step)
+    return results[steps[-1].name], timings
+
+
+def stream_steps(input: str, steps: List[Step], llm, max_workers: int = 4, fuse: bool = True,
+                 cache: Optional[ResponseCache] = None,
+                 on_step: Optional[Callable[[str, str, float], None]] = None,
+                 start: Optional[float] = None,
+                 name: Optional[str] = None) -> Tuple[TimedStream, Dict[str, float]]:
+    """Runs every step but the last, then returns a token stream of the last step.
+
+    Time to first token is measured from `start` (defaults to now), so it covers the whole report.
+    It is recorded under `name` only if given; apps that stream the report through a job record it
+    once, where the user sees it.
+    The last step's wall time is added to the returned timings once the stream is exhausted.
+    """
+    start = start if start is not None else time.perf_counter()
+    validate_steps(steps)
+    if fuse:
+        steps = fuse_steps(steps)
+    results: Dict[str, str] = {INPUT: input}
+    with span("stream_steps", steps=len(steps)):
+        timings = _execute(steps[:-1], results, llm, max_workers, cache, on_step)
+    final = steps[-1]
+
+    def tokens():
+        step_start = time.perf_counter()
+        yield from llm_stream(format_step_prompt(final, results), llm=llm, cache=cache, step=final.name)
+        timings[final.name] = time.perf_counter() - step_start
+
+    return TimedStream(tokens(), name=name, start=start), timings
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, Iterator, Optional
+
+# Recent time-to-first-token samples per stream name, in seconds
+TTFT_SAMPLES: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=200))
+_samples_lock = threading.Lock()
+
+
+class TimedStream:
+    """Wraps a stream of text chunks and measures time to first token and total time."""
+
+    def __init__(self, chunks: Iterable[str], name: Optional[str] = None, start: Optional[float] = None):
+        self._chunks = chunks
+        self.name = name
+        self.start = start if start is not None else time.perf_counter()
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+        self.parts = []
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.start
+                if self.name:
+                    with _samples_lock:
+                        TTFT_SAMPLES[self.name].append(self.ttft)
+            self.parts.append(chunk)
+            yield chunk
+        self.total = time.perf_counter() - self.start
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def summary(self) -> str:
+        """Returns a short human readable timing line for display under the streamed text."""
+        if self.ttft is None:
+            return "No tokens received"
+        total = f"{self.total:.2f}s" if self.total is not None else "streaming"
+        return f"Time to first token: {self.ttft:.2f}s · total: {total}"
+
+
+def chunk_text(chunk) -> str:
+    """Extracts the text of a LangChain message chunk, whose content may be a string or a list of parts."""
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+    return ""
+
+
+def ttft_percentiles(name: str) -> Dict[str, float]:
+    """Returns p50/p95 time to first token for the named stream."""
+    with _samples_lock:
+        samples = sorted(TTFT_SAMPLES.get(name, ()))
+    if not samples:
+        return {}
+    return {
+        "p50": samples[int(0.50 * (len(samples) - 1))],
+        "p95": samples[int(0.95 * (len(samples) - 1))],
+        "count": float(len(samples)),
+    }
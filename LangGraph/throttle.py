@@ -0,0 +1,364 @@
+"""Client-side throttling shared by every model call of the process.
+
+Each provider key ("google:gemini-1.5-flash", "groq:llama3-8b-8192", ...) gets one Throttle with a
+requests-per-minute and a tokens-per-minute bucket set just under the provider quota. Callers queue
+on the buckets instead of bursting into 429s; rate limits and server errors are retried with
+exponential backoff and jitter, honoring Retry-After, and a circuit breaker fails fast while a
+provider is down so the router can move on to another one.
+
+    llm = get_chat_model("google:gemini-1.5-flash")  # Already a ThrottledModel
+    response = get_throttle("google:gemini-2.0-flash").call(lambda: agent.run(prompt), tokens=500)
+"""
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from memory import estimate_tokens, message_content
+
+# Free-tier quotas per provider as (requests/min, tokens/min); 0 disables a bucket.
+# Override with COPILOT_RPM_<PROVIDER> / COPILOT_TPM_<PROVIDER>, e.g. COPILOT_RPM_GOOGLE=1000.
+DEFAULT_QUOTAS: Dict[str, Tuple[float, float]] = {
+    "google": (15, 1_000_000),
+    "groq": (30, 6_000),
+    "ollama": (0, 0),
+    "fake": (0, 0),
+}
+QUOTA_HEADROOM = 0.9  # Target this fraction of the quota so clock skew and other clients don't tip us over
+MAX_RETRIES = int(os.getenv("COPILOT_MAX_RETRIES", 4))
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+MAX_QUEUE_SECONDS = float(os.getenv("COPILOT_MAX_QUEUE_SECONDS", 300))
+BREAKER_FAILURES = 5  # Consecutive retryable failures that open the circuit
+BREAKER_RESET_SECONDS = 30.0
+OUTPUT_TOKEN_ESTIMATE = 512  # Charged up front per request, corrected once the usage is known
+IMAGE_TOKENS = 258  # Gemini bills each image as a fixed number of input tokens
+RETRYABLE_MESSAGE = re.compile(r"\b(429|50[0-4])\b|rate.?limit|quota|overloaded|unavailable|timed? ?out", re.IGNORECASE)
+RETRY_DELAY_MESSAGE = re.compile(r"retry(?:[ _-]?(?:after|in|delay))?\W{0,10}(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+class ThrottledError(RuntimeError):
+    """Raised when a request would have to queue longer than the allowed maximum."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without calling the provider while its circuit is open."""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"{key} is failing; circuit open for another {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """Extracts an HTTP status code from provider SDK exceptions."""
+    for candidate in (error, getattr(error, "response", None)):
+        for attribute in ("status_code", "status", "code", "http_status"):
+            value = getattr(candidate, attribute, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, server errors and transport failures; client errors are not worth repeating."""
+    status = error_status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or bool(RETRYABLE_MESSAGE.search(str(error)))
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Server-requested delay in seconds, from a Retry-After header, attribute or error message."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if hasattr(headers, "get"):
+            value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        match = RETRY_DELAY_MESSAGE.search(str(error))
+        value = match.group(1) if match else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def describe_failure(error: Exception) -> str:
+    """User-facing explanation of a model call that failed after throttling and retries."""
+    if isinstance(error, CircuitOpenError):
+        return f"The model provider is failing right now; please try again in {error.retry_after:.0f} seconds."
+    if isinstance(error, ThrottledError):
+        return "Too many requests are queued for the model provider; please try again in a few minutes."
+    if error_status(error) == 429 or (is_retryable(error) and RETRYABLE_MESSAGE.search(str(error))):
+        return "The model provider's rate limit is exhausted; please try again in a minute."
+    return f"Sorry, I encountered an error: {error}"
+
+
+def usage_tokens(response) -> Optional[int]:
+    """Total tokens reported by a LangChain response, if the provider reports usage."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(token_usage["total_tokens"]) if token_usage.get("total_tokens") else None
+
+
+class TokenBucket:
+    """Refills at `per_minute`, holds at most `capacity`, and lets callers reserve ahead (queueing)."""
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, per_minute / 10)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, max_wait: float = MAX_QUEUE_SECONDS) -> float:
+        """Books `amount` and returns how long to wait before using it.
+
+        A request may start once the bucket is out of debt, and its cost is booked immediately, so
+        later callers queue behind it and the long-run rate stays at `per_minute`.
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0.0, -self._tokens) / self.rate
+            if wait > max_wait:
+                raise ThrottledError(f"Request would queue for {wait:.0f}s (limit {max_wait:.0f}s)")
+            self._tokens -= amount
+            return wait
+
+    def adjust(self, amount: float) -> None:
+        """Books a correction once the actual cost is known (negative refunds)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket for `seconds`, after the provider asked everyone to back off."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets one probe through after `reset_seconds`."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._consecutive = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    def check(self, key: str) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened + self.reset_seconds - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"  # This caller is the probe
+                return
+            raise CircuitOpenError(key, max(remaining, 0.0))
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self.state, self._consecutive = "closed", 0
+                return
+            self._consecutive += 1
+            if self.state == "half_open" or self._consecutive >= self.failures:
+                self.state, self._opened = "open", time.monotonic()
+
+
+class Throttle:
+    """Request and token buckets, retry policy and circuit breaker of one provider key."""
+
+    def __init__(self, key: str, rpm: float = 0, tpm: float = 0, max_retries: int = MAX_RETRIES,
+                 base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 max_queue_seconds: float = MAX_QUEUE_SECONDS, breaker: CircuitBreaker = None):
+        self.key = key
+        self.requests = TokenBucket(rpm * QUOTA_HEADROOM) if rpm else None
+        self.tokens = TokenBucket(tpm * QUOTA_HEADROOM, capacity=tpm * QUOTA_HEADROOM / 10) if tpm else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_queue_seconds = max_queue_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"calls": 0, "throttled": 0, "throttle_seconds": 0.0, "retried": 0, "failed": 0,
+                      "circuit_open": 0, "tokens": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def _acquire(self, tokens: int) -> None:
+        """Waits for a request slot and `tokens` of token budget."""
+        try:
+            self.breaker.check(self.key)
+        except CircuitOpenError:
+            self._count("circuit_open")
+            raise
+        wait = 0.0
+        if self.requests:
+            wait = self.requests.reserve(1, self.max_queue_seconds)
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens, self.max_queue_seconds))
+        if wait > 0:
+            self._count("throttled")
+            self._count("throttle_seconds", wait)
+            time.sleep(wait)
+
+    def _settle(self, estimate: int, actual: int) -> None:
+        self._count("tokens", actual)
+        if self.tokens:
+            self.tokens.adjust(actual - estimate)
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before retry `attempt` (0-based): Retry-After if given, else capped exponential with full jitter."""
+        requested = retry_after(error)
+        if requested is not None:
+            return requested + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _failed(self, attempt: int, retries: int, error: Exception) -> float:
+        """Records a failed attempt; returns the delay before retrying or re-raises the error."""
+        if not is_retryable(error):
+            self._count("failed")
+            raise error
+        self.breaker.record(False)
+        if attempt >= retries:
+            self._count("failed")
+            raise error
+        delay = self.backoff(attempt, error)
+        if retry_after(error) is not None and self.requests:
+            self.requests.pause(delay)  # Everyone queued on this provider backs off, not just this caller
+        self._count("retried")
+        return delay
+
+    def call(self, fn: Callable[[], object], tokens: int = 0, max_retries: int = None):
+        """Runs fn() under the buckets, retrying rate limits and server errors."""
+        retries = self.max_retries if max_retries is None else max_retries
+        estimate = tokens + OUTPUT_TOKEN_ESTIMATE
+        self._count("calls")
+        for attempt in range(retries + 1):
+            self._acquire(estimate)
+            try:
+                response = fn()
+            except Exception as e:
+                time.sleep(self._failed(attempt, retries, e))
+                continue
+            self.breaker.record(True)
+            usage = usage_tokens(response)
+            self._settle(estimate, usage if usage is not None else tokens + estimate_tokens(response))
+            return response
+
+    def stream(self, fn: Callable[[], Iterator], tokens: int = 0, max_retries: int = None) -> Iterator:
+        """Yields from fn() under the buckets; retries only until the first chunk arrives."""
+        retries = self.max_retries if max_retries is None else max_retries
+        estimate = tokens + OUTPUT_TOKEN_ESTIMATE
+        self._count("calls")
+        for attempt in range(retries + 1):
+            self._acquire(estimate)
+            try:
+                chunks = iter(fn())
+                first = next(chunks)
+            except StopIteration:
+                self.breaker.record(True)
+                return
+            except Exception as e:
+                time.sleep(self._failed(attempt, retries, e))
+                continue
+            self.breaker.record(True)
+            output = []
+            usage = None
+            for chunk in itertools.chain([first], chunks):
+                output.append(chunk if isinstance(chunk, str) else message_content(chunk))
+                usage = usage_tokens(chunk) or usage
+                yield chunk
+            self._settle(estimate, usage if usage is not None else tokens + estimate_tokens("".join(output)))
+            return
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {**self.stats, "throttle_seconds": round(self.stats["throttle_seconds"], 2),
+                    "circuit": self.breaker.state}
+
+
+class ThrottledModel:
+    """Chat model wrapper that sends invoke/stream through the throttle of its provider key.
+
+    The throttle is looked up per call, so configure_throttle also applies to models created earlier.
+    """
+
+    def __init__(self, llm, key: str, max_retries: int = None):
+        self._llm = llm
+        self.key = key
+        self.max_retries = max_retries
+
+    @property
+    def throttle(self) -> "Throttle":
+        return get_throttle(self.key)
+
+    def invoke(self, prompt, *args, **kwargs):
+        return self.throttle.call(lambda: self._llm.invoke(prompt, *args, **kwargs),
+                                  tokens=estimate_tokens(prompt), max_retries=self.max_retries)
+
+    def stream(self, prompt, *args, **kwargs):
+        return self.throttle.stream(lambda: self._llm.stream(prompt, *args, **kwargs),
+                                    tokens=estimate_tokens(prompt), max_retries=self.max_retries)
+
+    def bind_tools(self, tools, **kwargs) -> "ThrottledModel":
+        return ThrottledModel(self._llm.bind_tools(tools, **kwargs), self.key, self.max_retries)
+
+    def with_retries(self, max_retries: int) -> "ThrottledModel":
+        """Same model and throttle with a different retry budget (the router fails over instead)."""
+        return ThrottledModel(self._llm, self.key, max_retries)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
+def provider_quota(key: str) -> Tuple[float, float]:
+    """(requests/min, tokens/min) for "provider:model", from the environment or DEFAULT_QUOTAS."""
+    provider = key.partition(":")[0] if ":" in key else "google"
+    rpm, tpm = DEFAULT_QUOTAS.get(provider, (0, 0))
+    return (float(os.getenv(f"COPILOT_RPM_{provider.upper()}", rpm)),
+            float(os.getenv(f"COPILOT_TPM_{provider.upper()}", tpm)))
+
+
+_throttles: Dict[str, Throttle] = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(key: str) -> Throttle:
+    """Returns the process-wide throttle of a provider key, created with its quota on first use."""
+    with _throttles_lock:
+        if key not in _throttles:
+            rpm, tpm = provider_quota(key)
+            _throttles[key] = Throttle(key, rpm, tpm)
+        return _throttles[key]
+
+
+def configure_throttle(key: str, rpm: float = None, tpm: float = None, **kwargs) -> Throttle:
+    """Replaces the throttle of a key, e.g. with the quota of a paid tier; unset limits keep the default."""
+    default_rpm, default_tpm = provider_quota(key)
+    throttle = Throttle(key, default_rpm if rpm is None else rpm, default_tpm if tpm is None else tpm, **kwargs)
+    with _throttles_lock:
+        _throttles[key] = throttle
+    return throttle
+
+
+def throttle_stats() -> Dict[str, Dict[str, object]]:
+    """Counters of every throttle: calls, throttled calls and seconds queued, retries, failures."""
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    return {throttle.key: throttle.snapshot() for throttle in throttles}
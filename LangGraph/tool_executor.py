@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+
+from tracing import enabled as tracing_enabled, in_context, span
+
+DEFAULT_TOOL_TIMEOUT = 20.0
+
+
+def call_key(tool_call: Dict[str, Any]) -> str:
+    """Identifies a tool call by name and canonical arguments, ignoring its id."""
+    return f"{tool_call['name']}:{json.dumps(tool_call.get('args', {}), sort_keys=True, default=str)}"
+
+
+class ToolExecutor:
+    """Runs all tool calls of one assistant message concurrently, once per distinct call."""
+
+    def __init__(self, tools: List, timeout: float = DEFAULT_TOOL_TIMEOUT,
+                 timeouts: Optional[Dict[str, float]] = None, max_workers: int = 8,
+                 format_result: Optional[Callable[[Any], str]] = None):
+        self.tools = {tool.name: tool for tool in tools}
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.format_result = format_result or (lambda result: result if isinstance(result, str) else json.dumps(result, default=str))
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=200))
+        self.last_run: Dict[str, float] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+
+    def _invoke(self, name: str, args: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            with span(f"tool:{name}") as s:
+                result = self.tools[name].invoke(args)
+                if tracing_enabled():
+                    s.set(bytes_out=len(result if isinstance(result, str) else json.dumps(result, default=str)))
+                return result
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[name].append(elapsed)
+
+    def run(self, tool_calls: List[Dict[str, Any]]) -> List[ToolMessage]:
+        """Executes the calls and returns one ToolMessage per call, in order.
+
+        Identical calls (same tool and arguments) are executed once and share the result.
+        """
+        start = time.perf_counter()
+        futures = {}
+        for tool_call in tool_calls:
+            key = call_key(tool_call)
+            if key not in futures and tool_call["name"] in self.tools:
+                futures[key] = self._pool.submit(in_context(self._invoke), tool_call["name"], tool_call.get("args", {}))
+
+        deadline = {key: start + self.timeouts.get(key.split(":", 1)[0], self.timeout) for key in futures}
+        contents: Dict[str, str] = {}
+        for key, future in futures.items():
+            try:
+                result = future.result(timeout=max(deadline[key] - time.perf_counter(), 0))
+                contents[key] = self.format_result(result)
+            except FutureTimeoutError:
+                contents[key] = f"Error: tool timed out after {deadline[key] - start:.1f}s"
+            except Exception as e:
+                contents[key] = f"Error: {e}"
+
+        messages = []
+        for tool_call in tool_calls:
+            key = call_key(tool_call)
+            content = contents.get(key, f"Error: unknown tool {tool_call['name']}")
+            messages.append(ToolMessage(content=content, name=tool_call["name"], tool_call_id=tool_call["id"]))
+        self.last_run = {"tool_calls": len(tool_calls), "executed": len(futures), "seconds": time.perf_counter() - start}
+        return messages
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns p50/p95 latency in seconds per tool."""
+        summary = {}
+        with self._lock:
+            for name, samples in self.latencies.items():
+                ordered = sorted(samples)
+                if ordered:
+                    summary[name] = {
+                        "p50": ordered[int(0.50 * (len(ordered) - 1))],
+                        "p95": ordered[int(0.95 * (len(ordered) - 1))],
+                        "count": float(len(ordered)),
+                    }
+        return summary
@@ -0,0 +1,385 @@
+"""Lightweight in-process tracing for the copilot's hot paths.
+
+Spans nest through a context variable, so an llm_call inside a report step inside a service job
+lands in the same trace. Finished spans are handed to a background thread that batches them
+into the configured sink:
+
+    COPILOT_TRACING=0              disable (span() then returns a shared no-op object)
+    COPILOT_TRACE_SINK=sqlite      .cache/traces.sqlite, read by the Diagnostics page (default); spans
+                                   older than COPILOT_TRACE_RETENTION_DAYS (7) or beyond the newest
+                                   COPILOT_TRACE_MAX_SPANS (200000) are pruned
+    COPILOT_TRACE_SINK=jsonl       .cache/traces.jsonl, one span per line
+    COPILOT_TRACE_SINK=otlp        .cache/traces.otlp.jsonl, OTLP/JSON export requests that an
+                                   OpenTelemetry collector's otlpjsonfile receiver can ingest
+
+    with span("llm_call", step=step, model=model) as s:
+        ...
+        s.set(cache_hit=False, tokens_out=len(text) // 4)
+
+Attribute names used across the code: step, model, provider, cache_hit, tokens_in, tokens_out,
+bytes_in, bytes_out.
+"""
+import atexit
+import contextvars
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+CACHE_DIR = os.getenv("COPILOT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+TRACE_SINK = os.getenv("COPILOT_TRACE_SINK", "sqlite")
+TRACE_PATH = os.getenv("COPILOT_TRACE_PATH")
+RECENT_SPANS = 5000  # Finished spans kept in memory for in-process diagnostics
+# The SQLite sink keeps spans for this long and at most this many, pruned at most once per PRUNE_SECONDS
+TRACE_RETENTION_SECONDS = float(os.getenv("COPILOT_TRACE_RETENTION_DAYS", 7)) * 24 * 3600
+TRACE_MAX_SPANS = int(os.getenv("COPILOT_TRACE_MAX_SPANS", 200000))
+PRUNE_SECONDS = 60.0
+FLUSH_SECONDS = 1.0
+SERVICE_NAME = "chip-design-copilot"
+
+_enabled = os.getenv("COPILOT_TRACING", "1").lower() not in ("0", "false", "off", "no")
+_current: contextvars.ContextVar = contextvars.ContextVar("copilot_span", default=None)
+
+
+class Span:
+    """One timed operation; attributes are plain JSON values."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attrs", "error", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], parent: Optional["Span"] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Finishes the span (once) and queues it for export."""
+        if self.duration is not None:
+            return
+        self.duration = time.time() - self.start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _exporter.submit(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        self.end(exc)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled; every operation is a no-op."""
+
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(flag: bool) -> None:
+    global _enabled
+    _enabled = flag
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block as a child of the current span."""
+    if not _enabled:
+        return NOOP_SPAN
+    return Span(name, attrs, _current.get())
+
+
+def start_span(name: str, **attrs):
+    """Starts a span without making it current; call .end() when done. For generators and streams,
+    whose body runs interleaved with the caller."""
+    if not _enabled:
+        return NOOP_SPAN
+    return Span(name, attrs, _current.get())
+
+
+def current_span():
+    """The innermost open span, or the no-op span outside any trace."""
+    return (_current.get() or NOOP_SPAN) if _enabled else NOOP_SPAN
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping every call of a function in a span."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}, _current.get()):
+                return fn(*args, **kwargs)
+        wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return wrapper
+    return decorate
+
+
+def in_context(fn: Callable) -> Callable:
+    """Binds fn to a copy of the current context, so spans it opens on a pool thread nest under the
+    submitter's span. Call once per submitted task: a context cannot be entered by two threads."""
+    if not _enabled or _current.get() is None:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class JsonlSink:
+    """Appends one JSON object per span."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for finished in spans:
+                f.write(json.dumps(finished.to_dict(), default=str) + "\n")
+
+
+class SQLiteSink:
+    """Stores spans in a SQLite table shared by every app process, pruned by age and row count."""
+
+    def __init__(self, path: str, retention_seconds: Optional[float] = TRACE_RETENTION_SECONDS,
+                 max_spans: Optional[int] = TRACE_MAX_SPANS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.max_spans = max_spans
+        self._pruned = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS spans (
+                span_id TEXT PRIMARY KEY,
+                trace_id TEXT NOT NULL,
+                parent_id TEXT,
+                name TEXT NOT NULL,
+                start REAL NOT NULL,
+                duration_ms REAL NOT NULL,
+                error TEXT,
+                attrs TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS spans_start ON spans (start)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id)")
+        self._conn.commit()
+
+    def write(self, spans: List[Span]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO spans VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(s.span_id, s.trace_id, s.parent_id, s.name, s.start, s.duration * 1000, s.error,
+              json.dumps(s.attrs, default=str)) for s in spans],
+        )
+        if time.monotonic() - self._pruned >= PRUNE_SECONDS:
+            self.prune()
+        self._conn.commit()
+
+    def prune(self) -> None:
+        """Deletes spans older than retention_seconds and the oldest spans beyond max_spans."""
+        self._pruned = time.monotonic()
+        if self.retention_seconds is not None:
+            self._conn.execute("DELETE FROM spans WHERE start < ?", (time.time() - self.retention_seconds,))
+        if self.max_spans is not None:
+            self._conn.execute(
+                "DELETE FROM spans WHERE start < (SELECT start FROM spans ORDER BY start DESC LIMIT 1 OFFSET ?)",
+                (self.max_spans - 1,),
+            )
+        self._conn.commit()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPJsonSink:
+    """Writes OTLP/JSON ExportTraceServiceRequest lines (OpenTelemetry collector otlpjsonfile format)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, spans: List[Span]) -> None:
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "copilot.tracing"}, "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(int(s.start * 1e9)),
+                "endTimeUnixNano": str(int((s.start + s.duration) * 1e9)),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in s.attrs.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+            } for s in spans]}],
+        }]}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request) + "\n")
+
+
+def make_sink(kind: str = TRACE_SINK, path: Optional[str] = TRACE_PATH):
+    """Builds the sink named by COPILOT_TRACE_SINK; None for "none"."""
+    if kind == "none":
+        return None
+    sinks = {"sqlite": (SQLiteSink, "traces.sqlite"), "jsonl": (JsonlSink, "traces.jsonl"),
+             "otlp": (OTLPJsonSink, "traces.otlp.jsonl")}
+    if kind not in sinks:
+        raise ValueError(f"Unknown trace sink '{kind}'; known: {sorted(sinks)} or none")
+    cls, filename = sinks[kind]
+    if path is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = os.path.join(CACHE_DIR, filename)
+    return cls(path)
+
+
+class _Exporter:
+    """Batches finished spans into the sink from a daemon thread, off the request path."""
+
+    def __init__(self):
+        self.recent: List[Span] = []
+        self.sink = None
+        self.dropped = 0
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._pending = 0
+
+    def submit(self, finished: Span) -> None:
+        with self._lock:
+            self.recent.append(finished)
+            if len(self.recent) > RECENT_SPANS:
+                del self.recent[:len(self.recent) - RECENT_SPANS]
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        self._queue.put(finished)
+
+    def _run(self) -> None:
+        try:
+            self.sink = make_sink()
+        except Exception:
+            self.sink = None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while len(batch) < 500 and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            if self.sink is not None:
+                try:
+                    self.sink.write(batch)
+                except Exception:
+                    self.dropped += len(batch)  # Tracing must never break the app
+            with self._lock:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until every submitted span has been written; returns False on timeout."""
+        with self._lock:
+            return self._flushed.wait_for(lambda: self._pending == 0, timeout)
+
+
+_exporter = _Exporter()
+atexit.register(_exporter.flush)
+
+
+def flush(timeout: float = 5.0) -> bool:
+    return _exporter.flush(timeout)
+
+
+def recent_spans() -> List[Dict[str, Any]]:
+    """Finished spans of this process, oldest first."""
+    with _exporter._lock:
+        spans = list(_exporter.recent)
+    return [s.to_dict() for s in spans]
+
+
+def load_spans(path: Optional[str] = None, since: Optional[float] = None, limit: int = 20000) -> List[Dict[str, Any]]:
+    """Reads spans of every process from the SQLite sink, newest first."""
+    path = path or TRACE_PATH or os.path.join(CACHE_DIR, "traces.sqlite")
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT trace_id, span_id, parent_id, name, start, duration_ms, error, attrs FROM spans "
+            "WHERE start >= ? ORDER BY start DESC LIMIT ?", (since or 0.0, limit)).fetchall()
+    finally:
+        conn.close()
+    keys = ("trace_id", "span_id", "parent_id", "name", "start", "duration_ms", "error", "attrs")
+    return [{**dict(zip(keys, row)), "attrs": json.loads(row[7])} for row in rows]
+
+
+def span_stats(spans: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """p50/p95 latency, counts, errors, cache hit rate and token totals per span name and step."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        step = s["attrs"].get("step")
+        groups.setdefault(f"{s['name']} [{step}]" if step else s["name"], []).append(s)
+    stats = {}
+    for name, members in sorted(groups.items()):
+        ordered = sorted(s["duration_ms"] for s in members)
+        hits = [s["attrs"]["cache_hit"] for s in members if "cache_hit" in s["attrs"]]
+        stats[name] = {
+            "count": len(members),
+            "p50_ms": round(ordered[int(0.50 * (len(ordered) - 1))], 1),
+            "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 1),
+            "errors": sum(1 for s in members if s["error"]),
+            "cache_hit_rate": round(sum(hits) / len(hits), 2) if hits else None,
+            "tokens_in": sum(s["attrs"].get("tokens_in", 0) for s in members),
+            "tokens_out": sum(s["attrs"].get("tokens_out", 0) for s in members),
+        }
+    return stats
@@ -0,0 +1,68 @@
+"""Process warm-up: builds shared models, graphs and caches before the first request needs them.
+
+The Streamlit apps call warm_up() near the top of the script. The first run of a process starts
+a background thread that runs the given tasks once; later reruns and sessions return at once.
+Meanwhile the page renders, and a request that needs a resource still being built waits for it
+through the usual locks (import lock, get_chat_model, CopilotService.resource) instead of
+building a second copy.
+
+    warm_up({"router": get_router, "agent_sdk": preload("phi.agent", "phi.model.google")})
+
+COPILOT_WARMUP=0 disables it, e.g. for import-time measurements.
+"""
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from tracing import span
+
+ENABLED = os.getenv("COPILOT_WARMUP", "1").lower() not in ("0", "false", "off", "no")
+
+WARMUP_TIMINGS: Dict[str, Dict[str, Any]] = {}  # name -> {"seconds", "error"}
+_started = set()
+_lock = threading.Lock()
+
+
+def preload(*modules: str) -> Callable[[], None]:
+    """A task importing heavy modules (provider SDKs) so the first request finds them loaded."""
+    def load():
+        for module in modules:
+            importlib.import_module(module)
+    return load
+
+
+def _run(tasks: Dict[str, Callable[[], Any]]) -> None:
+    for name, task in tasks.items():
+        start = time.perf_counter()
+        error = None
+        with span("warm_up", task=name) as s:
+            try:
+                task()
+            except Exception as e:  # An optional feature may be unavailable; its first use reports it
+                error = f"{type(e).__name__}: {e}"
+                s.set(error=error)
+        with _lock:
+            WARMUP_TIMINGS[name] = {"seconds": round(time.perf_counter() - start, 3), "error": error}
+
+
+def warm_up(tasks: Dict[str, Callable[[], Any]], background: bool = True) -> None:
+    """Runs each task once per process, in order, on a background thread unless `background` is False."""
+    if not ENABLED:
+        return
+    with _lock:
+        pending = {name: task for name, task in tasks.items() if name not in _started}
+        _started.update(pending)
+    if not pending:
+        return
+    if background:
+        threading.Thread(target=_run, args=(pending,), name="copilot-warmup", daemon=True).start()
+    else:
+        _run(pending)
+
+
+def warmup_stats() -> Dict[str, Dict[str, Any]]:
+    """Seconds each finished task took, and its error if it failed."""
+    with _lock:
+        return dict(WARMUP_TIMINGS)
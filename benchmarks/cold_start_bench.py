@@ -0,0 +1,96 @@
+"""Measures the import cost of each Streamlit app's module-level imports, before and after a change.
+
+Run from the repository root:
+
+    python benchmarks/cold_start_bench.py                  # working tree against HEAD
+    python benchmarks/cold_start_bench.py --before HEAD~1  # against an earlier revision
+
+For every app the top-level imports of both versions are read with ast and imported in a fresh
+interpreter, the way a new Streamlit worker loads them before it can paint the page. Packages not
+installed here are listed and left out of both numbers, so compare runs on the same environment.
+Imports moved into functions or the warm-up thread no longer count towards the cold start.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {
+    "App": "LangGraph/App.py",
+    "Workflow_app": "LangGraph/Workflow_app.py",
+    "Chatbot": "LangGraph/Chatbot.py",
+    "Multimodal": "Agno/Multimodal_Agno_App.py",
+    "STT": "Agno/STT.py",
+    "TTS": "Agno/TTS.py",
+}
+REPEATS = 5
+
+CHILD = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+missing = []
+start = time.perf_counter()
+for module in {modules!r}:
+    try:
+        __import__(module)
+    except ImportError as e:
+        missing.append(getattr(e, "name", None) or module)
+print(json.dumps({{"seconds": time.perf_counter() - start, "missing": missing}}))
+"""
+
+
+def top_level_imports(source: str) -> List[str]:
+    """Modules imported by the script's own body, in order; imports inside functions are deferred."""
+    modules = []
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules: List[str], app_dir: str) -> Dict:
+    """Median import time of `modules` over REPEATS fresh interpreters."""
+    paths = [app_dir, os.path.join(ROOT, "LangGraph")]
+    env = dict(os.environ, COPILOT_WARMUP="0", COPILOT_TRACE_SINK="none")
+    runs = []
+    for _ in range(REPEATS):
+        output = subprocess.run([sys.executable, "-c", CHILD.format(paths=paths, modules=modules)], cwd=app_dir,
+                                env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {"seconds": median(run["seconds"] for run in runs), "missing": runs[0]["missing"]}
+
+
+def source_at(revision: str, path: str) -> str:
+    return subprocess.run(["git", "show", f"{revision}:{path}"], cwd=ROOT, check=True, stdout=subprocess.PIPE,
+                          text=True).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", default="HEAD", help="Git revision to compare the working tree against")
+    args = parser.parse_args()
+
+    print(f"{'app':<13} {'before ms':>10} {'after ms':>9} {'saved ms':>9}  deferred imports / not installed here")
+    for app, path in APPS.items():
+        app_dir = os.path.dirname(os.path.join(ROOT, path))
+        before_modules = top_level_imports(source_at(args.before, path))
+        with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+            after_modules = top_level_imports(f.read())
+        before = measure(before_modules, app_dir)
+        after = measure(after_modules, app_dir)
+        deferred = [module for module in before_modules if module not in after_modules]
+        missing = sorted(set(before["missing"]) | set(after["missing"]))
+        print(f"{app:<13} {before['seconds'] * 1000:>10.1f} {after['seconds'] * 1000:>9.1f} "
+              f"{(before['seconds'] - after['seconds']) * 1000:>9.1f}  {', '.join(deferred) or '-'} / "
+              f"{', '.join(missing) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
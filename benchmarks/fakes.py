@@ -0,0 +1,153 @@
+"""Offline stand-ins for Gemini/Groq, Tavily, gTTS and Google STT for the benchmark suite.
+
+Each fake replays a recorded response (responses.json) after a delay drawn from the service's
+latency profile (profiles.json): a log-normal time to first token, then chunks at a log-normal
+token rate. Every delay is multiplied by `time_scale`, so a suite run takes seconds rather than
+minutes while keeping the relative cost of each service. ReplayAgent (here) and ReplayToolModel
+(langchain_fakes.py) put a replayed model behind the phi agent and LangChain chat model interfaces
+the apps' shared helpers call.
+"""
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+sys.path.append(os.path.join(ROOT, "Agno"))
+
+from models import FakeChatModel, FakeMessage  # noqa: E402
+from search_cache import SEARCH_MAX_ENTRIES, SEARCH_TTL_SECONDS, CachedSearch, stub_backend  # noqa: E402
+from llm_cache import ResponseCache  # noqa: E402
+from stt_worker import StubRecognizer  # noqa: E402
+from tts_pipeline import SilentBackend  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILES_PATH = os.path.join(BENCH_DIR, "profiles.json")
+RESPONSES_PATH = os.path.join(BENCH_DIR, "responses.json")
+CHARS_PER_TOKEN = 4
+
+
+def load_json(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return {key: value for key, value in json.load(f).items() if not key.startswith("_")}
+
+
+class ReplayChatModel(FakeChatModel):
+    """FakeChatModel whose time to first token and token rate are sampled per call from a profile.
+
+    `classify` maps a prompt to a key of `responses`; the recorded text for that key is returned,
+    tagged with a digest of the prompt so that prompts built from it (later report steps) differ
+    per request as they would with a real model, instead of all hitting the response cache.
+    """
+
+    def __init__(self, model: str, profile: Dict[str, float], responses: Dict[str, str],
+                 classify: Callable[[str], str], time_scale: float = 1.0, seed: int = None):
+        self.profile = profile
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        super().__init__(model=model, respond=lambda prompt: self._replay(responses, classify, str(prompt)),
+                         latency=lambda prompt: self._sample(profile["ttft_ms"] / 1000, profile["ttft_sigma"]),
+                         seed=seed)
+
+    @staticmethod
+    def _replay(responses: Dict[str, str], classify: Callable[[str], str], prompt: str) -> str:
+        return f"{responses[classify(prompt)]}\n\nRef. {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]}"
+
+    def _sample(self, median: float, sigma: float) -> float:
+        with self._rng_lock:
+            return self._rng.lognormvariate(0, sigma) * median * self.time_scale
+
+    def stream(self, prompt, **kwargs) -> Iterator[FakeMessage]:
+        text = self._start(prompt)
+        with self._rng_lock:
+            rate = self._rng.lognormvariate(0, self.profile["tps_sigma"]) * self.profile["tokens_per_second"]
+        chunk_delay = self.chunk_chars / CHARS_PER_TOKEN / rate * self.time_scale
+        for i in range(0, len(text), self.chunk_chars):
+            if i:
+                time.sleep(chunk_delay)
+            yield FakeMessage(text[i:i + self.chunk_chars])
+
+    def invoke(self, prompt, **kwargs) -> FakeMessage:
+        message = super().invoke(prompt)
+        with self._rng_lock:
+            rate = self._rng.lognormvariate(0, self.profile["tps_sigma"]) * self.profile["tokens_per_second"]
+        time.sleep(len(message.content) / CHARS_PER_TOKEN / rate * self.time_scale)  # Generation time of the rest
+        return message
+
+
+class ReplayAgent:
+    """Stand-in for a phi Agent: `run(message, images=..., stream=True)` yields chunks with `.content`."""
+
+    def __init__(self, model_id: str, replay: ReplayChatModel):
+        self.model = SimpleNamespace(id=model_id)
+        self.replay = replay
+
+    def run(self, message: str, images: List = None, stream: bool = False):
+        chunks = self.replay.stream(message)
+        return chunks if stream else FakeMessage("".join(chunk.content for chunk in chunks))
+
+
+class Fakes:
+    """Builds the fake services of one benchmark process from the profiles and recordings."""
+
+    def __init__(self, time_scale: float = 0.1, seed: int = 0, cache_dir: str = None,
+                 profiles: Dict = None, responses: Dict[str, str] = None):
+        self.time_scale = time_scale
+        self.seed = seed
+        self.cache_dir = cache_dir or os.getenv("COPILOT_CACHE_DIR") or os.path.join(BENCH_DIR, ".cache")
+        self.profiles = profiles or load_json(PROFILES_PATH)
+        self.responses = responses or load_json(RESPONSES_PATH)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def delay(self, median_ms: float, sigma: float) -> float:
+        with self._rng_lock:
+            return self._rng.lognormvariate(0, sigma) * median_ms / 1000 * self.time_scale
+
+    def chat_model(self, name: str, classify: Callable[[str], str]) -> ReplayChatModel:
+        return ReplayChatModel(name, self.profiles["models"][name], self.responses, classify,
+                               time_scale=self.time_scale, seed=self.seed)
+
+    def tool_chat_model(self, name: str, classify: Callable[[str], str],
+                        tool_call: Callable[[List], Optional[Dict]]):
+        """A LangChain chat model over the replay (see langchain_fakes.py)."""
+        from langchain_fakes import ReplayToolModel
+
+        return ReplayToolModel(replay=self.chat_model(name, classify), tool_call=tool_call)
+
+    def agent(self, name: str, classify: Callable[[str], str]) -> ReplayAgent:
+        """A phi agent whose model id is `name` without its provider prefix."""
+        return ReplayAgent(name.partition(":")[2], self.chat_model(name, classify))
+
+    def search(self, name: str = "tavily", max_results: int = 2) -> CachedSearch:
+        """The cached, coalescing search wrapper the apps use, over an offline backend."""
+        profile = self.profiles["search"][name]
+        backend = stub_backend()
+
+        def search(query: str, max_results: int):
+            time.sleep(self.delay(profile["latency_ms"], profile["sigma"]))
+            return backend(query, max_results)
+        cache = ResponseCache(os.path.join(self.cache_dir, "search_results.sqlite"), SEARCH_MAX_ENTRIES,
+                              SEARCH_TTL_SECONDS)
+        return CachedSearch(search, max_results=max_results, cache=cache, name=name)
+
+    def tts_backend(self, name: str = "gtts") -> SilentBackend:
+        profile = self.profiles["tts"][name]
+        return SilentBackend(latency=lambda text: self.delay(profile["latency_ms"], profile["sigma"])
+                             + len(text) * profile["ms_per_char"] / 1000 * self.time_scale)
+
+    def recognizer(self, name: str = "google", transcript: str = "") -> StubRecognizer:
+        profile = self.profiles["stt"][name]
+
+        def transcribe(audio) -> str:
+            time.sleep(self.delay(profile["latency_ms"], profile["sigma"]))
+            return transcript
+        return StubRecognizer(transcribe)
@@ -0,0 +1,97 @@
+"""Measures the structural HDL analyzer on generated gate-level and RTL netlists.
+
+Run from the repository root:
+
+    python benchmarks/hdl_facts_bench.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+
+from hdl_facts import analyze_design, facts_context  # noqa: E402
+
+CELLS = {"NAND2": ["A", "B"], "NOR2": ["A", "B"], "INV": ["A"], "XOR2": ["A", "B"], "AOI21": ["A", "B", "C"]}
+REPEAT = 3
+
+
+def gate_netlist(blocks: int, cells_per_block: int, seed: int = 0) -> str:
+    """Synthesized-style netlist: cell library, flat blocks of cell instances and flops, and a top level."""
+    rng = random.Random(seed)
+    out = []
+    for cell, inputs in CELLS.items():
+        out.append(f"module {cell} ({', '.join(f'input {pin}' for pin in inputs)}, output Y);")
+        out.append(f"  assign Y = ~({' & '.join(inputs)});\nendmodule\n")
+    out.append("module DFFR (input CK, input RN, input D, output reg Q);")
+    out.append("  always @(posedge CK or negedge RN)\n    if (!RN) Q <= 1'b0;\n    else Q <= D;\nendmodule\n")
+    for b in range(blocks):
+        out.append(f"module block_{b} (input clk, input rst_n, input [31:0] din, output [31:0] dout);")
+        out.append(f"  wire [{cells_per_block + 31}:0] n;")
+        for c in range(cells_per_block):
+            cell = rng.choice(list(CELLS))
+            pins = ", ".join(f".{pin}(n[{rng.randrange(c + 32)}])" for pin in CELLS[cell])
+            out.append(f"  {cell} U{c} ({pins}, .Y(n[{c + 32}]));")
+        for f in range(32):
+            out.append(f"  DFFR R{f} (.CK(clk), .RN(rst_n), .D(n[{cells_per_block + f}]), .Q(dout[{f}]));")
+        out.append("endmodule\n")
+    out.append("module chip_top (input clk, input rst_n, input [31:0] din, output [31:0] dout);")
+    out.append(f"  wire [31:0] bus [0:{blocks}];\n  assign bus[0] = din;")
+    for b in range(blocks):
+        out.append(f"  block_{b} u_block_{b} (.clk(clk), .rst_n(rst_n), .din(bus[{b}]), .dout(bus[{b + 1}]));")
+    out.append(f"  assign dout = bus[{blocks}];\nendmodule\n")
+    return "\n".join(out)
+
+
+def rtl_design(modules: int, seed: int = 0) -> str:
+    """Behavioral RTL with sequential and combinational blocks, case statements and an occasional latch."""
+    rng = random.Random(seed)
+    out = []
+    for m in range(modules):
+        out.append(f"module unit_{m} #(parameter W = {rng.choice([8, 16, 32])}) (")
+        out.append("  input clk, input rst_n, input [W-1:0] a, input [W-1:0] b, input [1:0] op, output reg [W-1:0] y);")
+        out.append("  reg [W-1:0] r, t;")
+        out.append("  always @(*) begin\n    case (op)")
+        out.append("      2'b00: r = a + b;\n      2'b01: r = a - b;\n      2'b10: r = a & b;")
+        out.append("      default: r = a | b;\n    endcase")
+        out.append("    if (op == 2'b11) t = a;" + ("" if m % 7 == 0 else " else t = b;"))
+        out.append("  end\n  always @(posedge clk or negedge rst_n) begin")
+        out.append("    if (!rst_n) y <= {W{1'b0}};\n    else y <= r ^ t;\n  end")
+        if m:
+            out.append(f"  unit_{rng.randrange(m)} #(.W(W)) u_child (.clk(clk), .rst_n(rst_n), .a(a), .b(b), .op(op), .y());")
+        out.append("endmodule\n")
+    return "\n".join(out)
+
+
+def timed(fn):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    cases = {
+        "gates 10 x 1k": gate_netlist(10, 1000),
+        "gates 50 x 2k": gate_netlist(50, 2000),
+        "gates 100 x 5k": gate_netlist(100, 5000),
+        "rtl 500 modules": rtl_design(500),
+        "rtl 5000 modules": rtl_design(5000),
+    }
+    print(f"{'design':<18} {'lines':>9} {'MB':>6} {'analyze s':>10} {'klines/s':>9} {'instances':>10} "
+          f"{'latches':>8} {'source chars':>13} {'context chars':>14}")
+    for name, source in cases.items():
+        seconds, facts = timed(lambda: analyze_design(source))
+        lines = source.count("\n") + 1
+        context = facts_context(facts)
+        print(f"{name:<18} {lines:>9} {len(source) / 1e6:>6.1f} {seconds:>10.2f} {lines / seconds / 1000:>9.0f} "
+              f"{facts['totals']['instances']:>10} {facts['totals']['latches']:>8} {len(source):>13} {len(context):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares the legacy per-rerun resize and full-resolution upload with the cached image pipeline.
+
+Run from the repository root:
+
+    python benchmarks/image_pipeline_bench.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("COPILOT_CACHE_DIR", tempfile.mkdtemp(prefix="image_bench_"))
+sys.path.insert(0, os.path.join(ROOT, "Agno"))
+
+from PIL import Image  # noqa: E402
+
+import image_pipeline  # noqa: E402
+
+RERUNS = 20
+
+
+def legacy_resize(image_file):
+    """The resize_image_for_display implementation the Agno apps used before the pipeline."""
+    img = Image.open(image_file)
+    aspect_ratio = img.height / img.width
+    new_height = int(image_pipeline.MAX_IMAGE_WIDTH * aspect_ratio)
+    img = img.resize((image_pipeline.MAX_IMAGE_WIDTH, new_height), Image.Resampling.LANCZOS)
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def camera_photo(width=4000, height=3000):
+    """Synthesizes a 12 MP camera-style JPEG with a gradient and noise."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    img = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    cases = {name: os.path.join(ROOT, path) for name, path in image_pipeline.EXAMPLE_IMAGES.items()
+             if os.path.exists(os.path.join(ROOT, path))}
+    cases["12MP camera photo"] = camera_photo()
+
+    print(f"{'image':<20} {'legacy ms/rerun':>16} {'pipeline cold ms':>17} {'pipeline warm ms':>17} "
+          f"{'upload KB':>10} {'prepared KB':>12} {'prepare ms':>11}")
+    for name, source in cases.items():
+        data = image_pipeline.read_image_bytes(source)
+        legacy = timed(lambda: legacy_resize(BytesIO(data)), RERUNS)
+        cold = timed(lambda: image_pipeline.resize_image_for_display(source), 1)
+        warm = timed(lambda: image_pipeline.resize_image_for_display(source), RERUNS)
+        start = time.perf_counter()
+        prepared, _ = image_pipeline.prepare_model_image(source)
+        prepare_ms = (time.perf_counter() - start) * 1000
+        print(f"{name:<20} {legacy:>16.1f} {cold:>17.1f} {warm:>17.2f} "
+              f"{len(data) / 1024:>10.0f} {len(prepared) / 1024:>12.0f} {prepare_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""LangChain stand-in for the chatbot graph, apart from fakes.py so that other scenarios don't load LangChain."""
+import json
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel, generate_from_stream
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from memory import message_content, message_role
+
+
+class ReplayToolModel(BaseChatModel):
+    """LangChain chat model over a ReplayChatModel, for running the chatbot graph.
+
+    The prompt handed to the replay is the messages as role/content dicts. The replayed text streams
+    through the callbacks, so the graph's "messages" stream mode sees its tokens as with a provider
+    model. `tool_call` maps the messages to the tool call ({"name", "args"}) the reply requests, or None.
+    """
+    replay: Any
+    tool_call: Optional[Callable[[List], Optional[Dict]]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs) -> "ReplayToolModel":
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt = str([{"role": message_role(message), "content": message_content(message)} for message in messages])
+        for part in self.replay.stream(prompt):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=part.content))
+        call = self.tool_call(messages) if self.tool_call else None
+        if call:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"], "args": json.dumps(call["args"]), "id": f"call_{uuid.uuid4().hex}", "index": 0}]))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
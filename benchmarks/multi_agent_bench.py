@@ -0,0 +1,87 @@
+"""Compares the sequential Orchestrator -> AI model -> Design flow with the parallel multi-agent pipeline.
+
+Run from the repository root:
+
+    python benchmarks/multi_agent_bench.py
+
+A stub model answers every agent call after a per-dimension delay. The sequential baseline makes
+the same calls one after another, as the notebooks do; the pipeline's wall time should track the
+slowest dimension plus the slowest validation batch plus the report.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+
+import multi_agent  # noqa: E402
+from llm_cache import ResponseCache  # noqa: E402
+from models import FakeChatModel  # noqa: E402
+from prompts import ANALYSIS_DIMENSIONS  # noqa: E402
+
+TASK = "How to choose the number of input pins in a chip architecture? Generate a report emphasizing this."
+DIMENSION_SECONDS = {"power": 0.6, "area": 0.3, "performance": 0.5, "reliability": 0.4, "cost": 0.3,
+                     "security": 0.4, "pin_count": 0.7}
+VALIDATION_SECONDS = 0.4
+REPORT_SECONDS = 0.5
+
+
+def latency(prompt: str) -> float:
+    for name, focus in ANALYSIS_DIMENSIONS.items():
+        if focus in prompt:
+            return DIMENSION_SECONDS[name]
+    return VALIDATION_SECONDS if "Validate each" in prompt else REPORT_SECONDS
+
+
+def respond(prompt: str) -> str:
+    if "Focus only" in prompt:
+        focus = prompt.split("dimension: ", 1)[1].split(":", 1)[0]
+        return "\n".join(f"{i}. {focus} suggestion {i}" for i in range(1, 5))
+    if "Validate each" in prompt:
+        return "ACCEPT, with justification"
+    return "# Chip design report"
+
+
+def fresh_cache() -> ResponseCache:
+    return ResponseCache(os.path.join(tempfile.mkdtemp(prefix="agent_bench_"), "cache.db"))
+
+
+def sequential(llm, cache, batch_size):
+    """The same agent calls, one at a time."""
+    calls = 0
+    analyses = {}
+    for name in ANALYSIS_DIMENSIONS:
+        analyses[name], _ = multi_agent.analyze_dimensions(TASK, llm, {name: ANALYSIS_DIMENSIONS[name]}, 1, cache)
+        analyses[name] = analyses[name][name]
+        calls += 1
+    suggestions = multi_agent.merge_suggestions(analyses)
+    validations, timings = multi_agent.validate_suggestions(TASK, suggestions, llm, batch_size, 1, cache)
+    calls += len(timings)
+    llm.invoke(multi_agent.orchestrator_prompt(TASK, list(analyses), validations))
+    return calls + 1
+
+
+def main():
+    llm = FakeChatModel(respond=respond, latency=latency)
+    print(f"{'setup':<34} {'wall s':>7} {'agent calls':>12}")
+    for batch_size in (4, 8):
+        start = time.perf_counter()
+        calls = sequential(llm, fresh_cache(), batch_size)
+        print(f"{f'sequential, batches of {batch_size}':<34} {time.perf_counter() - start:>7.2f} {calls:>12}")
+        start = time.perf_counter()
+        _, timings = multi_agent.run_pipeline(TASK, llm, batch_size=batch_size, cache=fresh_cache())
+        print(f"{f'parallel pipeline, batches of {batch_size}':<34} {time.perf_counter() - start:>7.2f} {len(timings):>12}")
+    bound = max(DIMENSION_SECONDS.values()) + VALIDATION_SECONDS + REPORT_SECONDS
+    print(f"slowest dimension + batch + report: {bound:.2f}s")
+
+    early = FakeChatModel(respond=lambda prompt: "FINAL ANSWER: 48 pins" if "Pin count" in prompt else respond(prompt),
+                          latency=latency)
+    start = time.perf_counter()
+    report, timings = multi_agent.run_pipeline(TASK, early, cache=fresh_cache())
+    print(f"FINAL ANSWER from pin_count after {time.perf_counter() - start:.2f}s: {report!r}")
+
+
+if __name__ == "__main__":
+    main()
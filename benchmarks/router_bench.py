@@ -0,0 +1,85 @@
+"""Measures the LLM router against local stub providers with simulated latency distributions.
+
+Run from the repository root:
+
+    python benchmarks/router_bench.py
+
+Compares a single provider with the router without and with hedging (client-side p50/p95/p99),
+then shows failover when the preferred provider starts returning 429s and how steps split by tier.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+
+from router import LLMRouter, simulated_provider  # noqa: E402
+
+CALLS = 400
+WORKERS = 16
+
+
+def stubs(flaky_rate=0.0):
+    """A heavy-tailed strong provider, a steadier backup and a small fast model."""
+    return {
+        "stub:primary": simulated_provider("stub:primary", median=0.040, sigma=0.8, seed=1,
+                                           error_rate=flaky_rate, error_status=429),
+        "stub:backup": simulated_provider("stub:backup", median=0.050, sigma=0.3, seed=2),
+        "stub:small": simulated_provider("stub:small", median=0.010, sigma=0.3, seed=3),
+    }
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return tuple(ordered[int(q * (len(ordered) - 1))] * 1000 for q in (0.50, 0.95, 0.99))
+
+
+def timed_calls(invoke, calls=CALLS):
+    def one(i):
+        start = time.perf_counter()
+        invoke(f"prompt {i}")
+        return time.perf_counter() - start
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        return list(executor.map(one, range(calls)))
+
+
+def make_router(providers, hedge):
+    return LLMRouter({"strong": ["stub:primary", "stub:backup"], "cheap": ["stub:small", "stub:backup"]},
+                     hedge=hedge, resolve=lambda name, temperature: providers[name], max_workers=2 * WORKERS)
+
+
+def main():
+    print(f"{'setup':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hedges':>7} {'hedge wins':>11}")
+    single = stubs()["stub:primary"]
+    p50, p95, p99 = percentiles(timed_calls(single.invoke))
+    print(f"{'single provider':<28} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {'-':>7} {'-':>11}")
+    for hedge, quantile in ((False, 0.95), (True, 0.95), (True, 0.80)):
+        router = make_router(stubs(), hedge)
+        router.hedge_quantile = quantile
+        router.invoke("strong", "warm-up")
+        model = router.route("analyze")
+        timed_calls(model.invoke, 50)  # Let the rolling window learn the latency distributions
+        p50, p95, p99 = percentiles(timed_calls(model.invoke))
+        primary = router.summary()["stub:primary"]
+        label = f"router, hedged at p{quantile * 100:.0f}" if hedge else "router, no hedging"
+        print(f"{label:<28} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {primary['hedges']:>7} "
+              f"{router.summary()['stub:backup']['hedge_wins']:>11}")
+
+    print("\nFailover with 30% of primary calls returning 429:")
+    router = make_router(stubs(flaky_rate=0.3), hedge=False)
+    router.cooldown = 0.05
+    samples = timed_calls(router.route("analyze").invoke)
+    p50, p95, _ = percentiles(samples)
+    summary = router.summary()
+    print(f"  {len(samples)} calls, 0 surfaced errors, p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+          f"{summary['stub:primary']['failovers']} failovers, backup served {summary['stub:backup']['calls']}")
+
+    print("\nStep routing:")
+    for step in ("issues", "blueprint", "terminology", "terminology+layout+plain_language", "digest_reduce"):
+        print(f"  {step:<36} -> {router.route(step).model}")
+
+
+if __name__ == "__main__":
+    main()
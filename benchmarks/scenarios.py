@@ -0,0 +1,173 @@
+"""Benchmark scenarios: the copilot's request paths, driven by the demo queries and bundled images.
+
+Each scenario's setup builds the shared objects of one process (models, caches, pipelines) from
+the fakes and returns a function that serves request `i` and returns its TimedStream, with time
+to first token measured from `start`. The apps' code paths are used directly: the chatbot graph
+and turn (chat_graph.py) and the image analysis helper (analysis_cache.stream_analysis) run on the
+job service with the fakes injected; only the Streamlit rendering around them is left out.
+Requests go through the provider throttles, but quotas are not simulated here (see throttle_bench.py).
+"""
+import glob
+import os
+from typing import Callable, Dict, List, Tuple
+
+import speech_recognition as sr
+
+from fakes import ROOT, Fakes
+from agent_prompts import INSTRUCTIONS, SYSTEM_PROMPT
+from analysis_cache import ANALYZE_MESSAGE, AnalysisCache, stream_analysis
+from llm_cache import ResponseCache
+from llm_chain import chain
+from memory import message_content, message_role
+from prompts import Designcopilot, FORMATTING_PROMPTS, data_processing_steps
+from service import get_service
+from step_graph import stream_steps
+from streaming import TimedStream
+from throttle import ThrottledModel, configure_throttle
+from tts_pipeline import TTSPipeline
+
+QUERIES_PATH = os.path.join(ROOT, "Demo Sample Queries")
+IMAGES_DIR = os.path.join(ROOT, "images")
+TEXT_MODEL = "google:gemini-1.5-flash"
+VISION_MODEL = "google:gemini-1.5-flash:vision"
+
+Request = Callable[[int, float], TimedStream]
+
+
+def load_queries(path: str = QUERIES_PATH) -> List[str]:
+    """The sample questions, without the header comment and section titles."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#") and not line.endswith("??")]
+
+
+def load_images(directory: str = IMAGES_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "*.jpg")) + glob.glob(os.path.join(directory, "*.png")))
+
+
+def report(fakes: Fakes) -> Request:
+    """LangGraph workflow app: the report step graph, streaming the final step."""
+    final_prompt = FORMATTING_PROMPTS[-1][:40]
+    llm = fakes.chat_model(TEXT_MODEL, lambda prompt: "report_final" if final_prompt in prompt else "report_step")
+    cache = ResponseCache(os.path.join(fakes.cache_dir, "llm_responses.sqlite"))
+    queries = load_queries()
+
+    def run(i: int, start: float) -> TimedStream:
+        design = f"{Designcopilot}\n\nDesign question: {queries[i % len(queries)]}"
+        stream, _ = stream_steps(design, data_processing_steps, llm, cache=cache, start=start)
+        return stream
+    return run
+
+
+def sequential_chain(fakes: Fakes) -> Request:
+    """llm_chain.chain(): the same report prompts, one blocking call after another."""
+    final_prompt = FORMATTING_PROMPTS[-1][:40]
+    llm = fakes.chat_model(TEXT_MODEL, lambda prompt: "report_final" if final_prompt in prompt else "report_step")
+    cache = ResponseCache(os.path.join(fakes.cache_dir, "llm_responses.sqlite"))
+    prompts = [step.prompt for step in data_processing_steps]
+    queries = load_queries()
+
+    def run(i: int, start: float) -> TimedStream:
+        return TimedStream(iter([chain(queries[i % len(queries)], prompts, llm, cache)]), name="chain", start=start)
+    return run
+
+
+def unthrottled(key: str) -> None:
+    """Keeps the provider's retry policy and circuit breaker but lifts its quota, which is not simulated."""
+    configure_throttle(key, rpm=0, tpm=0)
+
+
+def chat(fakes: Fakes) -> Request:
+    """LangGraph chatbot turn: the graph's model call requests a search, the tools node runs it, the answer streams.
+
+    Every request opens a thread, so repeated questions are replayed from the semantic cache.
+    """
+    from chat_graph import build_graph, chat_tools, start_turn  # LangGraph is only loaded by this scenario
+    from checkpointer import SQLiteDeltaSaver
+
+    def search_first(messages):
+        """Requests a web search for the question, then answers once the search result is in."""
+        if message_role(messages[-1]) == "tool":
+            return None
+        return {"name": "tavily_search_results_json", "args": {"query": message_content(messages[-1])}}
+
+    unthrottled(TEXT_MODEL)
+    model = fakes.tool_chat_model(TEXT_MODEL, lambda prompt: "chat_answer" if "'role': 'tool'" in prompt else "chat_plan",
+                                  search_first)
+    llm = ThrottledModel(model, TEXT_MODEL)  # As get_chat_model wraps the provider model
+    service = get_service()
+    checkpointer = SQLiteDeltaSaver(os.path.join(fakes.cache_dir, "chatbot_checkpoints.sqlite"))
+    graph = build_graph(checkpointer, llm=llm, tools=chat_tools(fakes.search(max_results=2)))
+    queries = load_queries()
+
+    def run(i: int, start: float) -> TimedStream:
+        config = {"configurable": {"thread_id": f"bench-{i}"}}
+        job_id, match = start_turn(service, f"user{i}", lambda: graph, queries[i % len(queries)], config,
+                                   opening=True)
+        return TimedStream(service.stream(job_id), name="chatbot_cached" if match else "chatbot", start=start)
+    return run
+
+
+def _image_analysis(fakes: Fakes) -> Callable[[int, str, str, float], TimedStream]:
+    """Agno analyze_image: analysis cache lookup, then the agent's streamed analysis as a job, stored once complete."""
+    agent = fakes.agent(VISION_MODEL, lambda prompt: "image_analysis")
+    unthrottled(f"google:{agent.model.id}")
+    service = get_service()
+    cache = AnalysisCache(os.path.join(fakes.cache_dir, "image_analyses.sqlite"))
+
+    def analyze(i: int, image: str, message: str, start: float) -> TimedStream:
+        chunks, _ = stream_analysis(service, f"user{i}", agent, image, SYSTEM_PROMPT, INSTRUCTIONS,
+                                    message, cache=cache)
+        return TimedStream(chunks, name="image_analysis", start=start)
+    return analyze
+
+
+def image(fakes: Fakes) -> Request:
+    """Agno multimodal app: analysis of a bundled example image."""
+    analyze = _image_analysis(fakes)
+    images = load_images()
+
+    def run(i: int, start: float) -> TimedStream:
+        return analyze(i, images[i % len(images)], ANALYZE_MESSAGE, start)
+    return run
+
+
+def stt(fakes: Fakes) -> Request:
+    """Agno STT app: a spoken question is transcribed, then answered alongside the image analysis."""
+    analyze = _image_analysis(fakes)
+    images = load_images()
+    queries = load_queries()
+    audio = sr.AudioData(b"\x00\x00" * 16000, 16000, 2)  # One second of silence; the fake ignores it
+
+    def run(i: int, start: float) -> TimedStream:
+        query = fakes.recognizer(transcript=queries[i % len(queries)]).recognize(audio)
+        message = f"{ANALYZE_MESSAGE} and answer the user's question: {query}"
+        return analyze(i, images[i % len(images)], message, start)
+    return run
+
+
+def tts(fakes: Fakes) -> Request:
+    """Agno TTS app: image analysis, then the report read aloud; the request ends with the last audio chunk."""
+    analyze = _image_analysis(fakes)
+    pipeline = TTSPipeline(fakes.tts_backend(), cache_dir=os.path.join(fakes.cache_dir, "tts"))
+    images = load_images()
+
+    def run(i: int, start: float) -> TimedStream:
+        analysis = analyze(i, images[i % len(images)], ANALYZE_MESSAGE, start)
+
+        def chunks():
+            yield from analysis
+            for _ in pipeline.stream(analysis.text):
+                pass
+        return TimedStream(chunks(), name="tts", start=start)
+    return run
+
+
+SCENARIOS: Dict[str, Tuple[Callable[[Fakes], Request], str]] = {
+    "report": (report, "Workflow app report, concurrent step graph"),
+    "chain": (sequential_chain, "Sequential llm_chain.chain() over the report prompts"),
+    "chat": (chat, "Chatbot turn with one search"),
+    "image": (image, "Multimodal image analysis"),
+    "stt": (stt, "Spoken question about an image"),
+    "tts": (tts, "Image analysis read aloud"),
+}
@@ -0,0 +1,214 @@
+"""Measures the semantic answer cache: lookup latency at scale and hit quality on paraphrases.
+
+Run from the repository root:
+
+    python benchmarks/semantic_cache_bench.py                 # 20,000 entries
+    python benchmarks/semantic_cache_bench.py --entries 50000
+
+Fills a temporary cache with synthetic chip-design questions, then times lookups (p50/p95/p99)
+and checks that paraphrases of cached questions hit while related but different questions miss.
+Finally sweeps the similarity threshold over paraphrases of the Demo Sample Queries, which is how
+semantic_cache.DEFAULT_THRESHOLD was chosen: the lowest threshold serving no wrong answer.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+
+from semantic_cache import SemanticCache, answer_namespace  # noqa: E402
+
+QUERIES_PATH = os.path.join(ROOT, "Demo Sample Queries")
+
+LOOKUPS = 1000
+TOPICS = ("power", "timing", "area", "clock skew", "setup slack", "hold violations", "FIFO", "UART", "ALU",
+          "cache coherence", "branch prediction", "DRC errors", "floorplan", "placement", "routing congestion",
+          "scan chains", "low-power chip", "ASIC reliability", "FPGA utilization", "pipeline hazards")
+FORMS = ("How do I reduce {} in my {} design?", "What causes {} problems in a {} block?",
+         "Explain how to analyze {} for a {} at {} nm", "Write a Tcl script that reports {} for {} in Cadence")
+BLOCKS = ("RISC-V core", "DSP", "SerDes", "memory controller", "GPU", "NoC", "PLL", "SoC")
+
+# (cached question, new question, should the new question be served the cached answer)
+PAIRS = [
+    ("How to design a low-power chip?", "How do I design a low power chip", True),
+    ("How can I optimize the power consumption of my chip design?", "How to optimize power consumption in chip design", True),
+    ("Write a Tcl script for check_timing in Cadence", "Write a Tcl script to run check_timing in Cadence", True),
+    ("Design a 16-to-1 MUX in Verilog", "Design a 16 to 1 multiplexer MUX in verilog", True),
+    ("Explain instruction level parallelism", "What is instruction-level parallelism?", True),
+    ("Explain loop tiling for cache performance", "How does loop tiling improve cache performance?", True),
+    ("How do I create a schematic in Cadence Virtuoso?", "Creating a schematic in Cadence Virtuoso", True),
+    ("How can I reduce the area of my chip design?", "How can I reduce the power of my chip design?", False),
+    ("What is the clock period?", "What is clock skew?", False),
+    ("Write a Tcl script for check_timing in Cadence", "Write a Tcl script for report_timing in Cadence", False),
+    ("Design a 16-to-1 MUX in Verilog", "Design an 8-to-1 MUX in Verilog", False),
+    ("Explain boolean algebra", "Explain boolean minimization with Karnaugh maps", False),
+]
+
+# Rewordings of each Demo Sample Queries question; each should be served that question's answer
+DEMO_PARAPHRASES = {
+    "High-level synthesis optimization": [
+        "How do I optimize high-level synthesis?",
+        "HLS optimization techniques",
+        "Optimizing high level synthesis results",
+    ],
+    "Low-power chip design optimization": [
+        "low power chip design",
+        "How do I reduce power consumption of my chip?",
+        "Optimizing a chip design for low power",
+    ],
+    "Performance optimization techniques": [
+        "What are some performance optimization techniques?",
+        "Techniques to optimize chip performance",
+        "How can I improve the performance of my design?",
+    ],
+    "Explain Architecture,Circuit and algorithm level optimization": [
+        "Architecture, circuit and algorithm level optimizations",
+        "What is architecture level, circuit level and algorithm level optimization?",
+        "Optimization at the algorithm, architecture and circuit levels",
+    ],
+    "Area optimization in VLSI": [
+        "How to optimize area in VLSI design",
+        "VLSI area optimization techniques",
+        "How do I reduce the area of a VLSI chip?",
+    ],
+    "Loop and cache optimization": [
+        "Loop optimization and cache optimization",
+        "How do loop and cache optimizations work?",
+        "Optimizing loops and caches",
+    ],
+    "Clock period minimization techniques": [
+        "How to minimize the clock period",
+        "Techniques for clock period minimization",
+        "How can I reduce the clock period of my design?",
+    ],
+    "HLS resource binding ,allocation and scheduling": [
+        "Resource allocation, binding and scheduling in HLS",
+        "Explain scheduling, allocation and binding in high-level synthesis",
+        "What is HLS scheduling and resource binding?",
+    ],
+    "Explain boolean minimization and technology mapping": [
+        "Boolean minimization and technology mapping",
+        "What are boolean minimization and tech mapping?",
+        "How do boolean minimization and technology mapping work?",
+    ],
+    "Explain ILP(Instruction level parallelism) and pipelining techniques": [
+        "What is instruction level parallelism and pipelining?",
+        "Instruction-level parallelism (ILP) and pipelining",
+        "Explain pipelining and ILP techniques",
+    ],
+    "Can you tell how I can create a design library in Cadence Virtuoso": [
+        "How do I create a design library in Cadence Virtuoso?",
+        "Creating a design library in Cadence Virtuoso",
+        "Steps to make a new library in Virtuoso",
+    ],
+    "Can you tell me the syntax of the check_timing command for Synopsys Design Compiler": [
+        "What is the syntax of check_timing in Synopsys Design Compiler?",
+        "check_timing command syntax for Design Compiler",
+        "How do I use the check_timing command in Synopsys DC?",
+    ],
+    "Write a simple Verilog module for a 16-to-1 multiplexer (MUX) that takes a 16-bit input vector and a 4-bit select signal to produce a single-bit output": [
+        "Write a Verilog module for a 16-to-1 MUX with a 16-bit input and a 4-bit select",
+        "Verilog code for a 16-to-1 multiplexer with 16-bit input vector and 4-bit select signal",
+        "Simple Verilog 16-to-1 mux: 16-bit input, 4-bit select, single-bit output",
+    ],
+}
+# Related questions that need a different answer than any demo question
+DEMO_NEAR_MISSES = {
+    "High-level synthesis optimization": ["Logic synthesis optimization", "High-level synthesis verification"],
+    "Low-power chip design optimization": ["Low-cost chip design optimization", "Secure chip design optimization"],
+    "Performance optimization techniques": ["Timing optimization techniques", "Yield optimization techniques"],
+    "Area optimization in VLSI": ["Reliability optimization in VLSI", "Timing optimization in VLSI"],
+    "Loop and cache optimization": ["Loop unrolling in HLS", "Cache coherence protocols"],
+    "Clock period minimization techniques": ["Clock skew minimization techniques", "Clock power reduction techniques"],
+    "Explain boolean minimization and technology mapping": ["Explain boolean algebra", "Explain placement and routing"],
+    "Can you tell how I can create a design library in Cadence Virtuoso": ["How do I create a schematic in Cadence Virtuoso?", "How do I run a simulation in Cadence Virtuoso?"],
+    "Can you tell me the syntax of the check_timing command for Synopsys Design Compiler": ["What is the syntax of the report_timing command for Synopsys Design Compiler?"],
+    "Write a simple Verilog module for a 16-to-1 multiplexer (MUX) that takes a 16-bit input vector and a 4-bit select signal to produce a single-bit output": ["Write a simple Verilog module for an 8-to-1 multiplexer with an 8-bit input vector and a 3-bit select signal", "Write a simple VHDL entity for a 4-bit counter"],
+}
+SWEEP = (0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75)
+
+
+def synthetic_questions(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        form = rng.choice(FORMS)
+        values = [rng.choice(TOPICS), rng.choice(BLOCKS), rng.choice((3, 5, 7, 12, 16, 28))][:form.count("{}")]
+        yield form.format(*values) + f" (case {i})"
+
+
+def demo_queries(path=QUERIES_PATH):
+    """The sample questions, without the header comment and section titles."""
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#") and not line.endswith("??")]
+
+
+def threshold_sweep(directory):
+    """Hit rate on paraphrases of the demo questions and wrong answers served, per threshold."""
+    queries = demo_queries()
+    assert set(DEMO_PARAPHRASES) <= set(queries), "DEMO_PARAPHRASES no longer matches the Demo Sample Queries"
+    asked = [(paraphrase, query) for query in queries for paraphrase in DEMO_PARAPHRASES.get(query, ())]
+    asked += [(near_miss, None) for near_misses in DEMO_NEAR_MISSES.values() for near_miss in near_misses]
+    paraphrases = sum(1 for _, query in asked if query is not None)
+    print(f"\n{'threshold':>9} {'hits':>9} {'hit rate':>8} {'wrong':>5}  "
+          f"({len(queries)} demo questions, {paraphrases} paraphrases, {len(asked) - paraphrases} near misses)")
+    for threshold in SWEEP:
+        cache = SemanticCache(os.path.join(directory, f"sweep-{threshold}"), threshold=threshold)
+        namespace = answer_namespace("bench", "demo")
+        for query in queries:
+            cache.store(query, namespace, query)
+        hits = wrong = 0
+        for question, query in asked:
+            match = cache.lookup(question, namespace)
+            hits += match is not None and match.answer == query
+            wrong += match is not None and match.answer != query
+        print(f"{threshold:>9.2f} {hits:>4}/{paraphrases:<4} {hits / paraphrases:>8.0%} {wrong:>5}")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return tuple(ordered[int(q * (len(ordered) - 1))] * 1000 for q in (0.50, 0.95, 0.99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SemanticCache(directory, max_entries=args.entries + len(PAIRS))
+        namespace = answer_namespace("bench", "1")
+        start = time.perf_counter()
+        for question in synthetic_questions(args.entries):
+            cache.store(question, namespace, "synthetic answer")
+        print(f"filled {len(cache)} entries in {time.perf_counter() - start:.1f} s "
+              f"({cache.embedder.name}, {cache.capacity * cache.embedder.dim * 4 / 2**20:.0f} MB of vectors)")
+
+        queries = [question.replace("case", "example") for question in synthetic_questions(LOOKUPS, seed=1)]
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            cache.lookup(query, namespace)
+            timings.append(time.perf_counter() - start)
+        p50, p95, p99 = percentiles(timings)
+        print(f"lookup  p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms")
+
+        print(f"\n{'score':>6} {'expected':>9} {'served':>7}  new question / cached question")
+        wrong = 0
+        for cached, asked, expected in PAIRS:
+            pair_namespace = answer_namespace("bench", cached)  # One namespace per pair keeps them apart
+            cache.store(cached, pair_namespace, "answer")
+            match = cache.lookup(asked, pair_namespace)
+            score = cache.search(asked, pair_namespace, k=1)[0].score
+            wrong += (match is not None) != expected
+            print(f"{score:>6.2f} {'hit' if expected else 'miss':>9} {'hit' if match else 'miss':>7}  {asked} / {cached}")
+        print(f"\n{len(PAIRS) - wrong}/{len(PAIRS)} pairs as expected at threshold {cache.threshold}")
+        threshold_sweep(directory)
+
+
+if __name__ == "__main__":
+    main()
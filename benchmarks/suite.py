@@ -0,0 +1,172 @@
+"""Offline benchmark suite: throughput, time to first token, p95 latency and peak RSS per scenario.
+
+Run from the repository root, no API keys needed:
+
+    python benchmarks/suite.py                          # every scenario at 1, 4 and 16 concurrent users
+    python benchmarks/suite.py chat image -c 1 8        # some scenarios, other concurrency levels
+    python benchmarks/suite.py --compare                # against benchmarks/baselines/, exit 1 on regressions
+    python benchmarks/suite.py --save-baseline          # record new baselines after an intended change
+
+Every (scenario, concurrency) level runs in a fresh process with an empty cache directory, so the
+peak RSS is that level's own and repeated inputs hit the caches only within the level, as they
+would in one app process. The external services are the fakes in fakes.py, with delays scaled by
+--time-scale; compare only runs with the same scale.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+SCENARIO_NAMES = ["report", "chain", "chat", "image", "stt", "tts"]
+DEFAULT_CONCURRENCY = [1, 4, 16]
+REQUESTS_PER_USER = 4
+DEFAULT_TIME_SCALE = 0.1
+DEFAULT_TOLERANCE = 0.2
+# Metric, and whether larger values are better
+COMPARED = [("throughput_rps", True), ("ttft_p95_s", False), ("latency_p95_s", False), ("peak_rss_mb", False)]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def run_level(scenario: str, concurrency: int, requests: int, time_scale: float, seed: int) -> Dict[str, float]:
+    """Serves `requests` requests from `concurrency` concurrent users in this process."""
+    from fakes import Fakes
+    from scenarios import SCENARIOS
+
+    setup, _ = SCENARIOS[scenario]
+    serve = setup(Fakes(time_scale=time_scale, seed=seed))
+    ttfts, latencies, errors = [], [], 0
+
+    def one(i):
+        start = time.perf_counter()
+        stream = serve(i, start)
+        for _ in stream:
+            pass
+        return stream.ttft, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(one, i) for i in range(requests)]:
+            try:
+                ttft, latency = future.result()
+            except Exception:
+                errors += 1
+                continue
+            ttfts.append(ttft)
+            latencies.append(latency)
+    wall = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3),
+        "ttft_p50_s": round(percentile(ttfts, 0.50), 4) if ttfts else None,
+        "ttft_p95_s": round(percentile(ttfts, 0.95), 4) if ttfts else None,
+        "latency_p50_s": round(percentile(latencies, 0.50), 4) if latencies else None,
+        "latency_p95_s": round(percentile(latencies, 0.95), 4) if latencies else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # kB on Linux
+    }
+
+
+def run_isolated(scenario: str, concurrency: int, requests: int, time_scale: float, seed: int) -> Dict[str, float]:
+    """Runs one level in a child process with its own empty cache directory."""
+    with tempfile.TemporaryDirectory(prefix="copilot_bench_") as cache_dir:
+        env = dict(os.environ, COPILOT_CACHE_DIR=cache_dir, COPILOT_TRACE_SINK=os.getenv("COPILOT_TRACE_SINK", "none"))
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", scenario, "-c", str(concurrency),
+             "--requests", str(requests), "--time-scale", str(time_scale), "--seed", str(seed)],
+            env=env, check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def baseline_path(scenario: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{scenario}.json")
+
+
+def compare(scenario: str, results: Dict[str, Dict[str, float]], time_scale: float, tolerance: float) -> List[str]:
+    """Returns one line per metric that got worse than the baseline by more than `tolerance`."""
+    path = baseline_path(scenario)
+    if not os.path.exists(path):
+        print(f"  no baseline at {path}")
+        return []
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["time_scale"] != time_scale:
+        print(f"  baseline was recorded with --time-scale {baseline['time_scale']}, not compared")
+        return []
+    regressions = []
+    for level, result in results.items():
+        expected = baseline["results"].get(level)
+        if expected is None:
+            continue
+        for metric, higher_is_better in COMPARED:
+            old, new = expected.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{scenario} c={level} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", default=SCENARIO_NAMES, help=f"Any of {', '.join(SCENARIO_NAMES)}")
+    parser.add_argument("-c", "--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY,
+                        help="Concurrent users per level")
+    parser.add_argument("--requests", type=int, help=f"Requests per level (default {REQUESTS_PER_USER} per user)")
+    parser.add_argument("--time-scale", type=float, default=DEFAULT_TIME_SCALE, help="Multiplier on every fake delay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", action="store_true", help="Compare with the baselines; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baselines")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIO_NAMES)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.child:
+        result = run_level(args.scenarios[0], args.concurrency[0], args.requests, args.time_scale, args.seed)
+        print(json.dumps(result))
+        return
+
+    regressions = []
+    print(f"{'scenario':<8} {'users':>5} {'req':>4} {'err':>4} {'req/s':>7} {'ttft p50':>9} {'ttft p95':>9} "
+          f"{'p50 s':>7} {'p95 s':>7} {'rss MB':>7}")
+    for scenario in args.scenarios:
+        results = {}
+        for concurrency in args.concurrency:
+            requests = args.requests or REQUESTS_PER_USER * concurrency
+            r = run_isolated(scenario, concurrency, requests, args.time_scale, args.seed)
+            results[str(concurrency)] = r
+            r = {key: float("nan") if value is None else value for key, value in r.items()}  # Every request failed
+            print(f"{scenario:<8} {concurrency:>5} {r['requests']:>4} {r['errors']:>4} {r['throughput_rps']:>7.2f} "
+                  f"{r['ttft_p50_s']:>9.3f} {r['ttft_p95_s']:>9.3f} {r['latency_p50_s']:>7.3f} "
+                  f"{r['latency_p95_s']:>7.3f} {r['peak_rss_mb']:>7.1f}")
+        if args.compare:
+            regressions += compare(scenario, results, args.time_scale, args.tolerance)
+        if args.save_baseline:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(baseline_path(scenario), "w", encoding="utf-8") as f:
+                json.dump({"time_scale": args.time_scale, "seed": args.seed, "results": results}, f, indent=2)
+                f.write("\n")
+    if args.compare:
+        print("\n".join(["", "Regressions:"] + regressions) if regressions else "\nNo regressions against the baselines.")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
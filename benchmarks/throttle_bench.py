@@ -0,0 +1,93 @@
+"""Drives a quota-enforcing stub provider with and without the shared throttle.
+
+Run from the repository root:
+
+    python benchmarks/throttle_bench.py
+
+The stub accepts QUOTA_RPM requests per sliding minute (scaled down to a few seconds) and answers
+429 with Retry-After beyond that. Without throttling a burst of callers mostly fails; with it, every
+call succeeds and throughput sits just under the quota.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "LangGraph"))
+
+import throttle  # noqa: E402
+from models import FakeMessage, FakeProviderError  # noqa: E402
+
+TIME_SCALE = 1 / 20  # One simulated minute lasts three seconds
+QUOTA_RPM = 60
+CALLS = 150
+WORKERS = 24
+
+
+class QuotaProvider:
+    """Sliding-window request quota, like the Gemini and Groq free tiers."""
+
+    def __init__(self, rpm: float, window: float = 60 * TIME_SCALE):
+        self.rpm = rpm
+        self.window = window
+        self.accepted = deque()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            while self.accepted and self.accepted[0] <= now - self.window:
+                self.accepted.popleft()
+            if len(self.accepted) >= self.rpm:
+                self.rejected += 1
+                error = FakeProviderError(429, "Resource has been exhausted (e.g. check quota).")
+                error.retry_after = self.accepted[0] + self.window - now
+                raise error
+            self.accepted.append(now)
+        time.sleep(0.02)
+        return FakeMessage(f"Response to: {prompt}")
+
+
+def run(label, invoke):
+    start = time.perf_counter()
+    outcomes = []
+
+    def one(i):
+        try:
+            invoke(f"prompt {i}")
+            return True
+        except Exception:
+            return False
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        outcomes = list(executor.map(one, range(CALLS)))
+    seconds = time.perf_counter() - start
+    succeeded = sum(outcomes)
+    rate = succeeded / seconds * 60 * TIME_SCALE
+    print(f"{label:<22} {succeeded:>5}/{CALLS:<5} {seconds:>8.1f} {rate:>14.1f}", end="")
+
+
+def main():
+    print(f"quota {QUOTA_RPM} requests per simulated minute, {CALLS} calls from {WORKERS} threads")
+    print(f"{'setup':<22} {'succeeded':>11} {'seconds':>8} {'per sim. min':>14} {'429s':>6}")
+    provider = QuotaProvider(QUOTA_RPM)
+    run("no throttling", provider.invoke)
+    print(f" {provider.rejected:>6}")
+
+    provider = QuotaProvider(QUOTA_RPM)
+    limiter = throttle.Throttle("stub", base_delay=0.05, max_delay=1.0)
+    run("backoff only", lambda prompt: limiter.call(lambda: provider.invoke(prompt)))
+    print(f" {provider.rejected:>6}")
+
+    provider = QuotaProvider(QUOTA_RPM)
+    limiter = throttle.Throttle("stub", rpm=QUOTA_RPM / TIME_SCALE, base_delay=0.05, max_delay=1.0)
+    run("token bucket + retries", lambda prompt: limiter.call(lambda: provider.invoke(prompt)))
+    print(f" {provider.rejected:>6}")
+    print(limiter.snapshot())
+
+
+if __name__ == "__main__":
+    main()